@@ -0,0 +1,139 @@
+from ast_nodes import *
+
+# Análises estáticas sobre a AST, usadas pelas otimizações do interpretador.
+#
+# Uma função é pura quando o resultado só depende dos argumentos e a chamada não tem efeitos visíveis:
+# - nenhuma das suas definições (FunctionNode/BranchNode) chega a um WriteNode, InputNode ou RandomNode;
+# - não lê variáveis globais (que podem mudar entre chamadas), só parâmetros e variáveis locais já atribuídas;
+# - só chama funções que também são puras.
+
+
+class FunctionInfo:
+    def __init__(self, name: str):
+        """
+        Informação recolhida sobre todas as definições de uma função com um dado nome.
+        """
+        self.name: str = name
+        self.clauses: list = []
+        # A função tem efeitos (escrita, entrada, aleatório) ou lê variáveis globais
+        self.impure: bool = False
+        # Nomes das funções chamadas (diretamente ou via map/fold)
+        self.calls: set = set()
+
+
+def collect_functions(program: ProgramNode) -> dict:
+    """
+    Agrupa as definições de funções do programa por nome e analisa o corpo de cada uma.
+
+    :param program: O nó raiz da AST.
+    :return: Dicionário nome -> FunctionInfo.
+    """
+    functions: dict = {}
+    for statement in program.statements:
+        if isinstance(statement, FunctionNode):
+            name: str = statement.name
+            bound: set = set()
+            for param in statement.parameters:
+                if isinstance(param, ListPatternNode):
+                    bound.update(part for part in (param.head, param.tail) if part is not None)
+                else:
+                    bound.add(param)
+        elif isinstance(statement, BranchNode):
+            name: str = statement.function_name
+            bound: set = set()
+        else:
+            continue
+
+        if name not in functions:
+            functions[name] = FunctionInfo(name)
+        info: FunctionInfo = functions[name]
+        info.clauses.append(statement)
+
+        if isinstance(statement, BranchNode):
+            scan_expression(statement.condition, bound, info)
+        scan_body(statement.body, bound, info)
+    return functions
+
+
+def scan_body(body: list, bound: set, info: FunctionInfo):
+    """
+    Percorre as instruções de um corpo de função pela ordem de execução.
+    Uma variável só é local depois de ser atribuída; uma leitura anterior é uma leitura de uma global.
+    """
+    bound = set(bound)
+    for statement in body:
+        if isinstance(statement, WriteNode):
+            info.impure = True
+            scan_expression(statement.expression, bound, info)
+        elif isinstance(statement, (AssignNode, ReturnNode)):
+            scan_expression(statement.expression, bound, info)
+            if isinstance(statement, AssignNode):
+                bound.add(statement.identifier)
+        elif isinstance(statement, ASTNode):
+            scan_expression(statement, bound, info)
+
+
+def scan_expression(node: any, bound: set, info: FunctionInfo):
+    """
+    Percorre uma expressão, marcando efeitos, leituras de globais e chamadas de funções.
+    """
+    if isinstance(node, (InputNode, RandomNode, WriteNode)):
+        info.impure = True
+        if isinstance(node, RandomNode):
+            scan_expression(node.upper_limit, bound, info)
+
+    elif isinstance(node, IdentifierNode):
+        if node.name not in bound:
+            info.impure = True
+
+    elif isinstance(node, InterpolatedStringNode):
+        for part in node.parts:
+            scan_expression(part, bound, info)
+
+    elif isinstance(node, BinOpNode):
+        scan_expression(node.left, bound, info)
+        scan_expression(node.right, bound, info)
+
+    elif isinstance(node, FunctionCallNode):
+        info.calls.add(node.name)
+        for argument in node.arguments:
+            scan_expression(argument, bound, info)
+
+    elif isinstance(node, ListNode):
+        for element in node.elements:
+            scan_expression(element, bound, info)
+
+    elif isinstance(node, MapNode):
+        info.calls.add(node.function)
+        scan_expression(node.list_node, bound, info)
+
+    elif isinstance(node, FoldNode):
+        info.calls.add(node.function)
+        scan_expression(node.list_node, bound, info)
+        scan_expression(node.initial_value, bound, info)
+
+    elif isinstance(node, (FunctionNode, BranchNode)):
+        # Definições dentro de um corpo são ignoradas pelo interpretador
+        pass
+
+
+def find_pure_functions(program: ProgramNode) -> set:
+    """
+    Calcula o conjunto das funções puras do programa.
+    Parte de todas as funções sem efeitos locais e remove, até estabilizar, as que chamam funções
+    impuras ou não definidas. Funções recursivas (ex: fib) continuam puras.
+
+    :param program: O nó raiz da AST.
+    :return: Conjunto com os nomes das funções puras.
+    """
+    functions: dict = collect_functions(program)
+    pure: set = {name for name, info in functions.items() if not info.impure}
+
+    changed: bool = True
+    while changed:
+        changed = False
+        for name in list(pure):
+            if not functions[name].calls <= pure:
+                pure.discard(name)
+                changed = True
+    return pure
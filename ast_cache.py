@@ -0,0 +1,155 @@
+import contextlib
+import hashlib
+import io
+import os
+import pickle
+import sys
+
+# Cache em disco das AST já construídas pelo parser.
+# Cada entrada é um ficheiro com a AST (ProgramNode) serializada com pickle, com o nome igual ao hash do código fonte
+# e da versão da gramática. A versão da gramática é o hash dos ficheiros que definem os tokens, as regras e os nós
+# (lexer.py, scanner.py, parser.py, pratt_parser.py e ast_nodes.py), pelo que qualquer alteração a um deles
+# invalida todas as entradas.
+# As mensagens escritas durante a análise (ex: erros de sintaxe) também são guardadas e repetidas em cada acerto.
+
+# Ficheiros cujo conteúdo define a AST produzida para um dado código fonte
+GRAMMAR_FILES: tuple = ('lexer.py', 'scanner.py', 'parser.py', 'pratt_parser.py', 'ast_nodes.py')
+
+# Extensão dos ficheiros da cache
+CACHE_EXTENSION = '.ast'
+
+
+def grammar_version() -> str:
+    """
+    Calcula a versão da gramática (hash dos ficheiros do lexer, do parser e dos nós da AST).
+    """
+    digest = hashlib.sha256()
+    directory: str = os.path.dirname(os.path.abspath(__file__))
+    for name in GRAMMAR_FILES:
+        with open(os.path.join(directory, name), 'rb') as file:
+            digest.update(file.read())
+    digest.update(str(pickle.HIGHEST_PROTOCOL).encode())
+    return digest.hexdigest()
+
+
+class ASTCache:
+    def __init__(self, directory: str = '.fca_cache', variant: str = ''):
+        """
+        Inicializa a cache.
+
+        :param directory: Diretório onde as AST são guardadas (criado na primeira escrita).
+        :param variant: Identifica a forma como o código é analisado (ex: o analisador léxico e o parser usados),
+                        que também faz parte da chave, pois pode mudar a AST ou as mensagens produzidas.
+        """
+        self.directory: str = directory
+        self.version: str = grammar_version() + variant
+        self.hits: int = 0
+        self.misses: int = 0
+        self.writes: int = 0
+        # Entradas que não foi possível ler ou escrever (ex: ficheiro corrompido, AST demasiado profunda)
+        self.errors: int = 0
+
+    def key(self, source: str) -> str:
+        """
+        Calcula a chave de um código fonte (hash do código e da versão da gramática).
+        """
+        digest = hashlib.sha256(self.version.encode())
+        digest.update(source.encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_EXTENSION)
+
+    def parse(self, source: str, parse_function) -> any:
+        """
+        Devolve a AST do código fonte, lendo-a da cache ou, se não existir, analisando-o e guardando o resultado.
+
+        :param source: O código fonte.
+        :param parse_function: Função que recebe o código fonte e devolve a AST (ex: parser.parse).
+        :return: A AST (ou None se a análise falhar).
+        """
+        key: str = self.key(source)
+        entry: tuple = self.load(key)
+        if entry is not None:
+            self.hits += 1
+            messages, program = entry
+            if messages:
+                sys.stdout.write(messages)
+            return program
+
+        self.misses += 1
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            program: any = parse_function(source)
+        messages: str = output.getvalue()
+        if messages:
+            sys.stdout.write(messages)
+        if program is not None:
+            self.store(key, (messages, program))
+        return program
+
+    def load(self, key: str) -> tuple:
+        """
+        Lê uma entrada da cache.
+
+        :return: Um tuplo (mensagens da análise, AST), ou None se a entrada não existir ou não puder ser lida.
+        """
+        try:
+            with open(self.path(key), 'rb') as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Entrada corrompida (ex: escrita interrompida): é removida e a análise volta a ser feita
+            self.errors += 1
+            with contextlib.suppress(OSError):
+                os.remove(self.path(key))
+            return None
+
+    def store(self, key: str, entry: tuple):
+        """
+        Guarda uma entrada na cache. A escrita é feita num ficheiro temporário que depois substitui o definitivo,
+        para que uma execução em paralelo nunca leia um ficheiro incompleto.
+        """
+        try:
+            data: bytes = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        except (RecursionError, pickle.PicklingError):
+            self.errors += 1
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporary: str = f"{self.path(key)}.{os.getpid()}.tmp"
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, self.path(key))
+            self.writes += 1
+        except OSError:
+            self.errors += 1
+
+    def clear(self):
+        """
+        Remove todas as entradas da cache.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_EXTENSION):
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(self.directory, name))
+
+    def stats(self) -> dict:
+        entries: int = 0
+        size: int = 0
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(CACHE_EXTENSION):
+                    entries += 1
+                    size += os.path.getsize(os.path.join(self.directory, name))
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'errors': self.errors,
+            'entries': entries,
+            'bytes': size
+        }
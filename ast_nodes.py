@@ -6,37 +6,79 @@
 # estamos basicamente a criar instancias destas classes e a agrupa-las no programnode, o ASTNode serve de base
 # assim vai ser mais facil de usar on interpretador, e gerador de codigo c.
 
+# Representação compacta: todas as classes usam __slots__ (os nós não têm __dict__) e o tipo do nó
+# (node_type, statement_type/expression_type e o inteiro kind) é um atributo da classe e não de cada instância.
+# O kind (NodeKind) permite despachar por tabela em vez de usar cadeias de isinstance.
+
+from enum import IntEnum
+
+
+# Tipos de nó, usados como índice em tabelas de despacho
+class NodeKind(IntEnum):
+    PROGRAM = 0
+    FUNCTION = 1
+    WRITE = 2
+    ASSIGN = 3
+    RETURN = 4
+    BRANCH = 5
+    BRANCH_FUNCTION = 6
+    BINOP = 7
+    NUMBER = 8
+    IDENTIFIER = 9
+    STRING = 10
+    INTERPOLATED_STRING = 11
+    INPUT = 12
+    RANDOM = 13
+    FUNCTION_CALL = 14
+    LIST = 15
+    LIST_PATTERN = 16
+    MAP = 17
+    FOLD = 18
+
 
 # Classe Base
 class ASTNode:
-    def __init__(self, node_type: str):
-        """
-        Inicializa um nó da AST (Abstract Syntax Tree).
-        é uma classe base para os outros nós da ast
-        :param node_type: Tipo do nó, representado como uma string.
-        """
-        self.node_type: str = node_type
+    """
+    Nó da AST (Abstract Syntax Tree).
+    é uma classe base para os outros nós da ast
+    node_type: Tipo do nó, representado como uma string.
+    kind: Tipo do nó, representado como um NodeKind.
+    position: Posição opcional no código fonte, (linha, coluna), ou None.
+    """
+    __slots__ = ('position',)
+    node_type: str = 'ASTNode'
+    kind: NodeKind = None
+
+    def __init__(self):
+        self.position: tuple = None
 
 
 # Classe que representa o nó do programa na AST
 # Armazena todos os nós de instruções que compõem o programa.
 # Essencialmente, ela coleta e organiza todas as instruções
 class ProgramNode(ASTNode):
+    __slots__ = ('statements',)
+    node_type: str = 'ProgramNode'
+    kind: NodeKind = NodeKind.PROGRAM
+
     def __init__(self, statements: list):
-        super().__init__(
-            'ProgramNode')  # aqui estamos a chamar o construtor da classe base (ASTNode) para definir o type.
+        super().__init__()
         self.statements: list = statements
 
 
 # Classe base para todos os nós de declaração (StatementNode) na árvore de sintaxe abstrata (AST).
 class StatementNode(ASTNode):
-    def __init__(self, statement_type: str):
-        super().__init__('StatementNode')
-        self.statement_type: str = statement_type
+    __slots__ = ()
+    node_type: str = 'StatementNode'
+    statement_type: str = 'StatementNode'
 
 
 # Classe que representa um nó de função na árvore de sintaxe abstrata (AST)
 class FunctionNode(StatementNode):
+    __slots__ = ('name', 'parameters', 'body')
+    statement_type: str = 'FunctionNode'
+    kind: NodeKind = NodeKind.FUNCTION
+
     def __init__(self, name: str, parameters: list, body: list):
         """
         Inicializa um nó de função.
@@ -45,34 +87,50 @@ class FunctionNode(StatementNode):
         :param parameters: A lista de parâmetros da função.
         :param body: A lista de instruções que compõem o corpo da função.
         """
-        super().__init__('FunctionNode')
+        super().__init__()
         self.name: str = name
         self.parameters: list = parameters
         self.body: list = body
 
 
 class WriteNode(StatementNode):
+    __slots__ = ('expression',)
+    statement_type: str = 'WriteNode'
+    kind: NodeKind = NodeKind.WRITE
+
     def __init__(self, expression):
-        super().__init__('WriteNode')
+        super().__init__()
         self.expression = expression
 
 
 class AssignNode(StatementNode):
+    __slots__ = ('identifier', 'expression')
+    statement_type: str = 'AssignNode'
+    kind: NodeKind = NodeKind.ASSIGN
+
     def __init__(self, identifier, expression):
-        super().__init__('AssignNode')
+        super().__init__()
         self.identifier = identifier
         self.expression = expression
 
 
 class ReturnNode(StatementNode):
+    __slots__ = ('expression',)
+    statement_type: str = 'ReturnNode'
+    kind: NodeKind = NodeKind.RETURN
+
     def __init__(self, expression):
-        super().__init__('ReturnNode')
+        super().__init__()
         self.expression = expression
 
 
 # representa um nó de ramificação na AST.
 # Utilizado para definir funções que possuem ramos
 class BranchNode(ASTNode):
+    __slots__ = ('function_name', 'condition', 'body')
+    node_type: str = 'BranchNode'
+    kind: NodeKind = NodeKind.BRANCH
+
     def __init__(self, function_name: str, condition: 'ExpressionNode', body: list):
         """
         Inicializa um nó de ramificação.
@@ -81,98 +139,147 @@ class BranchNode(ASTNode):
         :param condition: A condição que define a ramificação (pode ser uma expressão ou um número).
         :param body: O corpo da função que será executado se a condição for satisfeita.
         """
-        super().__init__('BranchNode')  # Chama o construtor da classe base (ASTNode) para definir o tipo.
+        super().__init__()
         self.function_name: str = function_name
         self.condition: 'ExpressionNode' = condition
         self.body: list = body
 
 
 class BranchFunctionNode(StatementNode):
+    __slots__ = ('name', 'branches')
+    statement_type: str = 'BranchFunctionNode'
+    kind: NodeKind = NodeKind.BRANCH_FUNCTION
+
     def __init__(self, name, branches):
-        super().__init__('BranchFunctionNode')
+        super().__init__()
         self.name = name
         self.branches = branches
 
 
 class ExpressionNode(ASTNode):
-    def __init__(self, expression_type):
-        super().__init__('ExpressionNode')
-        self.expression_type = expression_type
+    __slots__ = ()
+    node_type: str = 'ExpressionNode'
+    expression_type: str = 'ExpressionNode'
 
 
 class BinOpNode(ExpressionNode):
+    __slots__ = ('operator', 'left', 'right')
+    expression_type: str = 'BinOpNode'
+    kind: NodeKind = NodeKind.BINOP
+
     def __init__(self, operator, left, right):
-        super().__init__('BinOpNode')
+        super().__init__()
         self.operator = operator
         self.left = left
         self.right = right
 
 
 class NumberNode(ExpressionNode):
+    __slots__ = ('value',)
+    expression_type: str = 'NumberNode'
+    kind: NodeKind = NodeKind.NUMBER
+
     def __init__(self, value):
-        super().__init__('NumberNode')
+        super().__init__()
         self.value = value
 
 
 class IdentifierNode(ExpressionNode):
+    __slots__ = ('name',)
+    expression_type: str = 'IdentifierNode'
+    kind: NodeKind = NodeKind.IDENTIFIER
+
     def __init__(self, name):
-        super().__init__('IdentifierNode')
+        super().__init__()
         self.name = name
 
 
 class StringNode(ExpressionNode):
+    __slots__ = ('value',)
+    expression_type: str = 'StringNode'
+    kind: NodeKind = NodeKind.STRING
+
     def __init__(self, value):
-        super().__init__('StringNode')
+        super().__init__()
         self.value = value
 
 
 class InterpolatedStringNode(ExpressionNode):
+    __slots__ = ('parts',)
+    expression_type: str = 'InterpolatedStringNode'
+    kind: NodeKind = NodeKind.INTERPOLATED_STRING
+
     def __init__(self, parts):
-        super().__init__('InterpolatedStringNode')
+        super().__init__()
         self.parts = parts
 
 
 class InputNode(ExpressionNode):
-    def __init__(self):
-        super().__init__('InputNode')
+    __slots__ = ()
+    expression_type: str = 'InputNode'
+    kind: NodeKind = NodeKind.INPUT
 
 
 class RandomNode(ExpressionNode):
+    __slots__ = ('upper_limit',)
+    expression_type: str = 'RandomNode'
+    kind: NodeKind = NodeKind.RANDOM
+
     def __init__(self, upper_limit):
-        super().__init__('RandomNode')
+        super().__init__()
         self.upper_limit = upper_limit
 
 
 class FunctionCallNode(ExpressionNode):
+    __slots__ = ('name', 'arguments')
+    expression_type: str = 'FunctionCallNode'
+    kind: NodeKind = NodeKind.FUNCTION_CALL
+
     def __init__(self, name, arguments):
-        super().__init__('FunctionCallNode')
+        super().__init__()
         self.name = name
         self.arguments = arguments
 
 
 class ListNode(ExpressionNode):
+    __slots__ = ('elements',)
+    expression_type: str = 'ListNode'
+    kind: NodeKind = NodeKind.LIST
+
     def __init__(self, elements):
-        super().__init__('ListNode')
+        super().__init__()
         self.elements = elements
 
 
 class ListPatternNode(ASTNode):
+    __slots__ = ('head', 'tail')
+    node_type: str = 'ListPatternNode'
+    kind: NodeKind = NodeKind.LIST_PATTERN
+
     def __init__(self, head, tail):
-        super().__init__('ListPatternNode')
+        super().__init__()
         self.head = head
         self.tail = tail
 
 
 class MapNode(ExpressionNode):
+    __slots__ = ('function', 'list_node')
+    expression_type: str = 'MapNode'
+    kind: NodeKind = NodeKind.MAP
+
     def __init__(self, function, list_node):
-        super().__init__('MapNode')
+        super().__init__()
         self.function = function
         self.list_node = list_node
 
 
 class FoldNode(ExpressionNode):
+    __slots__ = ('function', 'list_node', 'initial_value')
+    expression_type: str = 'FoldNode'
+    kind: NodeKind = NodeKind.FOLD
+
     def __init__(self, function, list_node, initial_value):
-        super().__init__('FoldNode')
+        super().__init__()
         self.function = function
         self.list_node = list_node
         self.initial_value = initial_value
@@ -0,0 +1,163 @@
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+# Modo de lote do main.py: processa vários ficheiros .fca (análise, otimização, execução e geração de código C)
+# num conjunto de processos (ProcessPoolExecutor), em vez de um processo Python por ficheiro.
+# Cada ficheiro tem o seu próprio código C (a.fca -> a.c, ao lado do ficheiro ou em --output-dir); o que o programa
+# escreve é guardado e mostrado no fim, pela ordem dos ficheiros, seguido de um resumo com os tempos e as falhas.
+
+# Extensão dos ficheiros procurados quando é dado um diretório
+SOURCE_EXTENSION = '.fca'
+
+
+class FileResult:
+    def __init__(self, path: str, c_path: str):
+        """
+        Resultado do processamento de um ficheiro.
+
+        :param path: O ficheiro .fca.
+        :param c_path: O ficheiro onde foi escrito o código C.
+        """
+        self.path: str = path
+        self.c_path: str = c_path
+        # O que o programa escreveu (ESCREVER, erros de sintaxe, ...)
+        self.output: str = ''
+        # Mensagem do erro que interrompeu o processamento, ou None
+        self.error: str = None
+        # Tempo (em segundos) de cada fase: parse, optimize, run, codegen, write (e compile, com --engine=native)
+        self.timings: dict = {}
+        self.total: float = 0.0
+
+
+def expand_inputs(patterns: list) -> list:
+    """
+    Expande os argumentos da linha de comandos numa lista de ficheiros, sem repetições e pela ordem dada.
+    Um diretório dá os seus ficheiros .fca; um padrão (ex: exemplos/*.fca) dá os ficheiros que lhe correspondem
+    (um padrão sem correspondências fica como está, e falha ao ser lido, tal como na shell).
+
+    :param patterns: Os nomes de ficheiros, padrões ou diretórios.
+    :return: A lista de ficheiros.
+    """
+    filenames: list = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches: list = sorted(glob.glob(os.path.join(pattern, '*' + SOURCE_EXTENSION)))
+        elif glob.has_magic(pattern):
+            matches: list = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        else:
+            matches: list = [pattern]
+        filenames.extend(matches)
+    return list(dict.fromkeys(filenames))
+
+
+def output_path(path: str, output_dir: str = None) -> str:
+    """
+    Devolve o ficheiro onde é escrito o código C de um ficheiro .fca (mesmo nome, com a extensão .c).
+    """
+    name: str = os.path.splitext(path)[0] + '.c'
+    if output_dir is None:
+        return name
+    return os.path.join(output_dir, os.path.basename(name))
+
+
+# Cache da AST de cada processo (criada no primeiro ficheiro, para não calcular a versão da gramática em cada um)
+worker_cache = None
+
+
+def process_file(path: str, args) -> FileResult:
+    """
+    Processa um ficheiro (num processo do conjunto, ou no próprio processo com -j 1).
+    O que o programa escreve é guardado no resultado; o ENTRADA() lê de um stdin vazio.
+
+    :param path: O ficheiro .fca.
+    :param args: As opções da linha de comandos.
+    :return: O resultado.
+    """
+    from main import open_cache, process
+    from metrics import Metrics
+    global worker_cache
+    if worker_cache is None:
+        worker_cache = open_cache(args)
+
+    result = FileResult(path, output_path(path, args.output_dir))
+    metrics = Metrics()
+    output = io.StringIO()
+    start: float = time.perf_counter()
+    stdin = sys.stdin
+    try:
+        sys.stdin = io.StringIO()
+        with open(path, 'r') as file:
+            data: str = file.read()
+        with contextlib.redirect_stdout(output):
+            program = process(data, args, worker_cache, result.c_path, metrics)
+        if program is None:
+            result.error = 'Erro de sintaxe'
+    except Exception as error:
+        result.error = f"{type(error).__name__}: {error}"
+    finally:
+        sys.stdin = stdin
+        result.timings = metrics.wall_times()
+    result.total = time.perf_counter() - start
+    result.output = output.getvalue()
+    return result
+
+
+def run_batch(filenames: list, args) -> int:
+    """
+    Processa os ficheiros num conjunto de processos, mostra o que cada programa escreveu e o resumo.
+
+    :param filenames: Os ficheiros .fca.
+    :param args: As opções da linha de comandos (args.jobs processos; por omissão, o número de CPUs).
+    :return: O código de saída: 0 se todos os ficheiros foram processados sem erros, 1 caso contrário.
+    """
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    jobs: int = max(1, min(args.jobs or os.cpu_count() or 1, len(filenames)))
+
+    start: float = time.perf_counter()
+    if jobs == 1:
+        results: list = [process_file(path, args) for path in filenames]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import partial
+        # Vários ficheiros por tarefa, para que a comunicação entre processos não domine nos ficheiros pequenos
+        chunksize: int = max(1, len(filenames) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results: list = list(executor.map(partial(process_file, args=args), filenames, chunksize=chunksize))
+    elapsed: float = time.perf_counter() - start
+
+    for result in results:
+        if result.output:
+            print(f"==> {result.path} <==")
+            sys.stdout.write(result.output)
+    sys.stdout.flush()
+    print_summary(results, elapsed, jobs)
+    return 1 if any(result.error for result in results) else 0
+
+
+def print_summary(results: list, elapsed: float, jobs: int):
+    """
+    Mostra no stderr o tempo de cada fase por ficheiro, as falhas e o débito total.
+    """
+    stages: tuple = ('parse', 'optimize', 'run', 'codegen', 'write')
+    # Com --engine=native, também a compilação do código C
+    if any('compile' in result.timings for result in results):
+        stages += ('compile',)
+    width: int = max([len(result.path) for result in results] + [8])
+    print(f"{'Ficheiro':<{width}} " + ' '.join(f"{stage:>9}" for stage in stages) + f" {'total':>9}  estado",
+          file=sys.stderr)
+    for result in results:
+        times: str = ' '.join(f"{result.timings[stage] * 1000:9.1f}" if stage in result.timings else f"{'-':>9}"
+                              for stage in stages)
+        state: str = f"FALHOU ({result.error})" if result.error else 'ok'
+        print(f"{result.path:<{width}} {times} {result.total * 1000:9.1f}  {state}", file=sys.stderr)
+
+    failures: int = sum(1 for result in results if result.error)
+    busy: float = sum(result.total for result in results)
+    rate: float = len(results) / elapsed if elapsed > 0 else 0.0
+    print(f"{len(results)} ficheiros, {failures} falhas, {jobs} processos: {elapsed:.3f} s "
+          f"({rate:.1f} ficheiros/s, {busy:.3f} s de processamento; tempos em ms)", file=sys.stderr)
@@ -0,0 +1,2 @@
+# Benchmarks do compilador FCA.
+# Cada módulo pode ser executado a partir da raiz do projeto, ex: python -m bench.ast_memory
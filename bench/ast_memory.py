@@ -0,0 +1,70 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+from ast_nodes import *
+
+# Mede a memória ocupada pela AST de um programa sintético grande.
+# A AST é construída diretamente (com os mesmos nós que o parser criaria), para que a medição
+# não inclua a memória nem o tempo do PLY.
+
+
+def build_program(statement_count: int) -> ProgramNode:
+    """
+    Constrói um programa com statement_count instruções, com a mistura típica dos exemplos:
+    atribuições com expressões binárias, escritas, strings interpoladas e funções.
+
+    :param statement_count: O número de instruções do programa.
+    :return: O ProgramNode construído.
+    """
+    statements: list = []
+    for i in range(statement_count):
+        kind: int = i % 5
+        if kind == 0:
+            statements.append(AssignNode(f'v{i}', BinOpNode('+', BinOpNode('*', NumberNode(i), NumberNode(3)),
+                                                            NumberNode(4))))
+        elif kind == 1:
+            statements.append(WriteNode(IdentifierNode(f'v{i - 1}')))
+        elif kind == 2:
+            statements.append(AssignNode(f's{i}', InterpolatedStringNode([StringNode('valor '),
+                                                                          IdentifierNode(f'v{i - 2}')])))
+        elif kind == 3:
+            statements.append(FunctionNode(f'f{i}', ['a', 'b'],
+                                           [ReturnNode(BinOpNode('-', IdentifierNode('a'), IdentifierNode('b')))]))
+        else:
+            statements.append(AssignNode(f'l{i}', FunctionCallNode(f'f{i - 1}', [NumberNode(i), ListNode([])])))
+    return ProgramNode(statements)
+
+
+def measure(statement_count: int) -> dict:
+    """
+    Constrói a AST e devolve a memória alocada e o tempo de construção.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    program: ProgramNode = build_program(statement_count)
+    elapsed: float = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'statements': len(program.statements),
+        'bytes': current,
+        'bytes_per_statement': current / statement_count,
+        'build_seconds': elapsed
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Memória ocupada pela AST de um programa sintético.')
+    arg_parser.add_argument('--statements', type=int, default=100_000, help='Número de instruções do programa')
+    args = arg_parser.parse_args()
+
+    result: dict = measure(args.statements)
+    print(f"{result['statements']} instruções: {result['bytes'] / 1024 / 1024:.1f} MiB "
+          f"({result['bytes_per_statement']:.0f} bytes/instrução), construída em {result['build_seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
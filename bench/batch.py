@@ -0,0 +1,77 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Compara o processamento de muitos ficheiros .fca com um processo Python por ficheiro (como o tests.py)
+# e com o modo de lote do main.py, com vários números de processos.
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Exemplos que correm sem stdin e geram código C sem erros
+EXAMPLES: tuple = ('exemplo-A-01.fca', 'exemplo-B-01.fca', 'exemplo-B-02.fca', 'exemplo-C-01.fca',
+                   'exemplo-C-02.fca', 'exemplo-C-03.fca', 'exemplo-C-04.fca', 'exemplo-D-01.fca')
+
+
+def copy_examples(directory: str, copies: int) -> list:
+    """
+    Copia os exemplos várias vezes para o diretório (com um comentário diferente em cada cópia, para que
+    cada ficheiro seja analisado e não lido da cache da AST).
+    """
+    paths: list = []
+    for copy in range(copies):
+        for name in EXAMPLES:
+            with open(os.path.join(ROOT, 'exemplos', name), 'r') as file:
+                data: str = file.read()
+            path: str = os.path.join(directory, f"{copy}-{name}")
+            with open(path, 'w') as file:
+                file.write(f"-- cópia {copy}\n{data}")
+            paths.append(path)
+    return paths
+
+
+def run_per_file(paths: list) -> float:
+    start: float = time.perf_counter()
+    for path in paths:
+        # Corre no diretório dos ficheiros, onde é escrito o output.c
+        subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), path, '--no-cache'],
+                       cwd=os.path.dirname(path), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def run_batch(directory: str, jobs: int) -> float:
+    start: float = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), directory, '--no-cache', '-j', str(jobs)],
+                   cwd=directory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Um processo por ficheiro vs. modo de lote do main.py.')
+    arg_parser.add_argument('--copies', type=int, default=25, help='Número de cópias de cada exemplo')
+    arg_parser.add_argument('--jobs', type=int, nargs='+', default=None,
+                            help='Números de processos a medir no modo de lote (por omissão, 1 até ao número de CPUs)')
+    args = arg_parser.parse_args()
+
+    cpus: int = os.cpu_count() or 1
+    jobs_list: list = args.jobs or sorted({1, max(1, cpus // 2), cpus})
+
+    directory: str = tempfile.mkdtemp()
+    try:
+        paths: list = copy_examples(directory, args.copies)
+        print(f"{len(paths)} ficheiros, {cpus} CPUs")
+        per_file: float = run_per_file(paths)
+        print(f"{'Um processo por ficheiro':<28} {per_file:8.3f} s  {len(paths) / per_file:8.1f} ficheiros/s")
+        for jobs in jobs_list:
+            elapsed: float = run_batch(directory, jobs)
+            print(f"{f'Lote, -j {jobs}':<28} {elapsed:8.3f} s  {len(paths) / elapsed:8.1f} ficheiros/s  "
+                  f"({per_file / elapsed:.1f}x)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
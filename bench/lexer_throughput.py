@@ -0,0 +1,82 @@
+import argparse
+import time
+
+from lexer import lexer
+from scanner import Scanner
+
+# Compara o débito (tokens por segundo) do lexer do PLY (lexer.py) e do analisador léxico escrito à mão
+# (scanner.py) num programa grande gerado, e verifica que os dois produzem a mesma sequência de tokens.
+
+# Bloco de código repetido para gerar o programa, com todos os tipos de tokens dos exemplos
+BLOCK: str = '''FUNCAO soma{i}(a, b),: a + b ;
+FUNCAO fib{i}( 0 ),: 0 ;
+FUNCAO fib{i}( n ):
+    a = fib{i}(n-1);
+    b = fib{i}(n-2);
+    a + b;
+FIM
+valor{i} = 12345 - (5191 * 15) / 3 ;  -- comentário
+escola{i} = "EST";
+ESCREVER("Olá, #{{escola{i}}}!");
+ESCREVER("Ola" <> escola{i});
+lista{i} = map(mais2, [ 1, 2, 3 ]);
+{{- comentário
+de várias linhas -}}
+total{i} = fold(soma{i}, lista{i}, 0);
+ate10 = ALEATORIO(ENTRADA());
+'''
+
+
+def generate_source(blocks: int) -> str:
+    return ''.join(BLOCK.format(i=i) for i in range(blocks))
+
+
+def ply_tokens(data: str):
+    lexer.input(data)
+    return iter(lexer.token, None)
+
+
+def scanner_tokens(data: str):
+    scanner = Scanner()
+    scanner.input(data)
+    return iter(scanner.token, None)
+
+
+def measure(function, data: str, repeat: int) -> tuple:
+    """
+    Percorre os tokens várias vezes, um a um e sem os guardar (tal como o parser os consome),
+    e devolve (melhor tempo em segundos, número de tokens).
+    """
+    best: float = float('inf')
+    count: int = 0
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        count = 0
+        for _token in function(data):
+            count += 1
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Débito do lexer do PLY e do scanner escrito à mão.')
+    arg_parser.add_argument('--blocks', type=int, default=5000, help='Número de blocos do programa gerado')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Número de repetições (conta a melhor)')
+    args = arg_parser.parse_args()
+
+    data: str = generate_source(args.blocks)
+    print(f"Programa gerado: {len(data) / 1024 / 1024:.1f} MiB, {data.count(chr(10))} linhas")
+
+    ply_time, count = measure(ply_tokens, data, args.repeat)
+    scanner_time, count = measure(scanner_tokens, data, args.repeat)
+
+    same: bool = ([(t.type, t.value, t.lexpos) for t in ply_tokens(data)]
+                  == [(t.type, t.value, t.lexpos) for t in scanner_tokens(data)])
+    print(f"PLY:     {count / ply_time:12,.0f} tokens/s ({ply_time:.3f} s)")
+    print(f"Scanner: {count / scanner_time:12,.0f} tokens/s ({scanner_time:.3f} s), "
+          f"{ply_time / scanner_time:.1f}x mais rápido")
+    print(f"{count} tokens, sequências {'iguais' if same else 'DIFERENTES'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import time
+
+from parser import parser
+from pratt_parser import PrattParser
+from scanner import Scanner
+
+# Compara o tempo de análise do parser do PLY (parser.py) e do parser escrito à mão (pratt_parser.py)
+# em programas gerados de tamanho crescente. As regras do parser.py copiam a lista de instruções (e de
+# elementos) em cada redução, pelo que o seu tempo por instrução cresce com o tamanho do programa;
+# no parser pratt deve manter-se constante.
+
+# Instrução repetida para gerar o programa
+STATEMENT: str = 'valor{i} = fib(n - 1) + {i} * 2;\n'
+
+# Lista literal com muitos elementos (elementos_lista também é construída com cópias)
+LIST_STATEMENT: str = 'lista = [{elements}];\n'
+
+
+def generate_source(statements: int) -> str:
+    return ''.join(STATEMENT.format(i=i) for i in range(statements))
+
+
+def generate_list(elements: int) -> str:
+    return LIST_STATEMENT.format(elements=', '.join(str(i) for i in range(elements)))
+
+
+def measure(function, data: str, repeat: int) -> float:
+    """
+    Devolve o melhor tempo (em segundos) de várias análises do mesmo código.
+    """
+    best: float = float('inf')
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def ply_parse(data: str):
+    return parser.parse(data, lexer=Scanner())
+
+
+def pratt_parse(data: str):
+    return PrattParser().parse(data)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Tempo de análise do parser do PLY e do parser pratt.')
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[2500, 5000, 10000, 20000],
+                            help='Número de instruções (e de elementos da lista) dos programas gerados')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Número de repetições (conta a melhor)')
+    args = arg_parser.parse_args()
+
+    for title, generate in (('Instruções', generate_source), ('Elementos da lista', generate_list)):
+        print(title)
+        print(f"{'N':>8} {'PLY (s)':>10} {'µs/N':>8} {'Pratt (s)':>10} {'µs/N':>8} {'Ganho':>7}")
+        for size in args.sizes:
+            data: str = generate(size)
+            ply_time: float = measure(ply_parse, data, args.repeat)
+            pratt_time: float = measure(pratt_parse, data, args.repeat)
+            print(f"{size:>8} {ply_time:>10.3f} {ply_time / size * 1e6:>8.1f} "
+                  f"{pratt_time:>10.3f} {pratt_time / size * 1e6:>8.1f} {ply_time / pratt_time:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Mede o tempo de arranque do main.py (processo completo, como quando o tests.py corre um processo por ficheiro),
+# para um programa pequeno, em que o tempo de execução é desprezável face ao de importar e preparar o compilador.
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN: str = os.path.join(ROOT, 'main.py')
+DEFAULT_PROGRAM: str = os.path.join(ROOT, 'exemplos', 'exemplo-C-03.fca')
+
+
+def time_command(command: list, runs: int, cwd: str) -> list:
+    """
+    Executa o comando várias vezes e devolve os tempos (em segundos) de cada execução.
+    """
+    times: list = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def scenarios(program: str) -> list:
+    """
+    Devolve os cenários medidos: (nome, comando).
+    """
+    python: str = sys.executable
+    return [
+        ('python (sem nada)', [python, '-c', 'pass']),
+        ('main.py sem cache', [python, MAIN, program, '--no-cache']),
+        ('main.py com cache', [python, MAIN, program]),
+        ('main.py sem cache, só C', [python, MAIN, program, '--no-cache', '--no-run']),
+        ('main.py com cache, só vm', [python, MAIN, program, '--engine', 'vm', '--no-c']),
+    ]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Tempo de arranque do main.py.')
+    arg_parser.add_argument('--runs', type=int, default=20, help='Número de execuções de cada cenário')
+    arg_parser.add_argument('--program', type=str, default=DEFAULT_PROGRAM, help='Ficheiro .fca a executar')
+    args = arg_parser.parse_args()
+
+    # Diretório temporário: o output.c, a cache e qualquer ficheiro de debug não ficam no projeto
+    with tempfile.TemporaryDirectory() as cwd:
+        for name, command in scenarios(os.path.abspath(args.program)):
+            # Uma execução de aquecimento (preenche a cache da AST e os .pyc)
+            time_command(command, 1, cwd)
+            times: list = time_command(command, args.runs, cwd)
+            print(f"{name:<28} mediana {statistics.median(times) * 1000:7.1f} ms  "
+                  f"mínimo {min(times) * 1000:7.1f} ms")
+            written: list = sorted(name for name in os.listdir(cwd) if name not in ('output.c', '.fca_cache'))
+            if written:
+                print(f"  ficheiros escritos: {', '.join(written)}")
+
+
+if __name__ == "__main__":
+    main()
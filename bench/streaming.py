@@ -0,0 +1,81 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Compara a execução normal (AST completa) com o modo de streaming (--stream) num programa grande gerado:
+# tempo até à primeira linha escrita, tempo total e memória máxima (RSS) do processo.
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEADER: str = '''FUNCAO dobro(x),: x * 2;
+FUNCAO soma(a, b),: a + b;
+FUNCAO fib(0),: 0;
+FUNCAO fib(1),: 1;
+FUNCAO fib(n):
+    a = fib(n - 1);
+    b = fib(n - 2);
+    a + b;
+FIM
+'''
+
+BLOCK: str = '''valor{i} = dobro({i}) + 3 * 4;
+lista{i} = map(dobro, [{i}, 1, 2]);
+total = fold(soma, lista{i}, valor{i});
+ESCREVER("#{{total}}");
+'''
+
+# Mede a memória máxima do próprio processo, que executa o main.py
+RUNNER: str = '''import resource, runpy, sys
+sys.argv = sys.argv[1:]
+runpy.run_path('main.py', run_name='__main__')
+sys.stdout.flush()
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)
+'''
+
+
+def generate_source(path: str, blocks: int):
+    with open(path, 'w') as file:
+        file.write(HEADER)
+        for i in range(blocks):
+            file.write(BLOCK.format(i=i))
+
+
+def run(arguments: list) -> tuple:
+    """
+    Executa o main.py e devolve (segundos até à primeira linha, segundos no total, memória máxima em KiB).
+    """
+    start: float = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', RUNNER, 'main.py'] + arguments, cwd=ROOT,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    process.stdout.readline()
+    first_line: float = time.perf_counter() - start
+    for _line in process.stdout:
+        pass
+    errors: str = process.stderr.read()
+    process.wait()
+    total: float = time.perf_counter() - start
+    return first_line, total, int(errors.split()[-1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Execução normal e em streaming de um programa grande.')
+    arg_parser.add_argument('--blocks', type=int, default=50000, help='Número de blocos do programa gerado')
+    arg_parser.add_argument('--engine', choices=['ast', 'closures', 'vm'], default='ast', help='Motor de execução')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path: str = os.path.join(directory, 'programa.fca')
+        generate_source(path, args.blocks)
+        print(f"Programa gerado: {os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+        common: list = [path, '--engine', args.engine, '--no-cache']
+        for title, arguments in (('Normal', common + ['--no-c']), ('Streaming', common + ['--stream'])):
+            first_line, total, memory = run(arguments)
+            print(f"{title:<10} primeira linha: {first_line:7.3f} s   total: {total:7.3f} s   "
+                  f"memória máxima: {memory / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
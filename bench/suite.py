@@ -0,0 +1,204 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+from bench.workloads import WORKLOADS
+
+# Conjunto de benchmarks do compilador FCA: mede separadamente cada fase (analisador léxico, parser, motores de
+# execução e gerador de código C) em cada carga de trabalho de bench/workloads.py e escreve os resultados em JSON.
+# Cada resultado é identificado por (carga, tamanho, fase), e o JSON inclui o commit, pelo que os resultados de
+# dois commits podem ser comparados com --compare.
+#
+#   python -m bench.suite --json resultados.json
+#   python -m bench.suite --compare resultados.json
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fases medidas (nome -> descrição)
+STAGES: dict = {
+    'lexer:scanner': 'scanner.py, todos os tokens',
+    'lexer:ply': 'lexer.py (PLY), todos os tokens',
+    'parser:pratt': 'pratt_parser.py (tokens do scanner incluídos)',
+    'parser:ply': 'parser.py (PLY, tokens do scanner incluídos)',
+    'interpreter:ast': 'Interpreter.interpret, sem memoização',
+    'interpreter:closures': 'Interpreter.interpret com closures, sem memoização',
+    'interpreter:vm': 'BytecodeCompiler.compile + VirtualMachine.run',
+    'codegen': 'CodeGenerator.generate + get_code'
+}
+
+# Fases medidas por omissão (o parser do PLY é quadrático, e demora muito nos programas grandes)
+DEFAULT_STAGES: list = ['lexer:scanner', 'parser:pratt', 'interpreter:ast', 'interpreter:closures',
+                        'interpreter:vm', 'codegen']
+
+
+def count_tokens(lexer) -> int:
+    count: int = 0
+    for _token in iter(lexer.token, None):
+        count += 1
+    return count
+
+
+def run_stage(stage: str, source: str, program) -> any:
+    """
+    Executa uma fase sobre um programa.
+
+    :param stage: O nome da fase (ver STAGES).
+    :param source: O código fonte (usado pelas fases de análise).
+    :param program: A AST (usada pelas fases de execução e de geração de código).
+    :return: O resultado da fase (número de tokens, AST, ...).
+    """
+    if stage == 'lexer:scanner':
+        from scanner import Scanner
+        lexer = Scanner()
+        lexer.input(source)
+        return count_tokens(lexer)
+    if stage == 'lexer:ply':
+        from lexer import lexer
+        lexer.input(source)
+        return count_tokens(lexer)
+    if stage == 'parser:pratt':
+        from pratt_parser import PrattParser
+        return PrattParser().parse(source)
+    if stage == 'parser:ply':
+        from parser import parser
+        from scanner import Scanner
+        return parser.parse(source, lexer=Scanner())
+    if stage == 'interpreter:ast' or stage == 'interpreter:closures':
+        from interpreter import Interpreter
+        return Interpreter(use_closures=stage == 'interpreter:closures').interpret(program)
+    if stage == 'interpreter:vm':
+        from bytecode import BytecodeCompiler
+        from vm import VirtualMachine
+        return VirtualMachine().run(BytecodeCompiler().compile(program))
+    if stage == 'codegen':
+        from code_generator import CodeGenerator
+        code_generator = CodeGenerator()
+        code_generator.generate(program)
+        return code_generator.get_code()
+    raise ValueError(f"Fase desconhecida: {stage}")
+
+
+def measure(stage: str, source: str, program, repeat: int) -> dict:
+    """
+    Mede uma fase várias vezes (o que é escrito pelo programa é descartado).
+
+    :return: Dicionário com o melhor tempo e a mediana (em segundos), ou com o erro se a fase falhar.
+    """
+    times: list = []
+    for _ in range(repeat):
+        output = io.StringIO()
+        start: float = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                run_stage(stage, source, program)
+        except Exception as error:
+            return {'error': f"{type(error).__name__}: {error}"}
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {'best': times[0], 'median': times[len(times) // 2], 'repeat': repeat}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(workloads: dict, stages: list, repeat: int) -> dict:
+    """
+    Corre todas as fases em todas as cargas de trabalho e devolve o relatório (convertível em JSON).
+
+    :param workloads: Dicionário nome -> (função que gera o código, lista de tamanhos).
+    :param stages: As fases a medir.
+    :param repeat: Número de repetições de cada medição.
+    """
+    from pratt_parser import PrattParser
+    results: list = []
+    for name, (generate, sizes) in workloads.items():
+        for size in sizes:
+            source: str = generate(size)
+            program = PrattParser().parse(source)
+            for stage in stages:
+                result: dict = {'workload': name, 'size': size, 'stage': stage, 'bytes': len(source.encode())}
+                result.update(measure(stage, source, program, repeat))
+                results.append(result)
+                print_result(result)
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+
+
+def print_result(result: dict, previous: dict = None):
+    line: str = f"{result['workload']:<15} {result['size']:>8} {result['stage']:<21}"
+    if 'error' in result:
+        line += f" {'falhou':>10}  {result['error'][:60]}"
+    else:
+        line += f" {result['best'] * 1000:10.2f} ms"
+        if previous is not None and 'best' in previous:
+            line += f"  {previous['best'] * 1000:10.2f} ms  {previous['best'] / result['best']:6.2f}x"
+    print(line, file=sys.stderr)
+
+
+def compare(report: dict, previous: dict):
+    """
+    Mostra cada resultado ao lado do resultado com a mesma chave (carga, tamanho, fase) de um relatório anterior.
+    """
+    keys: dict = {(r['workload'], r['size'], r['stage']): r for r in previous['results']}
+    print(f"\nComparação com {previous.get('commit')} ({previous.get('date')}): atual, anterior, ganho",
+          file=sys.stderr)
+    for result in report['results']:
+        print_result(result, keys.get((result['workload'], result['size'], result['stage'])))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmarks de cada fase do compilador FCA, em JSON.')
+    arg_parser.add_argument('--workloads', nargs='+', choices=list(WORKLOADS), default=list(WORKLOADS),
+                            help='Cargas de trabalho a medir')
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=None,
+                            help='Tamanhos de todas as cargas de trabalho (por omissão, os de cada uma)')
+    arg_parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=DEFAULT_STAGES,
+                            help='Fases a medir')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Número de repetições (conta a melhor)')
+    arg_parser.add_argument('--json', type=str, default=None,
+                            help='Ficheiro onde é escrito o relatório (por omissão, no stdout)')
+    arg_parser.add_argument('--compare', type=str, default=None,
+                            help='Relatório JSON anterior (ex: de outro commit) com que os resultados são comparados')
+    args = arg_parser.parse_args()
+
+    workloads: dict = {name: (WORKLOADS[name][0], args.sizes or WORKLOADS[name][1]) for name in args.workloads}
+
+    # A recursão das funções FCA (ex: x:xs numa lista grande) usa a pilha do Python
+    sys.setrecursionlimit(1000000)
+    threading.stack_size(512 * 1024 * 1024)
+    reports: list = []
+    thread = threading.Thread(target=lambda: reports.append(run_suite(workloads, args.stages, args.repeat)))
+    thread.start()
+    thread.join()
+    report: dict = reports[0]
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as file:
+            compare(report, json.load(file))
+
+    if args.json is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Programas FCA representativos usados pelo bench.suite.
+# Cada carga de trabalho é uma função que recebe o tamanho e devolve o código fonte; o nome e o tamanho identificam
+# o resultado no JSON, pelo que não devem mudar (senão os resultados deixam de ser comparáveis entre commits).
+
+
+def fib(size: int) -> str:
+    """
+    Recursão de fib(size) sem memoização (número de chamadas exponencial no tamanho).
+    """
+    return f'''FUNCAO fib(0),: 0;
+FUNCAO fib(1),: 1;
+FUNCAO fib(n):
+    a = fib(n - 1);
+    b = fib(n - 2);
+    a + b;
+FIM
+ESCREVER(fib({size}));
+'''
+
+
+def list_recursion(size: int) -> str:
+    """
+    Recursão sobre uma lista de size elementos com padrões x:xs (funções inline e de várias linhas).
+    A profundidade da recursão é size.
+    """
+    elements: str = ', '.join(str(i) for i in range(size))
+    return f'''FUNCAO soma([]),: 0;
+FUNCAO soma(x:xs),: x + soma(xs);
+FUNCAO comprimento([]),: 0;
+FUNCAO comprimento(x:xs),: 1 + comprimento(xs);
+FUNCAO soma_dobros(x:xs):
+    resto = soma_dobros(xs);
+    (x * 2) + resto;
+FIM
+FUNCAO soma_dobros([]),: 0;
+lista = [{elements}];
+ESCREVER(soma(lista));
+ESCREVER(comprimento(lista));
+ESCREVER(soma_dobros(lista));
+'''
+
+
+def map_fold(size: int) -> str:
+    """
+    map e fold sobre uma lista de size elementos.
+    """
+    elements: str = ', '.join(str(i) for i in range(size))
+    return f'''FUNCAO dobro(x),: x * 2;
+FUNCAO mais1(x),: x + 1;
+FUNCAO soma(a, b),: a + b;
+lista = [{elements}];
+dobros = map(dobro, lista);
+mais = map(mais1, dobros);
+total = fold(soma, mais, 0);
+ESCREVER(total);
+ESCREVER(fold(soma, map(dobro, mais), 0));
+'''
+
+
+def interpolation(size: int) -> str:
+    """
+    size escritas de strings interpoladas e concatenações.
+    """
+    lines: list = ['nome = "FCA";', 'versao = 2;']
+    for i in range(size):
+        lines.append(f'i = {i};')
+        lines.append('ESCREVER("Olá #{nome} #{versao}, linha #{i}!");')
+        lines.append('ESCREVER("linha " <> i <> " de " <> nome);')
+    return '\n'.join(lines) + '\n'
+
+
+# Bloco de código repetido nos programas sintéticos, com a mistura de instruções dos exemplos
+STATEMENTS_BLOCK: str = '''FUNCAO f{i}(a, b),: a * b + {i};
+v{i} = f{i}({i}, 3) - (2 * 4) / 2;
+s{i} = "valor #{{v{i}}}";
+l{i} = [v{i}, {i}, 3];
+'''
+
+
+def statements(size: int) -> str:
+    """
+    Programa sintético com size instruções (definições, atribuições, strings interpoladas e listas).
+    """
+    return ''.join(STATEMENTS_BLOCK.format(i=i) for i in range(size // 4))
+
+
+# Cargas de trabalho e os tamanhos usados por omissão
+WORKLOADS: dict = {
+    'fib': (fib, [15, 20]),
+    'list_recursion': (list_recursion, [200, 800]),
+    'map_fold': (map_fold, [10000, 100000]),
+    'interpolation': (interpolation, [1000, 10000]),
+    'statements': (statements, [10000, 100000])
+}
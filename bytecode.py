@@ -0,0 +1,369 @@
+from ast_nodes import *
+from dispatch import is_literal, literal_value
+
+# Compilador de AST para bytecode.
+# Em vez de percorrer a árvore e fazer uma cadeia de isinstance para cada nó em cada avaliação
+# (como o Interpreter faz), traduzimos o programa uma única vez para uma lista compacta de instruções
+# (opcode, argumento) que a máquina virtual (vm.py) executa com uma pilha de operandos.
+# Cada função tem o seu próprio CodeObject com uma tabela de constantes e slots para as variáveis locais.
+# Chamadas em posição de retorno são compiladas para TAIL_CALL, que a VM executa sem fazer crescer a pilha.
+
+# Opcodes
+LOAD_CONST = 0  # empilha consts[arg]
+LOAD_FAST = 1  # empilha a variável local no slot arg
+STORE_FAST = 2  # desempilha para o slot local arg
+LOAD_GLOBAL = 3  # empilha a variável global com o nome consts[arg]
+STORE_GLOBAL = 4  # desempilha para a variável global com o nome consts[arg]
+LOAD_FAST_STR = 5  # empilha str(local) ou "" (partes de strings interpoladas)
+LOAD_GLOBAL_STR = 6  # empilha str(global) ou "" (partes de strings interpoladas)
+BINARY_ADD = 7
+BINARY_SUB = 8
+BINARY_MUL = 9
+BINARY_DIV = 10
+BINARY_CONCAT = 11
+CALL = 12  # arg = (nome, número de argumentos)
+RETURN = 13
+POP_TOP = 14
+PRINT = 15
+BUILD_LIST = 16  # arg = número de elementos
+BUILD_STRING = 17  # arg = número de partes
+INPUT = 18
+RANDOM = 19
+GET_ITER = 20  # substitui a lista no topo da pilha por um iterador sobre ela
+FOR_ITER = 21  # arg = (slot do iterador, destino): empilha o próximo elemento ou salta para o destino
+UNPACK_PATTERN = 22  # arg = (slot do argumento, slot da cabeça, slot da cauda)
+DEFINE_FUNCTION = 23  # arg = índice de um FunctionDef nas constantes
+DEFINE_BRANCH = 24  # arg = índice de um BranchDef nas constantes
+RAISE = 25  # arg = índice da mensagem de erro nas constantes
+LIST_APPEND = 26  # desempilha um valor e junta-o à lista que fica no topo da pilha
+JUMP = 27  # arg = destino
+TAIL_CALL = 28  # como CALL, mas reutiliza a frame atual (chamada em posição de retorno)
+
+OPCODE_NAMES: dict = {value: name for name, value in dict(globals()).items()
+                      if name.isupper() and isinstance(value, int)}
+
+BINARY_OPCODES: dict = {
+    '+': BINARY_ADD,
+    '-': BINARY_SUB,
+    '*': BINARY_MUL,
+    '/': BINARY_DIV,
+    '<>': BINARY_CONCAT
+}
+
+# Tipos de literal de um ramo (BranchNode)
+BRANCH_NUMBER = 0
+BRANCH_LIST = 1
+BRANCH_NEVER = 2  # condição que nunca corresponde a um argumento (ex: expressão que não é um número)
+BRANCH_LIST_DYNAMIC = 3  # lista com elementos que não são literais: a VM não a suporta e falha ao ser comparada
+
+
+class CodeObject:
+    def __init__(self, name: str):
+        """
+        Inicializa um objeto de código (o resultado de compilar um corpo de instruções).
+
+        :param name: Nome do código (nome da função ou '<programa>').
+        """
+        self.name: str = name
+        self.instructions: list = []
+        self.constants: list = []
+        self.constant_index: dict = {}
+        self.local_names: list = []
+        self.local_slots: dict = {}
+        # Slots das cabeças dos padrões de lista: o valor None é a cabeça de uma lista vazia e não uma local
+        # por atribuir, pelo que não vale a variável global com o mesmo nome
+        self.head_slots: set = set()
+
+    @property
+    def nlocals(self) -> int:
+        return len(self.local_names)
+
+    def emit(self, opcode: int, arg: any = None):
+        self.instructions.append((opcode, arg))
+
+    def add_constant(self, value: any) -> int:
+        """
+        Adiciona um valor à tabela de constantes, reutilizando a entrada se já existir.
+
+        :param value: O valor constante.
+        :return: O índice da constante na tabela.
+        """
+        key: tuple = (type(value), value)
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constant_index[key]
+
+    def add_local(self, name: any) -> int:
+        """
+        Reserva um slot para uma variável local (ou devolve o slot existente).
+        """
+        if name not in self.local_slots:
+            self.local_slots[name] = len(self.local_names)
+            self.local_names.append(name)
+        return self.local_slots[name]
+
+    def disassemble(self) -> str:
+        """
+        Devolve uma representação legível das instruções, útil para depuração.
+        """
+        lines: list = [f"<code {self.name}>"]
+        for pc, (opcode, arg) in enumerate(self.instructions):
+            lines.append(f"{pc:4} {OPCODE_NAMES[opcode]:<16} {'' if arg is None else arg}")
+        return '\n'.join(lines)
+
+
+class FunctionDef:
+    def __init__(self, name: str, parameters: list, code: CodeObject):
+        """
+        Definição normal de uma função, registada pela instrução DEFINE_FUNCTION.
+        """
+        self.name: str = name
+        self.parameters: list = parameters
+        self.code: CodeObject = code
+
+
+class BranchDef:
+    def __init__(self, name: str, kind: int, literal: any, code: CodeObject):
+        """
+        Definição de um ramo de uma função (ex: fib(0)), registada pela instrução DEFINE_BRANCH.
+
+        :param kind: BRANCH_NUMBER, BRANCH_LIST, BRANCH_NEVER ou BRANCH_LIST_DYNAMIC.
+        :param literal: O número ou a lista com que o argumento é comparado (em BRANCH_LIST_DYNAMIC, os nós dos
+                        elementos).
+        """
+        self.name: str = name
+        self.kind: int = kind
+        self.literal: any = literal
+        self.code: CodeObject = code
+
+
+class BytecodeCompiler:
+    def compile(self, node: ProgramNode) -> CodeObject:
+        """
+        Compila o programa para bytecode.
+
+        :param node: O nó raiz da AST.
+        :return: O CodeObject do programa principal.
+        """
+        code = CodeObject('<programa>')
+        for statement in node.statements:
+            self.compile_top_level(statement, code)
+        code.emit(LOAD_CONST, code.add_constant(None))
+        code.emit(RETURN)
+        return code
+
+    def compile_top_level(self, node: ASTNode, code: CodeObject):
+        """
+        Compila uma instrução do programa principal (equivalente a Interpreter.interpret).
+        """
+        if isinstance(node, FunctionNode):
+            function_def = FunctionDef(node.name, node.parameters, self.compile_function(node))
+            code.emit(DEFINE_FUNCTION, code.add_constant(function_def))
+
+        elif isinstance(node, BranchNode):
+            code.emit(DEFINE_BRANCH, code.add_constant(self.compile_branch(node)))
+
+        elif isinstance(node, AssignNode):
+            self.compile_expression(node.expression, code)
+            code.emit(STORE_GLOBAL, code.add_constant(node.identifier))
+
+        elif isinstance(node, WriteNode):
+            self.compile_expression(node.expression, code)
+            code.emit(PRINT)
+
+        elif isinstance(node, (ReturnNode, FunctionCallNode, BinOpNode)):
+            expression = node.expression if isinstance(node, ReturnNode) else node
+            self.compile_expression(expression, code)
+            code.emit(POP_TOP)
+
+        else:
+            # O Interpreter só falha quando chega a esta instrução, por isso o erro também é adiado
+            code.emit(RAISE, code.add_constant(f"Tipo desconhecido: {type(node)}"))
+
+    def compile_function(self, node: FunctionNode) -> CodeObject:
+        """
+        Compila uma definição normal de função.
+        Os parâmetros ocupam os primeiros slots locais, pela ordem em que são passados.
+        """
+        code = CodeObject(node.name)
+        patterns: list = []
+        for position, param in enumerate(node.parameters):
+            slot = code.add_local(('<argumento>', position))
+            if isinstance(param, ListPatternNode):
+                # O argumento fica num slot anónimo e é desconstruído no início da função
+                patterns.append((slot, param))
+            else:
+                # Se o parâmetro se repetir, o último argumento é o que fica visível (como no Interpreter)
+                code.local_names[slot] = param
+                code.local_slots[param] = slot
+
+        for slot, pattern in patterns:
+            head_slot = code.add_local(pattern.head) if pattern.head is not None else None
+            if head_slot is not None:
+                code.head_slots.add(head_slot)
+            tail_slot = code.add_local(pattern.tail) if pattern.tail is not None else None
+            code.emit(UNPACK_PATTERN, (slot, head_slot, tail_slot))
+
+        self.compile_body(node.body, code)
+        return code
+
+    def compile_branch(self, node: BranchNode) -> BranchDef:
+        """
+        Compila um ramo de função. A condição é resolvida em tempo de compilação para um literal.
+        Uma lista com elementos que não são literais (ex: f([x])) só dá erro quando uma chamada chega a compará-la,
+        que é quando o Interpreter avalia os elementos.
+        """
+        condition = node.condition
+        if isinstance(condition, ListNode):
+            if is_literal(condition):
+                kind, literal = BRANCH_LIST, literal_value(condition)
+            else:
+                kind, literal = BRANCH_LIST_DYNAMIC, condition.elements
+        elif isinstance(condition, NumberNode) and isinstance(condition.value, int):
+            kind, literal = BRANCH_NUMBER, condition.value
+        else:
+            kind, literal = BRANCH_NEVER, None
+
+        code = CodeObject(node.function_name)
+        self.compile_body(node.body, code)
+        return BranchDef(node.function_name, kind, literal, code)
+
+    def compile_body(self, body: list, code: CodeObject):
+        """
+        Compila o corpo de uma função com a mesma semântica de Interpreter.execute_function_body:
+        o resultado é o do ReturnNode ou, na falta dele, o da última expressão binária/chamada avaliada.
+        """
+        result_slot = None
+        for index, statement in enumerate(body):
+            is_last: bool = index == len(body) - 1
+
+            if isinstance(statement, ReturnNode):
+                self.compile_return(statement.expression, code)
+                return
+
+            elif isinstance(statement, AssignNode):
+                self.compile_expression(statement.expression, code)
+                code.emit(STORE_FAST, code.add_local(statement.identifier))
+
+            elif isinstance(statement, WriteNode):
+                self.compile_expression(statement.expression, code)
+                code.emit(PRINT)
+
+            elif isinstance(statement, (BinOpNode, FunctionCallNode)):
+                if is_last:
+                    self.compile_return(statement, code)
+                    return
+                self.compile_expression(statement, code)
+                if result_slot is None:
+                    result_slot = code.add_local('<resultado>')
+                code.emit(STORE_FAST, result_slot)
+
+        if result_slot is None:
+            code.emit(LOAD_CONST, code.add_constant(None))
+        else:
+            code.emit(LOAD_FAST, result_slot)
+        code.emit(RETURN)
+
+    def compile_return(self, node: ASTNode, code: CodeObject):
+        """
+        Compila a expressão devolvida por um corpo de função.
+        Se for uma chamada de função, é uma chamada final (TAIL_CALL): a função chamada ocupa a frame atual.
+        """
+        if isinstance(node, FunctionCallNode):
+            for argument in node.arguments:
+                self.compile_expression(argument, code)
+            code.emit(TAIL_CALL, (node.name, len(node.arguments)))
+        else:
+            self.compile_expression(node, code)
+            code.emit(RETURN)
+
+    def compile_expression(self, node: ASTNode, code: CodeObject):
+        """
+        Compila uma expressão; o código gerado deixa o valor da expressão no topo da pilha.
+        """
+        if isinstance(node, NumberNode):
+            code.emit(LOAD_CONST, code.add_constant(node.value))
+
+        elif isinstance(node, int):
+            code.emit(LOAD_CONST, code.add_constant(node))
+
+        elif isinstance(node, BinOpNode):
+            if node.operator not in BINARY_OPCODES:
+                raise ValueError(f"Operador desconhecido: {node.operator}")
+            self.compile_expression(node.left, code)
+            self.compile_expression(node.right, code)
+            code.emit(BINARY_OPCODES[node.operator])
+
+        elif isinstance(node, IdentifierNode):
+            if node.name in code.local_slots:
+                code.emit(LOAD_FAST, code.local_slots[node.name])
+            else:
+                code.emit(LOAD_GLOBAL, code.add_constant(node.name))
+
+        elif isinstance(node, FunctionCallNode):
+            for argument in node.arguments:
+                self.compile_expression(argument, code)
+            code.emit(CALL, (node.name, len(node.arguments)))
+
+        elif isinstance(node, StringNode):
+            code.emit(LOAD_CONST, code.add_constant(node.value))
+
+        elif isinstance(node, WriteNode):
+            self.compile_expression(node.expression, code)
+
+        elif isinstance(node, InterpolatedStringNode):
+            count: int = 0
+            for part in node.parts:
+                if isinstance(part, StringNode):
+                    code.emit(LOAD_CONST, code.add_constant(part.value))
+                    count += 1
+                elif isinstance(part, IdentifierNode):
+                    if part.name in code.local_slots:
+                        code.emit(LOAD_FAST_STR, code.local_slots[part.name])
+                    else:
+                        code.emit(LOAD_GLOBAL_STR, code.add_constant(part.name))
+                    count += 1
+            code.emit(BUILD_STRING, count)
+
+        elif isinstance(node, InputNode):
+            code.emit(INPUT)
+
+        elif isinstance(node, RandomNode):
+            self.compile_expression(node.upper_limit, code)
+            code.emit(RANDOM)
+
+        elif isinstance(node, ListNode):
+            for element in node.elements:
+                self.compile_expression(element, code)
+            code.emit(BUILD_LIST, len(node.elements))
+
+        elif isinstance(node, MapNode):
+            # O map e o fold são compilados para ciclos, para que as chamadas usem as frames da VM
+            # (e não a pilha do Python). O iterador fica num slot local anónimo.
+            iterator_slot: int = code.add_local(('<iterador>', len(code.instructions)))
+            code.emit(BUILD_LIST, 0)
+            self.compile_expression(node.list_node, code)
+            code.emit(GET_ITER)
+            code.emit(STORE_FAST, iterator_slot)
+            loop_start: int = len(code.instructions)
+            code.emit(FOR_ITER, None)
+            code.emit(CALL, (node.function, 1))
+            code.emit(LIST_APPEND)
+            code.emit(JUMP, loop_start)
+            code.instructions[loop_start] = (FOR_ITER, (iterator_slot, len(code.instructions)))
+
+        elif isinstance(node, FoldNode):
+            iterator_slot: int = code.add_local(('<iterador>', len(code.instructions)))
+            self.compile_expression(node.initial_value, code)
+            self.compile_expression(node.list_node, code)
+            code.emit(GET_ITER)
+            code.emit(STORE_FAST, iterator_slot)
+            loop_start: int = len(code.instructions)
+            code.emit(FOR_ITER, None)
+            code.emit(CALL, (node.function, 2))
+            code.emit(JUMP, loop_start)
+            code.instructions[loop_start] = (FOR_ITER, (iterator_slot, len(code.instructions)))
+
+        else:
+            raise ValueError(f"Unknown expression type: {type(node)}")
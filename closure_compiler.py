@@ -0,0 +1,260 @@
+import random
+from ast_nodes import *
+from vectorize import NOT_VECTORIZED
+
+# Compilação da AST para closures.
+# Cada nó de expressão/instrução é transformado uma única vez numa função Python que já sabe
+# o que fazer (ex: um BinOpNode '+' passa a ser uma closure que chama as closures dos filhos e soma os resultados).
+# Assim a cadeia de isinstance de Interpreter.evaluate_expression só é percorrida na compilação,
+# e não em cada avaliação.
+
+
+class ClosureCompiler:
+    def __init__(self, interpreter):
+        """
+        Inicializa o compilador de closures.
+
+        :param interpreter: O Interpreter que executa as chamadas de funções.
+        """
+        self.interpreter = interpreter
+        # Caches das closures já compiladas: id(nó ou corpo) -> (nó ou corpo, closure).
+        # O nó fica guardado para que o seu id não possa ser reutilizado enquanto a entrada existir.
+        self.expressions: dict = {}
+        self.bodies: dict = {}
+
+    def evaluate(self, node: ASTNode, env: dict) -> any:
+        """
+        Substitui Interpreter.evaluate_expression: avalia o nó com a closure compilada (compilando-a se necessário).
+        """
+        entry: tuple = self.expressions.get(id(node))
+        if entry is None:
+            if isinstance(node, int):
+                return node
+            entry = (node, self.compile_expression(node))
+            self.expressions[id(node)] = entry
+        return entry[1](env)
+
+    def execute_body(self, body: list, env: dict) -> any:
+        """
+        Substitui Interpreter.execute_function_body: executa o corpo de uma função já compilado.
+        """
+        entry: tuple = self.bodies.get(id(body))
+        if entry is None:
+            entry = (body, self.compile_body(body))
+            self.bodies[id(body)] = entry
+        return entry[1](env)
+
+    def release(self, statement: ASTNode):
+        """
+        Substitui Interpreter.release: remove da cache as closures das expressões de uma instrução do nível de topo
+        já executada (no modo de streaming, a cache não pode guardar todas as instruções do programa).
+        """
+        if isinstance(statement, (AssignNode, WriteNode, ReturnNode)):
+            nodes: list = [statement.expression]
+        elif isinstance(statement, FunctionCallNode):
+            # Interpreter.call_function avalia (e compila) cada argumento
+            nodes: list = statement.arguments
+        else:
+            nodes: list = [statement]
+        for node in nodes:
+            self.expressions.pop(id(node), None)
+
+    def compile_body(self, body: list):
+        """
+        Compila o corpo de uma função (FunctionNode/BranchNode) numa única closure,
+        com a mesma semântica de Interpreter.execute_function_body.
+        """
+        # Cada passo é (devolve, guarda_resultado, closure)
+        steps: list = []
+        for statement in body:
+            if isinstance(statement, ReturnNode):
+                steps.append((True, False, self.compile_expression(statement.expression)))
+                break
+            elif isinstance(statement, (AssignNode, WriteNode)):
+                steps.append((False, False, self.compile_statement(statement)))
+            elif isinstance(statement, (BinOpNode, FunctionCallNode)):
+                steps.append((False, True, self.compile_expression(statement)))
+
+        steps: tuple = tuple(steps)
+
+        # Caso mais comum: funções inline (FUNCAO f(x),: expressao;)
+        if len(steps) == 1 and (steps[0][0] or steps[0][1]):
+            return steps[0][2]
+
+        def run_body(env: dict) -> any:
+            result: any = None
+            for returns, stores_result, step in steps:
+                if returns:
+                    return step(env)
+                elif stores_result:
+                    result = step(env)
+                else:
+                    step(env)
+            return result
+
+        return run_body
+
+    def compile_statement(self, node: StatementNode):
+        """
+        Compila uma instrução de atribuição ou de escrita.
+        """
+        expression = self.compile_expression(node.expression)
+
+        if isinstance(node, AssignNode):
+            identifier: str = node.identifier
+
+            def assign(env: dict):
+                env[identifier] = expression(env)
+
+            return assign
+
+        def write(env: dict):
+            print(expression(env))
+
+        return write
+
+    def compile_expression(self, node: ASTNode):
+        """
+        Compila uma expressão numa closure que recebe o ambiente e devolve o valor da expressão.
+
+        :param node: O nó da expressão.
+        :return: A closure compilada.
+        """
+        if isinstance(node, (NumberNode, StringNode)):
+            value: any = node.value
+            return lambda env: value
+
+        elif isinstance(node, int):
+            return lambda env: node
+
+        elif isinstance(node, BinOpNode):
+            return self.compile_binop(node)
+
+        elif isinstance(node, IdentifierNode):
+            name: str = node.name
+            global_env: dict = self.interpreter.global_env
+
+            def load(env: dict) -> any:
+                if name in env:
+                    value: any = env[name]
+                else:
+                    value = global_env.get(name)
+                if value is None:
+                    raise ValueError(f"Variável não encontrada: {name}")
+                return value
+
+            return load
+
+        elif isinstance(node, FunctionCallNode):
+            invoke_function = self.interpreter.invoke_function
+            name: str = node.name
+            arguments: tuple = tuple(self.compile_expression(argument) for argument in node.arguments)
+            return lambda env: invoke_function(name, [argument(env) for argument in arguments])
+
+        elif isinstance(node, WriteNode):
+            return self.compile_expression(node.expression)
+
+        elif isinstance(node, InterpolatedStringNode):
+            parts: list = []
+            for part in node.parts:
+                if isinstance(part, StringNode):
+                    parts.append((True, part.value))
+                elif isinstance(part, IdentifierNode):
+                    parts.append((False, part.name))
+            parts: tuple = tuple(parts)
+            lookup_variable = self.interpreter.lookup_variable
+            return lambda env: ''.join(text if literal else str(lookup_variable(text, env, ""))
+                                       for literal, text in parts)
+
+        elif isinstance(node, InputNode):
+            def read_input(env: dict) -> any:
+                user_input: str = input()
+                if user_input.isnumeric():
+                    return int(user_input)
+                return user_input
+
+            return read_input
+
+        elif isinstance(node, RandomNode):
+            upper_limit = self.compile_expression(node.upper_limit)
+            return lambda env: random.randint(0, upper_limit(env))
+
+        elif isinstance(node, ListNode):
+            elements: tuple = tuple(self.compile_expression(element) for element in node.elements)
+            return lambda env: [element(env) for element in elements]
+
+        elif isinstance(node, MapNode):
+            invoke_function = self.interpreter.invoke_function
+            function: str = node.function
+            list_value = self.compile_expression(node.list_node)
+            if self.interpreter.vectorizer is not None or self.interpreter.parallel_map is not None:
+                # O map_list do interpretador tenta o numpy e/ou os processos antes de chamar a função em cada elemento
+                map_list = self.interpreter.map_list
+                return lambda env: map_list(function, list_value(env))
+            return lambda env: [invoke_function(function, [element]) for element in list_value(env)]
+
+        elif isinstance(node, FoldNode):
+            invoke_function = self.interpreter.invoke_function
+            function: str = node.function
+            list_value = self.compile_expression(node.list_node)
+            initial_value = self.compile_expression(node.initial_value)
+            if self.interpreter.vectorizer is not None:
+                return self.compile_vectorized_fold(function, list_value, initial_value)
+
+            def fold(env: dict) -> any:
+                result: any = initial_value(env)
+                for element in list_value(env):
+                    result = invoke_function(function, [result, element])
+                return result
+
+            return fold
+
+        else:
+            raise ValueError(f"Unknown expression type: {type(node)}")
+
+    def compile_vectorized_fold(self, function: str, list_value, initial_value):
+        """
+        Compila um fold que tenta reduzir a lista com o numpy (Vectorizer) antes de chamar a função em cada elemento.
+        """
+        invoke_function = self.interpreter.invoke_function
+        functions: dict = self.interpreter.functions
+        vectorizer = self.interpreter.vectorizer
+
+        def vectorized_fold(env: dict) -> any:
+            result: any = initial_value(env)
+            elements: list = list_value(env)
+            vectorized: any = vectorizer.fold(functions.get(function), elements, result)
+            if vectorized is not NOT_VECTORIZED:
+                return vectorized
+            for element in elements:
+                result = invoke_function(function, [result, element])
+            return result
+
+        return vectorized_fold
+
+    def compile_binop(self, node: BinOpNode):
+        """
+        Compila uma operação binária numa closure especializada para o operador.
+        """
+        left = self.compile_expression(node.left)
+        right = self.compile_expression(node.right)
+        operator: str = node.operator
+
+        if self.interpreter.counters is not None:
+            # As operações são contadas (--timings): usa o apply_operator do interpretador, que as conta
+            apply_operator = self.interpreter.apply_operator
+            return lambda env: apply_operator(operator, left(env), right(env))
+
+        if operator == '+':
+            return lambda env: left(env) + right(env)
+        elif operator == '-':
+            return lambda env: left(env) - right(env)
+        elif operator == '*':
+            return lambda env: left(env) * right(env)
+        elif operator == '/':
+            safe_divide = self.interpreter.safe_divide
+            return lambda env: safe_divide(left(env), right(env))
+        elif operator == '<>':
+            return lambda env: str(left(env)) + str(right(env))
+        else:
+            raise ValueError(f"Operador desconhecido: {operator}")
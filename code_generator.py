@@ -1,21 +1,68 @@
 from typing import List, Dict
 
+from analysis import collect_functions, find_pure_functions
 from ast_nodes import *
+from codegen_optimizer import MEMO_SIZE, Recurrence, find_recurrence, integer_literal, previous_name
+from type_inference import C_TYPES, PRINTF_FORMATS, TYPE_INT, TYPE_INT_LIST, TypeInference
+
+
+# Valores de um int de 32 bits, o tipo dos inteiros no código C gerado
+C_INT_MIN: int = -2 ** 31
+C_INT_MAX: int = 2 ** 31 - 1
+
+# Função que escreve uma lista de inteiros no formato do interpretador (ex: [1, 2, 3])
+PRINT_LIST_FUNCTION: str = '\n'.join([
+    'void print_list(const int *arr, int size) {',
+    '    printf("[");',
+    '    for (int i = 0; i < size; i++) {',
+    '        printf(i ? ", %d" : "%d", arr[i]);',
+    '    }',
+    '    printf("]\\n");',
+    '}'
+])
 
 
 class CodeGenerator:
-    def __init__(self):
+    def __init__(self, opt_level: int = 2):
+        """
+        :param opt_level: O nível de otimização do código C: 0 gera os ramos das funções como uma sequência de if;
+                          1 gera um switch quando os ramos são todos números inteiros; 2 também transforma as
+                          recorrências em ciclos e memoiza as restantes funções recursivas puras de inteiros
+                          (ver codegen_optimizer.py).
+        """
+        self.opt_level: int = opt_level
         self.code: List[str] = []
         self.functions: List[str] = []
         self.branch_conditions: Dict[str, List[str]] = {}
+        # Ramos de cada função (nome -> lista de BranchNode)
+        self.branch_nodes: Dict[str, List[BranchNode]] = {}
+        # Funções puras que se chamam a si próprias (só com opt_level 2)
+        self.recursive_functions: set = set()
         self.function_parameters: Dict[str, str] = {}
         self.map_used: bool = False
         self.fold_used: bool = False
+        # A divisão é inteira em C, mas dá um número real no interpretador (ver native.check_representable)
+        self.division_used: bool = False
+        # Há um número (literal ou dobrado pelo otimizador) que não cabe num int (ver native.check_representable)
+        self.large_constant_used: bool = False
+        # Assinaturas das funções inferidas (ver type_inference.py)
+        self.types: TypeInference = TypeInference()
+        # Tabela de símbolos do âmbito que está a ser gerado (nome -> tipo): as variáveis globais no main, os
+        # parâmetros e as variáveis locais numa função
+        self.scope: dict = {}
+        # Listas declaradas como vetores no âmbito atual (int nome[] = {...}), cujo tamanho é conhecido em C
+        self.arrays: set = set()
+        self.print_list_used: bool = False
 
     def generate(self, node: ASTNode):
         if isinstance(node, ProgramNode):
             self.code.append("#include <stdio.h>")
             self.code.append("#include <stdlib.h>")
+            self.types.infer(node)
+            if self.opt_level >= 2:
+                pure_functions: set = find_pure_functions(node)
+                self.recursive_functions = {name for name, info in collect_functions(node).items()
+                                            if name in pure_functions and name in info.calls}
 
             # Primeiro, armazena os nomes e parâmetros das funções
             for statement in node.statements:
@@ -44,6 +91,8 @@ class CodeGenerator:
                     self.generate(statement)  # Gerar outras instruções no main
             self.code.append("return 0;")
             self.code.append("}")
+            if self.print_list_used:
+                self.functions.append(PRINT_LIST_FUNCTION)
 
             if self.map_used:
                 self.add_map_function()
@@ -51,9 +100,14 @@ class CodeGenerator:
                 self.add_fold_function()
 
         elif isinstance(node, FunctionNode):
-            # Gera a definição da função
-            params = ', '.join(f'int {param}' for param in node.parameters)
+            # Gera a definição da função, com os tipos inferidos dos parâmetros e do resultado
+            signature = self.types.signature(node.name, len(node.parameters))
+            params = ', '.join(f'{C_TYPES[signature.parameters[index]]} {param}'
+                               for index, param in enumerate(node.parameters))
             param_str = f"{params}"
+            global_scope, global_arrays = self.scope, self.arrays
+            self.scope = {param: signature.parameters[index] for index, param in enumerate(node.parameters)}
+            self.arrays = set()
 
             # Gera o corpo da função
             body_parts: list = []
@@ -68,16 +122,30 @@ class CodeGenerator:
             # Juntamos as body parts ao body com ' '
             body = ' '.join(body_parts)
 
-            # Adiciona condições de ramos, se houver
-            if node.name in self.branch_conditions:
-                branches = ' '.join(self.branch_conditions[node.name])
-                body = f"{branches} {body}"
-
             # Gera o nome da função
             function_name = f"{node.name}_{len(node.parameters)}"
 
+            # Com opt_level 2, uma recorrência é calculada num ciclo antes do corpo (que fica para os argumentos
+            # abaixo dos ramos) e as outras funções recursivas puras de inteiros são memoizadas
+            memoize: bool = False
+            if self.is_integer_recursion(node, signature):
+                recurrence: Recurrence = find_recurrence(node, self.branch_literals(node.name) or set())
+                if recurrence is not None:
+                    body = f"{self.generate_recurrence(node, recurrence, function_name)} {body}"
+                else:
+                    memoize = True
+
+            # Adiciona condições de ramos, se houver
+            branches: str = self.generate_branches(node)
+            if branches:
+                body = f"{branches} {body}"
+            self.scope, self.arrays = global_scope, global_arrays
+
             # Adiciona a definição da função gerada à lista de funções
-            self.functions.append(f"int {function_name}({param_str}) {{ {body} }}")
+            if memoize:
+                self.add_memoized_function(function_name, node.parameters[0], body)
+            else:
+                self.functions.append(f"{C_TYPES[signature.result]} {function_name}({param_str}) {{ {body} }}")
 
         elif isinstance(node, BranchNode):
 
@@ -88,22 +156,26 @@ class CodeGenerator:
             param_name = self.function_parameters[func_name]
 
             # Gera a condição do ramo
-            condition = f"if ({param_name} == {node.condition.value})"
+            condition = f"if ({param_name} == {self.number_literal(node.condition.value)})"
+            global_scope, global_arrays = self.scope, self.arrays
+            self.scope, self.arrays = {}, set()
             body = ' '.join([self.generate_statement(s) for s in node.body])
+            self.scope, self.arrays = global_scope, global_arrays
             if node.function_name not in self.branch_conditions:
                 self.branch_conditions[node.function_name] = []
             self.branch_conditions[node.function_name].append(f"{condition} {{ {body} }}")
+            self.branch_nodes.setdefault(node.function_name, []).append(node)
 
         elif isinstance(node, AssignNode):
             value = self.generate_expression(node.expression)
-            if isinstance(node.expression, ListNode):
-                self.code.append(f'int {node.identifier}[] = {value};')
-            elif isinstance(node.expression, StringNode):
-                self.code.append(f'const char* {self.normalize_identifier(node.identifier)} = {value};')
-            else:
-                self.code.append(f'int {self.normalize_identifier(node.identifier)} = {value};')
+            self.code.append(self.generate_declaration(node, value))
 
         elif isinstance(node, WriteNode):
+            if self.types.expression_type(node.expression, self.scope) == TYPE_INT_LIST:
+                # Uma lista é escrita elemento a elemento, como no interpretador (ex: [1, 2, 3])
+                self.print_list_used = True
+                self.code.append(f'print_list({self.generate_list_arguments(node.expression)});')
+                return
             format_str, args = self.generate_printf_args(node.expression)
             if args:
                 self.code.append(f'printf("{format_str}\\n", {args});')
@@ -124,6 +196,90 @@ class CodeGenerator:
         if node.parameters:
             self.function_parameters[node.name] = node.parameters[0]
 
+    def branch_literals(self, name: str) -> set:
+        """
+        Devolve os valores dos ramos de uma função, ou None se algum ramo não for um número inteiro.
+        """
+        literals: set = set()
+        for branch in self.branch_nodes.get(name, []):
+            value: int = integer_literal(branch.condition)
+            if value is None:
+                return None
+            literals.add(value)
+        return literals
+
+    def generate_branches(self, node: FunctionNode) -> str:
+        """
+        Gera os ramos de uma função: com opt_level 1 ou mais, um switch sobre o primeiro parâmetro quando todos os
+        ramos são números inteiros (em que cada caso retorna o valor do ramo); senão, a sequência de if.
+        """
+        if node.name not in self.branch_nodes:
+            return ''
+        if (self.opt_level < 1 or not node.parameters or not isinstance(node.parameters[0], str)
+                or self.branch_literals(node.name) is None):
+            return ' '.join(self.branch_conditions[node.name])
+
+        cases: list = []
+        seen: set = set()
+        for branch in self.branch_nodes[node.name]:
+            value: int = integer_literal(branch.condition)
+            # Como na sequência de if, o primeiro ramo com um valor é o que é usado
+            if value in seen:
+                continue
+            seen.add(value)
+            body: str = ' '.join(self.generate_statement(statement, is_last=index == len(branch.body) - 1)
+                                 for index, statement in enumerate(branch.body))
+            cases.append(f"case {self.number_literal(value)}: {{ {body} }}")
+        return f"switch ({node.parameters[0]}) {{ {' '.join(cases)} }}"
+
+    def is_integer_recursion(self, node: FunctionNode, signature) -> bool:
+        """
+        Verifica se uma definição pode ser otimizada com opt_level 2: uma função recursiva pura com um único
+        parâmetro inteiro e resultado inteiro.
+        """
+        return (node.name in self.recursive_functions and len(node.parameters) == 1
+                and isinstance(node.parameters[0], str)
+                and signature.parameters == [TYPE_INT] and signature.result == TYPE_INT)
+
+    def generate_recurrence(self, node: FunctionNode, recurrence: Recurrence, function_name: str) -> str:
+        """
+        Gera o ciclo que calcula uma recorrência para os argumentos acima dos ramos.
+        Os k valores anteriores começam nos ramos (f(start - k), ..., f(start - 1)); em cada iteração, o corpo é
+        executado com o parâmetro igual ao índice do ciclo e as chamadas f(n - d) lidas das variáveis.
+        """
+        parameter: str = node.parameters[0]
+        order: int = recurrence.order
+        start: int = recurrence.start
+        parts: list = [f"int {previous_name(offset)} = {function_name}({start - offset});"
+                       for offset in range(order, 0, -1)]
+        loop: list = [f"int {parameter} = fca_i;"]
+        loop.extend(self.generate_statement(statement) for statement in recurrence.body[:-1])
+        last: ASTNode = recurrence.body[-1]
+        result: ASTNode = last.expression if isinstance(last, ReturnNode) else last
+        loop.append(f"int fca_next = {self.generate_expression(result)};")
+        loop.extend(f"{previous_name(offset)} = {previous_name(offset - 1)};" for offset in range(order, 1, -1))
+        loop.append(f"{previous_name(1)} = fca_next;")
+        parts.append(f"for (int fca_i = {start}; fca_i <= {parameter}; fca_i++) {{ {' '.join(loop)} }}")
+        parts.append(f"return {previous_name(1)};")
+        return f"if ({parameter} >= {start}) {{ {' '.join(parts)} }}"
+
+    def add_memoized_function(self, function_name: str, parameter: str, body: str):
+        """
+        Adiciona uma função de inteiros memoizada: o corpo passa para {function_name}_body e {function_name}
+        guarda os resultados dos argumentos de 0 a MEMO_SIZE - 1 numa tabela.
+        """
+        memo: str = f"{function_name}_memo"
+        known: str = f"{function_name}_known"
+        self.functions.append(f"int {function_name}(int {parameter});")
+        self.functions.append(f"static int {memo}[{MEMO_SIZE}];")
+        self.functions.append(f"static char {known}[{MEMO_SIZE}];")
+        self.functions.append(f"int {function_name}_body(int {parameter}) {{ {body} }}")
+        self.functions.append(
+            f"int {function_name}(int {parameter}) {{ if ({parameter} >= 0 && {parameter} < {MEMO_SIZE}) {{ "
+            f"if (!{known}[{parameter}]) {{ {memo}[{parameter}] = {function_name}_body({parameter}); "
+            f"{known}[{parameter}] = 1; }} return {memo}[{parameter}]; }} "
+            f"return {function_name}_body({parameter}); }}")
+
     def generate_expression(self, node: ASTNode) -> str:
         """
         Gera a expressão correspondente ao nó fornecido na AST.
@@ -132,7 +288,7 @@ class CodeGenerator:
         :return: Uma string contendo a expressão gerada em código C.
         """
         if isinstance(node, NumberNode):
-            return str(node.value)  # Retorna o valor do nó numérico como string
+            return self.number_literal(node.value)  # Retorna o valor do nó numérico como string
 
         elif isinstance(node, IdentifierNode):
             return self.normalize_identifier(node.name)  # Normaliza e retorna o identificador
@@ -143,6 +299,8 @@ class CodeGenerator:
             if node.operator == '<>':
                 return f'{left_value} {right_value}'  # Concatenação de strings
             else:
+                if node.operator == '/':
+                    self.division_used = True
                 return f"({left_value} {node.operator} {right_value})"  # Operação binária
 
         elif isinstance(node, InterpolatedStringNode):
@@ -152,7 +310,7 @@ class CodeGenerator:
                 if isinstance(part, StringNode):
                     format_str += part.value  # Adiciona parte da string ao formato
                 elif isinstance(part, IdentifierNode):
-                    format_str += '%s'  # Adiciona marcador de string
+                    format_str += self.identifier_format(part.name)  # Adiciona o marcador do tipo da variável
                     args.append(self.normalize_identifier(part.name))  # Adiciona identificador à lista de argumentos
             return format_str, ', '.join(args)  # Retorna a string formatada e os argumentos
 
@@ -214,7 +372,7 @@ class CodeGenerator:
         """
         if isinstance(node, AssignNode):
             # Gera uma declaração de variável e atribuição
-            stmt: str = f"int {self.normalize_identifier(node.identifier)} = {self.generate_expression(node.expression)};"
+            stmt: str = self.generate_declaration(node, self.generate_expression(node.expression))
 
         elif isinstance(node, ReturnNode):
             # Gera uma instrução de retorno
@@ -272,7 +430,7 @@ class CodeGenerator:
                 if isinstance(part, StringNode):
                     format_str += part.value
                 elif isinstance(part, IdentifierNode):
-                    format_str += '%s'
+                    format_str += self.identifier_format(part.name)
                     args.append(self.normalize_identifier(part.name))
             return format_str, ', '.join(args)
 
@@ -282,15 +440,11 @@ class CodeGenerator:
 
         elif isinstance(node, IdentifierNode):
             # Identificador
-            normalized_name: str = self.normalize_identifier(node.name)
-            if self.is_string_identifier(normalized_name):
-                return "%s", normalized_name
-            else:
-                return "%d", normalized_name
+            return self.identifier_format(node.name), self.normalize_identifier(node.name)
 
         elif isinstance(node, NumberNode):
             # Número
-            return "%d", str(node.value)
+            return "%d", self.number_literal(node.value)
 
         elif isinstance(node, RandomNode):
             # Número aleatório
@@ -301,27 +455,62 @@ class CodeGenerator:
             return "%d", self.generate_expression(node)
 
         else:
-            # Expressão genérica
-            expr: str = self.generate_expression(node)
-            return "%s", expr
+            # Expressão genérica (o formato é o do tipo inferido)
+            value_type: str = self.types.expression_type(node, self.scope)
+            if value_type == TYPE_INT_LIST:
+                raise ValueError("Não é possível escrever uma lista numa expressão em C")
+            return PRINTF_FORMATS[value_type], self.generate_expression(node)
+
+    def number_literal(self, value: any) -> str:
+        """
+        Gera um número, registando se é um inteiro que não cabe num int (que o compilador de C nem sempre recusa).
+        """
+        if type(value) is int and not C_INT_MIN <= value <= C_INT_MAX:
+            self.large_constant_used = True
+        return str(value)
 
-    def is_string_identifier(self, name: str) -> bool:
+    def identifier_format(self, name: str) -> str:
         """
-        Verifica se o identificador é tratado como uma string com base na sua declaração.
+        Devolve o formato do printf de uma variável, pelo tipo que tem na tabela de símbolos.
         """
-        for stmt in self.code:
-            if f'const char* {name}' in stmt:
-                return True
-        return False
+        value_type: str = self.scope.get(name)
+        if value_type == TYPE_INT_LIST:
+            raise ValueError(f"Não é possível escrever a lista {name} numa string em C")
+        return PRINTF_FORMATS[value_type]
 
-    def is_string_function(self, name: str) -> bool:
+    def generate_list_arguments(self, node: ASTNode) -> str:
         """
-        Verifica se a função retorna uma string com base na sua definição.
+        Gera os argumentos do print_list (o vetor e o número de elementos) de uma lista escrita com ESCREVER.
+        Só as listas literais e as variáveis declaradas como vetores no âmbito atual têm um tamanho conhecido em C.
+
+        :param node: A expressão escrita (do tipo lista de inteiros).
+        :return: O código C dos dois argumentos.
+        """
+        if isinstance(node, ListNode):
+            if not node.elements:
+                return 'NULL, 0'
+            return f'(int[]){self.generate_expression(node)}, {len(node.elements)}'
+        if isinstance(node, IdentifierNode) and node.name in self.arrays:
+            name: str = self.normalize_identifier(node.name)
+            return f'{name}, sizeof({name}) / sizeof({name}[0])'
+        description: str = f"a lista {node.name}" if isinstance(node, IdentifierNode) else "uma lista"
+        raise ValueError(f"Não é possível escrever {description} em C: o número de elementos não é conhecido")
+
+    def generate_declaration(self, node: AssignNode, value: str) -> str:
+        """
+        Gera a declaração de uma variável com o tipo inferido da expressão e regista-o na tabela de símbolos.
+
+        :param node: A atribuição.
+        :param value: O código C da expressão.
         """
-        for func in self.functions:
-            if f'const char* {name}' in func:
-                return True
-        return False
+        value_type: str = self.types.expression_type(node.expression, self.scope)
+        self.scope[node.identifier] = value_type
+        name: str = self.normalize_identifier(node.identifier)
+        if value_type == TYPE_INT_LIST and isinstance(node.expression, ListNode):
+            self.arrays.add(node.identifier)
+            return f'int {name}[] = {value};'
+        self.arrays.discard(node.identifier)
+        return f'{C_TYPES[value_type]} {name} = {value};'
 
     def normalize_identifier(self, name: str) -> str:
         """
@@ -368,10 +557,10 @@ class CodeGenerator:
         Retorna:
             str: Código C completo gerado.
         """
-        # Junta as primeiras 3 linhas de código (importações), as funções geradas e o restante do código principal.
-        # A estrutura é:
-        # - self.code[:3]: Importações do cabeçalho (por exemplo, #include <stdio.h>, etc.)
-        # - self.functions: Funções definidas (por exemplo, int soma(int a, int b) { ... })
-        # - self.code[3:]: Restante do código principal (corpo da função main)
-        return '\n'.join(self.code[:3] + self.functions + self.code[3:])
+        # Junta as importações, as funções geradas e a função main. A estrutura é:
+        # - self.code[:main_index]: Importações do cabeçalho (por exemplo, #include <stdio.h>, etc.)
+        # - self.functions: Funções definidas (por exemplo, int soma(int a, int b) { ... }), fora do main
+        # - self.code[main_index:]: A função main
+        main_index: int = self.code.index("int main() {") if "int main() {" in self.code else len(self.code)
+        return '\n'.join(self.code[:main_index] + self.functions + self.code[main_index:])
 
@@ -0,0 +1,113 @@
+from ast_nodes import *
+
+# Otimizações do código C gerado para as funções recursivas puras de inteiros (CodeGenerator com opt_level 2).
+# Aplicam-se às funções com um único parâmetro inteiro, resultado inteiro, sem efeitos nem leituras de globais
+# (analysis.find_pure_functions) e que se chamam a si próprias:
+# - recorrência: quando todas as chamadas recursivas da definição normal são f(n - d), com d um número inteiro
+#   positivo, e os k valores f(t - k + 1), ..., f(t) são ramos com números (t é o maior ramo e k o maior d), f(n)
+#   para n > t é calculado num ciclo de t + 1 até n que guarda os últimos k valores. Ex: fib(n - 1) + fib(n - 2),
+#   com os ramos fib(0) e fib(1), passa de um número exponencial de chamadas a um ciclo linear;
+# - memoização: nas restantes, os resultados de f(0) a f(MEMO_SIZE - 1) são guardados numa tabela na primeira
+#   chamada, e as chamadas seguintes com o mesmo argumento devolvem o valor guardado.
+
+# Número de valores guardados na tabela de memoização de cada função
+MEMO_SIZE: int = 4096
+
+
+def previous_name(offset: int) -> str:
+    """
+    Nome da variável C que guarda f(n - offset) no ciclo de uma recorrência.
+    """
+    return f"fca_previous_{offset}"
+
+
+class Recurrence:
+    def __init__(self, order: int, start: int, body: list):
+        """
+        :param order: O número de valores anteriores usados (o maior d das chamadas f(n - d)).
+        :param start: O primeiro argumento calculado no ciclo (o maior ramo + 1).
+        :param body: O corpo da definição normal, com cada chamada f(n - d) substituída pela variável
+                     previous_name(d).
+        """
+        self.order: int = order
+        self.start: int = start
+        self.body: list = body
+
+
+def integer_literal(node: any) -> int:
+    """
+    Devolve o valor da condição de um ramo se for um número inteiro, ou None.
+    """
+    if isinstance(node, NumberNode) and type(node.value) is int:
+        return node.value
+    return None
+
+
+def find_recurrence(node: FunctionNode, literals: set) -> Recurrence:
+    """
+    Verifica se a definição normal de uma função é uma recorrência sobre o parâmetro.
+
+    :param node: A definição (com um único parâmetro).
+    :param literals: Os valores dos ramos da função.
+    :return: A Recurrence, ou None.
+    """
+    parameter: str = node.parameters[0]
+    offsets: set = set()
+    body: list = []
+    for index, statement in enumerate(node.body):
+        is_last: bool = index == len(node.body) - 1
+        if isinstance(statement, AssignNode) and not is_last and statement.identifier != parameter:
+            expression: ASTNode = rewrite_calls(statement.expression, node.name, parameter, offsets)
+            rewritten: ASTNode = AssignNode(statement.identifier, expression) if expression is not None else None
+        elif isinstance(statement, ReturnNode) and is_last:
+            expression: ASTNode = rewrite_calls(statement.expression, node.name, parameter, offsets)
+            rewritten: ASTNode = ReturnNode(expression) if expression is not None else None
+        elif isinstance(statement, ExpressionNode) and is_last:
+            rewritten: ASTNode = rewrite_calls(statement, node.name, parameter, offsets)
+        else:
+            return None
+        if rewritten is None:
+            return None
+        body.append(rewritten)
+
+    if not offsets or not literals:
+        return None
+    order: int = max(offsets)
+    top: int = max(literals)
+    # Os valores iniciais do ciclo têm de ser ramos (que não chamam a definição normal)
+    if any(top - offset not in literals for offset in range(order)):
+        return None
+    return Recurrence(order, top + 1, body)
+
+
+def rewrite_calls(node: any, name: str, parameter: str, offsets: set) -> ASTNode:
+    """
+    Copia uma expressão substituindo as chamadas name(parameter - d) pela variável previous_name(d).
+
+    :param offsets: Conjunto onde são acrescentados os valores de d encontrados.
+    :return: A expressão, ou None se tiver outra chamada à função ou nós que não sejam aritmética, números,
+             identificadores e chamadas.
+    """
+    if isinstance(node, (NumberNode, IdentifierNode)):
+        return node
+    if isinstance(node, BinOpNode):
+        left: ASTNode = rewrite_calls(node.left, name, parameter, offsets)
+        right: ASTNode = rewrite_calls(node.right, name, parameter, offsets)
+        if left is None or right is None:
+            return None
+        return BinOpNode(node.operator, left, right)
+    if isinstance(node, FunctionCallNode):
+        if node.name == name and len(node.arguments) == 1:
+            argument: ASTNode = node.arguments[0]
+            if (isinstance(argument, BinOpNode) and argument.operator == '-'
+                    and isinstance(argument.left, IdentifierNode) and argument.left.name == parameter):
+                offset: int = integer_literal(argument.right)
+                if offset is not None and offset > 0:
+                    offsets.add(offset)
+                    return IdentifierNode(previous_name(offset))
+            return None
+        arguments: list = [rewrite_calls(argument, name, parameter, offsets) for argument in node.arguments]
+        if any(argument is None for argument in arguments):
+            return None
+        return FunctionCallNode(node.name, arguments)
+    return None
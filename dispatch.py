@@ -0,0 +1,156 @@
+from ast_nodes import *
+from list_view import LIST_TYPES
+
+# Tabelas de despacho das funções.
+# Todas as definições de uma função com o mesmo nome (ramos e definições normais) são organizadas
+# numa FunctionDispatch quando são definidas, para que escolher a definição a executar numa chamada
+# custe O(1), independentemente do número de cláusulas:
+# - ramos numéricos (ex: fib(0)) num dicionário literal -> cláusula;
+# - o ramo da lista vazia (ex: somatorio([])) numa verificação direta;
+# - os padrões de lista constantes (ex: f([1, 2])) num dicionário número de elementos -> {tuplo dos valores ->
+#   cláusula}, e só os que têm de ser avaliados em cada chamada (ex: f([x])) numa procura linear;
+# - as definições normais num dicionário número de parâmetros -> cláusula.
+
+# Tipos de cláusula
+CLAUSE_NORMAL = 0
+CLAUSE_NUMBER = 1
+CLAUSE_LIST = 2
+
+
+class Clause:
+    def __init__(self, kind: int, body: any, parameters: list = None, pattern: any = None):
+        """
+        Uma definição de uma função.
+
+        :param kind: CLAUSE_NORMAL, CLAUSE_NUMBER ou CLAUSE_LIST.
+        :param body: O corpo a executar (lista de instruções da AST ou CodeObject da VM).
+        :param parameters: Os parâmetros (só nas definições normais).
+        :param pattern: O literal com que o argumento é comparado (só nos ramos).
+        """
+        self.kind: int = kind
+        self.body: any = body
+        self.parameters: list = parameters
+        self.pattern: any = pattern
+
+
+class FunctionDispatch:
+    def __init__(self, name: str):
+        self.name: str = name
+        self.number_branches: dict = {}
+        self.empty_list_branch: Clause = None
+        # Padrões de lista constantes não vazios: número de elementos -> {list_key(valores) -> (ordem, cláusula)}
+        self.constant_list_branches: dict = {}
+        # Padrões de lista que têm de ser avaliados: (ordem, nós a avaliar, cláusula)
+        self.dynamic_list_branches: list = []
+        # Número de padrões de lista não vazios já registados (a ordem decide qual vale quando vários correspondem)
+        self.list_branch_count: int = 0
+        self.normals: dict = {}
+        self.has_branches: bool = False
+
+    def add_number_branch(self, value: int, clause: Clause):
+        # Se houver dois ramos com o mesmo literal, vale o primeiro (como na procura linear)
+        if value not in self.number_branches:
+            self.number_branches[value] = clause
+        self.has_branches = True
+
+    def add_list_branch(self, elements: list, clause: Clause, constant: bool = True):
+        """
+        :param elements: Os valores do padrão (ou os nós das expressões, se não forem constantes).
+        :param constant: False se os elementos tiverem de ser avaliados em cada chamada.
+        """
+        if not elements:
+            if self.empty_list_branch is None:
+                self.empty_list_branch = clause
+        elif constant:
+            self.constant_list_branches.setdefault(len(elements), {}).setdefault(list_key(elements),
+                                                                                 (self.list_branch_count, clause))
+        else:
+            self.dynamic_list_branches.append((self.list_branch_count, elements, clause))
+        self.list_branch_count += 1
+        self.has_branches = True
+
+    def add_branch(self, condition: ASTNode, body: list):
+        """
+        Regista um ramo definido por um BranchNode, pré-calculando o padrão.
+        Condições que não são números nem listas nunca correspondem a um argumento e são ignoradas.
+        """
+        if isinstance(condition, ListNode):
+            elements: list = condition.elements
+            if all(is_literal(element) for element in elements):
+                values: list = [literal_value(element) for element in elements]
+                self.add_list_branch(values, Clause(CLAUSE_LIST, body, pattern=values))
+            else:
+                self.add_list_branch(elements, Clause(CLAUSE_LIST, body, pattern=condition), constant=False)
+
+        elif isinstance(condition, NumberNode) and isinstance(condition.value, int):
+            self.add_number_branch(condition.value, Clause(CLAUSE_NUMBER, body, pattern=condition.value))
+
+    def define_normal(self, parameters: list, body: any):
+        """
+        Adiciona ou substitui a definição normal com este número de parâmetros.
+        """
+        self.normals[len(parameters)] = Clause(CLAUSE_NORMAL, body, parameters=parameters)
+
+    def resolve(self, arg_values: list, evaluate=None) -> Clause:
+        """
+        Escolhe a cláusula a executar para os argumentos dados.
+        Os ramos têm prioridade sobre as definições normais.
+
+        :param arg_values: Os valores dos argumentos.
+        :param evaluate: Função que avalia um nó da AST (para padrões de lista não constantes).
+        :return: A cláusula, ou None se nenhuma corresponder.
+        """
+        if self.has_branches and arg_values:
+            arg_value: any = arg_values[0]
+            if isinstance(arg_value, int):
+                clause: Clause = self.number_branches.get(arg_value)
+                if clause is not None:
+                    return clause
+            elif isinstance(arg_value, LIST_TYPES):
+                if not arg_value and self.empty_list_branch is not None:
+                    return self.empty_list_branch
+                order: int = self.list_branch_count
+                constant_clause: Clause = None
+                same_length: dict = self.constant_list_branches.get(len(arg_value))
+                if same_length is not None:
+                    try:
+                        order, constant_clause = same_length.get(list_key(arg_value), (order, None))
+                    except TypeError:
+                        # Um valor sem hash nunca é igual a um padrão constante
+                        pass
+                # Um padrão avaliado só vale se tiver sido definido antes do padrão constante que corresponde
+                for branch_order, elements, clause in self.dynamic_list_branches:
+                    if branch_order > order:
+                        break
+                    if arg_value == [evaluate(element) for element in elements]:
+                        return clause
+                if constant_clause is not None:
+                    return constant_clause
+        return self.normals.get(len(arg_values))
+
+
+def list_key(values: any) -> any:
+    """
+    Converte uma lista (e as listas dentro dela) num tuplo, para poder ser chave de um dicionário.
+    Duas listas são iguais (==) se e só se as chaves forem iguais.
+    """
+    if isinstance(values, LIST_TYPES):
+        return tuple(list_key(value) for value in values)
+    return values
+
+
+def is_literal(node: ASTNode) -> bool:
+    if isinstance(node, (NumberNode, StringNode)):
+        return True
+    if isinstance(node, ListNode):
+        return all(is_literal(element) for element in node.elements)
+    return False
+
+
+def literal_value(node: ASTNode) -> any:
+    """
+    Converte um nó literal (número, string ou lista de literais) no seu valor.
+    """
+    if isinstance(node, ListNode):
+        return [literal_value(element) for element in node.elements]
+    return node.value
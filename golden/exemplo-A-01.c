@@ -0,0 +1,8 @@
+#include <stdio.h>
+#include <stdlib.h>
+int main() {
+int a1_ = -65520;
+printf("%d\n", a1_);
+printf("%d\n", rand() % 10);
+return 0;
+}
\ No newline at end of file
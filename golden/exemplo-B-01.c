@@ -0,0 +1,11 @@
+#include <stdio.h>
+#include <stdlib.h>
+int main() {
+int valor = 5;
+printf("%d\n", valor);
+printf("%d\n", 730);
+printf("Ola Mundo\n");
+const char* curso = "ESI";
+printf("Olá, %s\n", curso);
+return 0;
+}
\ No newline at end of file
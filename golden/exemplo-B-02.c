@@ -0,0 +1,8 @@
+#include <stdio.h>
+#include <stdlib.h>
+int main() {
+const char* escola = "EST";
+const char* inst = "IPCA";
+printf("Olá, %s %s!\n", escola, inst);
+return 0;
+}
\ No newline at end of file
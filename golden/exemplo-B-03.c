@@ -0,0 +1,9 @@
+#include <stdio.h>
+#include <stdlib.h>
+int main() {
+printf("Insere limite superior para um numero random.\n");
+int valor = scanf("%d", &input);
+int ate10 = rand() % valor;
+printf("%d\n", ate10);
+return 0;
+}
\ No newline at end of file
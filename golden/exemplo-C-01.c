@@ -0,0 +1,11 @@
+#include <stdio.h>
+#include <stdlib.h>
+int soma_2(int a, int b) { return (a + b); }
+int soma2_1(int c) { int c = (c + 1);; return (c + 1); }
+int main() {
+int seis = 6;
+int oito = soma2_1(seis);
+printf("%d\n", seis);
+printf("%d\n", oito);
+return 0;
+}
\ No newline at end of file
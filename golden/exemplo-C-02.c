@@ -0,0 +1,11 @@
+#include <stdio.h>
+#include <stdlib.h>
+int area_retangulo_2(int a, int b) { return (a * b); }
+int area_quadrado_1(int a) { return (a * a); }
+int main() {
+int a = 200;
+int b = 900;
+printf("%d\n", a);
+printf("%d\n", b);
+return 0;
+}
\ No newline at end of file
@@ -0,0 +1,11 @@
+#include <stdio.h>
+#include <stdlib.h>
+int area_2(int a, int b) { return (a * b); }
+int area_1(int c) { return (c * c); }
+int main() {
+int d = 200;
+int e = 900;
+printf("%d\n", d);
+printf("%d\n", e);
+return 0;
+}
\ No newline at end of file
@@ -0,0 +1,8 @@
+#include <stdio.h>
+#include <stdlib.h>
+int fib_1(int n) { switch (n) { case 0: { return 0; } case 1: { return 1; } } if (n >= 2) { int fca_previous_2 = fib_1(0); int fca_previous_1 = fib_1(1); for (int fca_i = 2; fca_i <= n; fca_i++) { int n = fca_i; int a = fca_previous_1;; int b = fca_previous_2;; int fca_next = (a + b); fca_previous_2 = fca_previous_1; fca_previous_1 = fca_next; } return fca_previous_1; } int a = fib_1((n - 1));; int b = fib_1((n - 2));; return (a + b); }
+int main() {
+int fib5 = fib_1(5);
+printf("%d\n", fib5);
+return 0;
+}
\ No newline at end of file
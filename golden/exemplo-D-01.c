@@ -0,0 +1,14 @@
+#include <stdio.h>
+#include <stdlib.h>
+void print_list(const int *arr, int size) {
+    printf("[");
+    for (int i = 0; i < size; i++) {
+        printf(i ? ", %d" : "%d", arr[i]);
+    }
+    printf("]\n");
+}
+int main() {
+int lista[] = { 1, 2, 3 };
+print_list(lista, sizeof(lista) / sizeof(lista[0]));
+return 0;
+}
\ No newline at end of file
@@ -0,0 +1 @@
+Erro: ValueError: Unknown expression type: <class 'str'>
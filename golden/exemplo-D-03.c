@@ -0,0 +1 @@
+Erro: AttributeError: 'ListNode' object has no attribute 'value'
@@ -1,12 +1,106 @@
 import random
 from ast_nodes import *
+from analysis import find_pure_functions
+from closure_compiler import ClosureCompiler
+from dispatch import Clause, FunctionDispatch
+from list_view import LIST_TYPES, ListView, list_tail
+from memo import MemoCache, MISSING, make_key
+from parallel import NOT_PARALLEL, ParallelMap
+from profiler import CallProfiler
+from vectorize import NOT_VECTORIZED, Vectorizer, numpy_installed
 
 class Interpreter:
-    def __init__(self):
+    def __init__(self, use_closures: bool = False, memoize: bool = False, memo_size: int = 4096,
+                 profile: bool = False, count_operations: bool = False, vectorize: bool = True,
+                 parallel_workers: int = 0, parallel_min_size: int = 256):
+        """
+        Inicializa o interpretador.
+
+        :param use_closures: Se True, as expressões e os corpos das funções são compilados uma única vez
+                             em closures (ClosureCompiler) em vez de serem percorridos em cada avaliação.
+        :param memoize: Se True, os resultados das funções puras são guardados numa cache.
+        :param memo_size: Número máximo de resultados na cache de memoização.
+        :param profile: Se True, as chamadas de cada cláusula das funções são medidas (self.profiler).
+        :param count_operations: Se True, as chamadas de funções e as operações binárias são contadas
+                                 (self.counters).
+        :param vectorize: Se True (e o numpy estiver instalado), o map e o fold sobre funções aritméticas
+                          simples são executados com o numpy (vectorize.py). Não é usado com profile ou
+                          count_operations, que têm de ver todas as chamadas.
+        :param parallel_workers: Número de processos do map paralelo sobre funções puras (parallel.py);
+                                 0 ou 1 desativa-o. Também não é usado com profile ou count_operations.
+        :param parallel_min_size: Número mínimo de elementos para o map ser paralelo.
+        """
         # Tabela de símbolos para armazenar variáveis globais
         self.global_env: dict = {}
-        # Dicionário de funções definidas
+        # Dicionário de funções definidas (nome -> FunctionDispatch)
         self.functions: dict = {}
+        # Operadores binários (construído uma única vez, e não em cada operação)
+        self.operators: dict = {
+            '+': lambda x, y: x + y,
+            '-': lambda x, y: x - y,
+            '*': lambda x, y: x * y,
+            '/': self.safe_divide,
+            '<>': lambda x, y: str(x) + str(y)
+        }
+
+        # Tabela de despacho das expressões (NodeKind -> método que avalia o nó)
+        self.expression_handlers: list = [None] * len(NodeKind)
+        self.expression_handlers[NodeKind.NUMBER] = self.evaluate_literal
+        self.expression_handlers[NodeKind.STRING] = self.evaluate_literal
+        self.expression_handlers[NodeKind.BINOP] = self.evaluate_binop
+        self.expression_handlers[NodeKind.IDENTIFIER] = self.evaluate_identifier
+        self.expression_handlers[NodeKind.FUNCTION_CALL] = self.call_function
+        self.expression_handlers[NodeKind.WRITE] = self.evaluate_write
+        self.expression_handlers[NodeKind.INTERPOLATED_STRING] = self.evaluate_interpolated_string
+        self.expression_handlers[NodeKind.INPUT] = self.evaluate_input
+        self.expression_handlers[NodeKind.RANDOM] = self.evaluate_random
+        self.expression_handlers[NodeKind.LIST] = self.evaluate_list
+        self.expression_handlers[NodeKind.MAP] = self.evaluate_map
+        self.expression_handlers[NodeKind.FOLD] = self.evaluate_fold
+
+        # Cache de memoização e funções puras do programa (calculadas em interpret)
+        self.memo: MemoCache = None
+        self.pure_functions: set = set()
+        # Execução de uma chamada sem a cache (medida pelo profiler com --profile)
+        self.invoke_uncached = self.invoke_function
+        self.profiler: CallProfiler = None
+        if profile:
+            self.profiler = CallProfiler()
+            self.invoke_uncached = self.invoke_function = self.invoke_profiled
+        if memoize:
+            self.memo = MemoCache(memo_size)
+            self.invoke_function = self.invoke_memoized
+
+        # Contadores das chamadas (incluindo as lidas da cache) e das operações binárias (--timings)
+        self.counters: dict = None
+        if count_operations:
+            self.counters = {'calls': 0, 'operations': 0}
+            self.invoke_uncounted = self.invoke_function
+            self.invoke_function = self.invoke_counted
+            self.apply_operator = self.apply_operator_counted
+
+        # map paralelo (precisa das funções puras, calculadas em interpret mesmo sem memoização)
+        self.parallel_map: ParallelMap = None
+        if parallel_workers > 1 and not profile and not count_operations:
+            options: dict = {'use_closures': use_closures, 'memoize': memoize, 'memo_size': memo_size,
+                             'vectorize': vectorize}
+            self.parallel_map = ParallelMap(self, parallel_workers, options, parallel_min_size)
+            self.map_list = self.map_parallel
+
+        # Vetorização do map e do fold (só se o numpy estiver instalado, para não mudar os handlers sem necessidade)
+        self.vectorizer: Vectorizer = None
+        if vectorize and not profile and not count_operations and numpy_installed():
+            self.vectorizer = Vectorizer()
+            self.map_unvectorized = self.map_list
+            self.map_list = self.map_vectorized
+            self.expression_handlers[NodeKind.FOLD] = self.evaluate_fold_vectorized
+
+        if use_closures:
+            # Os métodos são substituídos nesta instância pelas versões compiladas
+            self.closure_compiler = ClosureCompiler(self)
+            self.evaluate_expression = self.closure_compiler.evaluate
+            self.execute_function_body = self.closure_compiler.execute_body
+            self.release = self.closure_compiler.release
 
     def interpret(self, node: ASTNode, env: dict = None) -> any:
         """
@@ -20,32 +114,19 @@ class Interpreter:
             env = self.global_env
 
         if isinstance(node, ProgramNode):
+            if self.memo is not None or self.parallel_map is not None:
+                self.pure_functions = find_pure_functions(node)
             for statement in node.statements:
                 self.interpret(statement, env)
 
         elif isinstance(node, FunctionNode):
-            func_name: str = node.name
-            param_count: int = len(node.parameters)
-            if func_name not in self.functions:
-                self.functions[node.name] = []
-
-            # Remover qualquer definição normal anterior que tenha o mesmo número de parâmetros que esta
-            new_function_list: list = []
-            for entry in self.functions[func_name]:
-                entry_type, entry_params, _ = entry
-                if not (entry_type == 'normal' and len(entry_params) == param_count):
-                    new_function_list.append(entry)
-
-            self.functions[func_name] = new_function_list
-
-            # Adicionar ou substituir a definição normal da função
-            self.functions[func_name].append(('normal', node.parameters, node.body))
+            # Adicionar ou substituir a definição normal da função com o mesmo número de parâmetros
+            self.get_dispatch(node.name).define_normal(node.parameters, node.body)
+            self.invalidate_memo()
 
         elif isinstance(node, BranchNode):
-            func_name: str = node.function_name
-            if func_name not in self.functions:
-                self.functions[func_name] = []
-            self.functions[func_name].append(('branch', node.condition, node.body))
+            self.get_dispatch(node.function_name).add_branch(node.condition, node.body)
+            self.invalidate_memo()
 
         elif isinstance(node, AssignNode):
             value: any = self.evaluate_expression(node.expression, env)
@@ -68,155 +149,275 @@ class Interpreter:
         else:
             raise ValueError(f"Tipo desconhecido: {type(node)}")
 
+    def interpret_stream(self, statements):
+        """
+        Executa as instruções do nível de topo à medida que são produzidas (ex: por PrattParser.parse_file),
+        sem precisar do programa completo: cada instrução pode ser libertada depois de executada.
+        Com memoização (ou com o map paralelo), as funções puras são calculadas com as definições lidas até ao momento,
+        antes de cada instrução que se segue a uma nova definição.
+
+        :param statements: Iterável com as instruções do programa.
+        """
+        definitions: list = []
+        changed: bool = False
+        for statement in statements:
+            if isinstance(statement, (FunctionNode, BranchNode)):
+                if self.memo is not None or self.parallel_map is not None:
+                    definitions.append(statement)
+                    changed = True
+            elif changed:
+                self.pure_functions = find_pure_functions(ProgramNode(definitions))
+                changed = False
+            self.interpret(statement)
+            self.release(statement)
+
+    def release(self, statement: ASTNode):
+        """
+        Liberta o que foi guardado para executar uma instrução do nível de topo que não volta a ser executada.
+        Sem closures não há nada a libertar.
+        """
+
     def evaluate_expression(self, node: ASTNode, env: dict) -> any:
         """
         Avalia a expressão fornecida.
+        O método que avalia cada tipo de nó é escolhido pela tabela expression_handlers, indexada por node.kind.
 
         :param node: O nó da expressão a ser avaliada.
         :param env: O ambiente (contexto) de execução atual.
         :return: O valor da expressão avaliada.
         """
-        if isinstance(node, NumberNode):
-            return node.value
-
-        elif isinstance(node, int):
+        if type(node) is int:
             return node
+        handler = self.expression_handlers[node.kind] if isinstance(node, ASTNode) else None
+        if handler is None:
+            raise ValueError(f"Unknown expression type: {type(node)}")
+        return handler(node, env)
 
-        elif isinstance(node, BinOpNode):
-            left: any = self.evaluate_expression(node.left, env)
-            right: any = self.evaluate_expression(node.right, env)
-            result: any = self.apply_operator(node.operator, left, right)
-            return result
+    def evaluate_literal(self, node: ASTNode, env: dict) -> any:
+        return node.value
 
-        elif isinstance(node, IdentifierNode):
-            value: any = env.get(node.name, None)
-            if value is None:
-                raise ValueError(f"Variável não encontrada: {node.name}")
-            return value
+    def evaluate_binop(self, node: BinOpNode, env: dict) -> any:
+        left: any = self.evaluate_expression(node.left, env)
+        right: any = self.evaluate_expression(node.right, env)
+        return self.apply_operator(node.operator, left, right)
 
-        elif isinstance(node, FunctionCallNode):
-            return self.call_function(node, env)
+    def evaluate_identifier(self, node: IdentifierNode, env: dict) -> any:
+        # Uma local com o valor None (a cabeça de uma lista vazia) não tem valor, mas esconde a global
+        if node.name in env:
+            value: any = env[node.name]
+        else:
+            # Não é uma variável local: procura nas variáveis globais
+            value = self.global_env.get(node.name)
+        if value is None:
+            raise ValueError(f"Variável não encontrada: {node.name}")
+        return value
+
+    def evaluate_write(self, node: WriteNode, env: dict) -> any:
+        return self.evaluate_expression(node.expression, env)
+
+    def evaluate_interpolated_string(self, node: InterpolatedStringNode, env: dict) -> str:
+        parts: list = []
+        for part in node.parts:
+            if isinstance(part, StringNode):
+                parts.append(part.value)
+            elif isinstance(part, IdentifierNode):
+                parts.append(str(self.lookup_variable(part.name, env, "")))
+        return ''.join(parts)
+
+    def evaluate_input(self, node: InputNode, env: dict) -> any:
+        user_input: str = input()
+        if user_input.isnumeric():
+            return int(user_input)
+        return user_input
+
+    def evaluate_random(self, node: RandomNode, env: dict) -> int:
+        return random.randint(0, self.evaluate_expression(node.upper_limit, env))
+
+    def evaluate_list(self, node: ListNode, env: dict) -> list:
+        return [self.evaluate_expression(element, env) for element in node.elements]
+
+    def evaluate_map(self, node: MapNode, env: dict) -> list:
+        list_value: list = self.evaluate_expression(node.list_node, env)
+        return self.map_list(node.function, list_value)
+
+    def map_list(self, name: str, list_value: list) -> list:
+        """
+        Aplica a função a cada elemento da lista (substituído por map_vectorized/map_parallel quando estão ativos).
+        """
+        return [self.invoke_function(name, [element]) for element in list_value]
 
-        elif isinstance(node, StringNode):
-            return node.value
+    def evaluate_fold(self, node: FoldNode, env: dict) -> any:
+        result: any = self.evaluate_expression(node.initial_value, env)
+        list_value: list = self.evaluate_expression(node.list_node, env)
+        for element in list_value:
+            result = self.invoke_function(node.function, [result, element])
+        return result
 
-        elif isinstance(node, WriteNode):
-            return self.evaluate_expression(node.expression, env)
+    def map_vectorized(self, name: str, list_value: list) -> list:
+        """
+        Versão de map_list usada com a vetorização: tenta aplicar a função com o numpy e, se não for possível,
+        usa o map anterior (paralelo ou sequencial).
+        """
+        result: any = self.vectorizer.map(self.functions.get(name), list_value)
+        if result is NOT_VECTORIZED:
+            return self.map_unvectorized(name, list_value)
+        return result
 
-        elif isinstance(node, InterpolatedStringNode):
-            parts: list = []
-            for part in node.parts:
-                if isinstance(part, StringNode):
-                    parts.append(part.value)
-                elif isinstance(part, IdentifierNode):
-                    parts.append(str(env.get(part.name, "")))
-            return ''.join(parts)
-
-        elif isinstance(node, InputNode):
-            user_input: str = input()
-            if user_input.isnumeric():
-                return int(user_input)
-            return user_input
-
-        elif isinstance(node, RandomNode):
-            return random.randint(0, self.evaluate_expression(node.upper_limit, env))
-
-        elif isinstance(node, ListNode):
-            return [self.evaluate_expression(element, env) for element in node.elements]
-
-        elif isinstance(node, MapNode):
-            list_value: list = self.evaluate_expression(node.list_node, env)
-            return [self.call_function(FunctionCallNode(node.function, [element]), env) for element in list_value]
-
-        elif isinstance(node, FoldNode):
-            result: any = self.evaluate_expression(node.initial_value, env)
-            list_value: list = self.evaluate_expression(node.list_node, env)
-            for element in list_value:
-                result = self.call_function(FunctionCallNode(node.function, [result, element]), env)
-            return result
+    def map_parallel(self, name: str, list_value: list) -> list:
+        """
+        Versão de map_list usada com o map paralelo: divide as listas grandes pelos processos se a função for pura.
+        """
+        result: any = self.parallel_map.map(name, list_value)
+        if result is NOT_PARALLEL:
+            return Interpreter.map_list(self, name, list_value)
+        return result
 
-        else:
-            raise ValueError(f"Unknown expression type: {type(node)}")
+    def evaluate_fold_vectorized(self, node: FoldNode, env: dict) -> any:
+        """
+        Versão de evaluate_fold usada com a vetorização (soma do numpy ou produto exato, se possível).
+        """
+        result: any = self.evaluate_expression(node.initial_value, env)
+        list_value: list = self.evaluate_expression(node.list_node, env)
+        vectorized: any = self.vectorizer.fold(self.functions.get(node.function), list_value, result)
+        if vectorized is not NOT_VECTORIZED:
+            return vectorized
+        for element in list_value:
+            result = self.invoke_function(node.function, [result, element])
+        return result
 
     def call_function(self, node: FunctionCallNode, env: dict) -> any:
         """
         Chama a função com o nome e argumentos fornecidos.
+        Os argumentos são avaliados uma única vez, no ambiente de quem chama.
 
         :param node: O nó da chamada de função.
         :param env: O ambiente (contexto) de execução atual.
         :return: O valor retornado pela função.
         """
-        func_list: list = self.functions.get(node.name)
-        if func_list is None:
-            raise ValueError(f"Função não definida: {node.name}")
-
-        # Verificar ramos (BranchNode) primeiro
-        if isinstance(func_list, list) and len(func_list) > 0:
-            for func_data in func_list:
-                func_type: str = func_data[0]
-                if func_type == 'branch':
-                    condition: ASTNode = func_data[1]
-                    body: list = func_data[2]
-                    arg_value: any = self.evaluate_expression(node.arguments[0], env)
-
-                    # Verificar se o padrão de lista condiz com o argumento
-                    if isinstance(condition, ListNode):
-                        if not condition.elements and isinstance(arg_value, list) and not arg_value:
-                            # Caso da lista vazia
-                            local_env: dict = env.copy()
-                            result: any = self.execute_function_body(body, local_env)
-                            return result
-                        elif arg_value == [self.evaluate_expression(e, env) for e in condition.elements]:
-                            # Caso de listas iguais
-                            local_env: dict = env.copy()
-                            result: any = self.execute_function_body(body, local_env)
-                            return result
-
-                    elif isinstance(condition, NumberNode) and isinstance(arg_value, int):
-                        if condition.value == arg_value:
-                            local_env: dict = self.create_local_env([condition], [arg_value], env)
-                            result: any = self.execute_function_body(body, local_env)
-                            return result
-
-        # Verificar a função normal
-        for func_type, params, body in func_list:
-            if func_type == 'normal':
-                if self.match_normal_function(params, node.arguments):
-                    local_env: dict = self.create_local_env(params, node.arguments, env)
-                    result: any = self.execute_function_body(body, local_env)
-                    return result
-
-        raise ValueError(f"Função {node.name} com {len(node.arguments)} argumentos e condição correspondente não definida")
-
-    def match_normal_function(self, params: list, arguments: list) -> bool:
-        """
-        Verifica se a função normal pode ser chamada com os argumentos fornecidos.
+        arg_values: list = [self.evaluate_expression(argument, env) for argument in node.arguments]
+        return self.invoke_function(node.name, arg_values)
 
-        :param params: Lista de parâmetros da função.
-        :param arguments: Lista de argumentos fornecidos na chamada da função.
-        :return: True se o número de parâmetros e argumentos coincidir, caso contrário False.
+    def invoke_function(self, name: str, arg_values: list) -> any:
         """
-        return len(params) == len(arguments)
+        Executa a função com os argumentos já avaliados.
+        Cada chamada tem o seu próprio ambiente local, que só contém os parâmetros e as variáveis
+        atribuídas no corpo; as restantes variáveis são procuradas nas globais.
+        Assim o custo de uma chamada é proporcional ao número de parâmetros e não ao tamanho do ambiente.
 
-    def create_local_env(self, params: list, arguments: list, env: dict) -> dict:
+        :param name: O nome da função.
+        :param arg_values: Os valores dos argumentos.
+        :return: O valor retornado pela função.
         """
-        Cria um ambiente local para a função chamada.
+        dispatch: FunctionDispatch = self.functions.get(name)
+        if dispatch is None:
+            raise ValueError(f"Função não definida: {name}")
+
+        # Os ramos (BranchNode) têm prioridade sobre a definição normal
+        clause: Clause = dispatch.resolve(arg_values, self.evaluate_global)
+        if clause is None:
+            raise ValueError(f"Função {name} com {len(arg_values)} argumentos e condição correspondente não definida")
+
+        if clause.parameters is None:
+            # Ramo: não há parâmetros a associar
+            return self.execute_function_body(clause.body, {})
+        return self.execute_function_body(clause.body, self.create_local_env(clause.parameters, arg_values))
+
+    def invoke_profiled(self, name: str, arg_values: list) -> any:
+        """
+        Versão de invoke_function usada com --profile: a execução da cláusula escolhida é medida pelo profiler.
+        É uma cópia de invoke_function (e não um wrapper) para que o caminho normal das chamadas não tenha
+        nenhum teste adicional quando o profiler está desligado.
+
+        :param name: O nome da função.
+        :param arg_values: Os valores dos argumentos.
+        :return: O valor retornado pela função.
+        """
+        dispatch: FunctionDispatch = self.functions.get(name)
+        if dispatch is None:
+            raise ValueError(f"Função não definida: {name}")
+
+        clause: Clause = dispatch.resolve(arg_values, self.evaluate_global)
+        if clause is None:
+            raise ValueError(f"Função {name} com {len(arg_values)} argumentos e condição correspondente não definida")
+
+        frame: list = self.profiler.enter(name, len(arg_values), clause)
+        try:
+            if clause.parameters is None:
+                return self.execute_function_body(clause.body, {})
+            return self.execute_function_body(clause.body, self.create_local_env(clause.parameters, arg_values))
+        finally:
+            self.profiler.exit(frame)
+
+    def get_dispatch(self, name: str) -> FunctionDispatch:
+        """
+        Devolve a tabela de despacho da função com o nome dado, criando-a se ainda não existir.
+        """
+        if name not in self.functions:
+            self.functions[name] = FunctionDispatch(name)
+        return self.functions[name]
+
+    def evaluate_global(self, node: ASTNode) -> any:
+        """
+        Avalia uma expressão no ambiente global (usado pelos padrões de lista não constantes).
+        """
+        return self.evaluate_expression(node, self.global_env)
+
+    def invoke_memoized(self, name: str, arg_values: list) -> any:
+        """
+        Versão de invoke_function usada com memoização: o resultado de uma função pura é procurado na
+        cache antes de executar a função.
+
+        :param name: O nome da função.
+        :param arg_values: Os valores dos argumentos.
+        :return: O valor retornado pela função.
+        """
+        if name not in self.pure_functions:
+            return self.invoke_uncached(name, arg_values)
+
+        key: tuple = make_key(name, arg_values)
+        if key is None:
+            return self.invoke_uncached(name, arg_values)
+        result: any = self.memo.get(key)
+        if result is MISSING:
+            result = self.invoke_uncached(name, arg_values)
+            self.memo.put(key, result)
+        return result
+
+    def invoke_counted(self, name: str, arg_values: list) -> any:
+        """
+        Versão de invoke_function usada com count_operations: conta a chamada e executa-a.
+        """
+        self.counters['calls'] += 1
+        return self.invoke_uncounted(name, arg_values)
+
+    def invalidate_memo(self):
+        """
+        Limpa a cache de memoização quando uma função é (re)definida,
+        pois os resultados guardados podem depender da definição antiga.
+        Pela mesma razão termina os processos do map paralelo, que têm a tabela de funções antiga.
+        """
+        if self.memo is not None:
+            self.memo.clear()
+        if self.parallel_map is not None:
+            self.parallel_map.close()
+
+    def create_local_env(self, params: list, arg_values: list) -> dict:
+        """
+        Cria o ambiente local para a função chamada, apenas com os parâmetros.
 
         :param params: Lista de parâmetros da função.
-        :param arguments: Lista de argumentos fornecidos na chamada da função.
-        :param env: O ambiente (contexto) de execução atual.
+        :param arg_values: Valores (já avaliados) dos argumentos.
         :return: O ambiente local criado.
         """
-        local_env: dict = env.copy()
-        for param, arg in zip(params, arguments):
+        local_env: dict = {}
+        for param, arg_value in zip(params, arg_values):
             if isinstance(param, ListPatternNode):
-                # Avaliar o argumento para garantir que é uma lista
-                arg_value: list = self.evaluate_expression(arg, local_env)
-                if isinstance(arg_value, list):
+                if isinstance(arg_value, LIST_TYPES):
                     if arg_value:  # Verifica se a lista não está vazia
-                        # Extrai o valor da cabeça e da cauda da lista
+                        # Extrai o valor da cabeça e da cauda da lista.
+                        # A cauda é uma vista sobre a mesma lista (O(1)) e não uma cópia.
                         head_val: any = arg_value[0]
-                        tail_val: list = arg_value[1:] if len(arg_value) > 1 else []
+                        tail_val: ListView = list_tail(arg_value)
                     else:
                         # Se a lista estiver vazia, atribui valores apropriados
                         head_val: any = None
@@ -228,9 +429,22 @@ class Interpreter:
                     raise ValueError(f"Argumento para ListPatternNode não é uma lista: {arg_value}")
             else:
                 # Atribui o valor do argumento ao parâmetro correspondente
-                local_env[param] = self.evaluate_expression(arg, local_env)
+                local_env[param] = arg_value
         return local_env
 
+    def lookup_variable(self, name: str, env: dict, default: any = None) -> any:
+        """
+        Procura uma variável no ambiente local e, se não existir, nas variáveis globais.
+
+        :param name: Nome da variável.
+        :param env: O ambiente (contexto) de execução atual.
+        :param default: Valor devolvido se a variável não existir.
+        :return: O valor da variável.
+        """
+        if name in env:
+            return env[name]
+        return self.global_env.get(name, default)
+
     def execute_function_body(self, body: list, env: dict) -> any:
         """
         Executa o corpo da função.
@@ -272,18 +486,17 @@ class Interpreter:
         :param right: Operando direito.
         :return: O resultado da operação.
         """
-        operators: dict = {
-            '+': lambda x, y: x + y,
-            '-': lambda x, y: x - y,
-            '*': lambda x, y: x * y,
-            '/': self.safe_divide,
-            '<>': lambda x, y: str(x) + str(y)
-        }
-
-        if operator in operators:
-            return operators[operator](left, right)
-        else:
+        function = self.operators.get(operator)
+        if function is None:
             raise ValueError(f"Operador desconhecido: {operator}")
+        return function(left, right)
+
+    def apply_operator_counted(self, operator: str, left: any, right: any) -> any:
+        """
+        Versão de apply_operator usada com count_operations: conta a operação e aplica-a.
+        """
+        self.counters['operations'] += 1
+        return Interpreter.apply_operator(self, operator, left, right)
 
     def safe_divide(self, left: any, right: any) -> float:
         """
@@ -0,0 +1,82 @@
+# Vista sobre uma lista FCA a partir de uma posição, sem copiar os elementos.
+# É usada para a cauda dos padrões x:xs: em vez de arg_value[1:] (que copia a cauda em cada passo e torna
+# uma recursão sobre n elementos O(n²)), a cauda é uma ListView que partilha a lista original e custa O(1).
+# Para o resto do programa comporta-se como uma lista: ESCREVER mostra o mesmo texto, compara-se por igualdade
+# com listas e pode ser percorrida pelo map e pelo fold.
+# As listas FCA nunca são alteradas depois de criadas, por isso a partilha é segura.
+
+
+class ListView:
+    __slots__ = ('items', 'start')
+
+    def __init__(self, items: list, start: int = 0):
+        """
+        :param items: A lista partilhada.
+        :param start: A posição do primeiro elemento da vista.
+        """
+        self.items: list = items
+        self.start: int = start
+
+    def __len__(self) -> int:
+        return len(self.items) - self.start
+
+    def __bool__(self) -> bool:
+        return self.start < len(self.items)
+
+    def __iter__(self):
+        if self.start:
+            return map(self.items.__getitem__, range(self.start, len(self.items)))
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return self.items[self.start + index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, ListView)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __add__(self, other):
+        if isinstance(other, (list, ListView)):
+            return self.to_list() + list(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, list):
+            return other + self.to_list()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.to_list())
+
+    __str__ = __repr__
+
+    def to_list(self) -> list:
+        return self.items[self.start:] if self.start else list(self.items)
+
+    def tail(self) -> 'ListView':
+        """
+        Devolve a cauda da vista (todos os elementos menos o primeiro) em O(1).
+        """
+        return ListView(self.items, self.start + 1) if self else self
+
+
+# Tipos que representam uma lista FCA
+LIST_TYPES: tuple = (list, ListView)
+
+
+def list_tail(value: any) -> ListView:
+    """
+    Devolve a cauda de uma lista (ou de uma ListView) sem copiar os elementos.
+    """
+    if isinstance(value, ListView):
+        return value.tail()
+    return ListView(value, 1) if value else ListView(value)
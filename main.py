@@ -1,39 +1,409 @@
 import argparse
-from lexer import lexer
-from parser import parser
-from code_generator import CodeGenerator
-from interpreter import Interpreter
+import os
+import sys
 
-def main():
-    # Configurar o parser de argumentos
+# Os módulos de cada fase (parser, otimizador, motores de execução, gerador de código C) só são importados
+# quando essa fase corre, para que as execuções curtas (ex: uma por ficheiro no tests.py) arranquem depressa.
+
+
+def parse(data: str, lexer_name: str = 'scanner', parser_name: str = 'pratt', precedence: bool = True):
+    """
+    Analisa o código fonte.
+    O parser só é importado aqui, para que uma execução com a AST na cache não tenha de carregar as tabelas.
+
+    :param data: O código fonte.
+    :param lexer_name: O analisador léxico: scanner (scanner.py, escrito à mão) ou ply (lexer.py).
+    :param parser_name: O parser: pratt (pratt_parser.py, escrito à mão) ou ply (parser.py).
+    :param precedence: Se False, o parser pratt dá a todos os operadores a mesma precedência, como o parser ply.
+    """
+    if parser_name == 'ply':
+        from parser import parser
+    else:
+        from pratt_parser import PrattParser
+        parser = PrattParser(precedence=precedence)
+    return parser.parse(data, lexer=make_lexer(lexer_name))
+
+
+def make_lexer(lexer_name: str = 'scanner'):
+    """
+    Devolve o analisador léxico: scanner (scanner.py, escrito à mão) ou ply (lexer.py).
+    """
+    if lexer_name == 'ply':
+        from lexer import lexer
+        return lexer
+    from scanner import Scanner
+    return Scanner()
+
+
+def open_cache(args):
+    """
+    Devolve a cache da AST a usar com as opções dadas, ou None com --no-cache.
+    """
+    if args.no_cache:
+        return None
+    from ast_cache import ASTCache
+    variant: str = f"{args.lexer}-{args.parser}" + ('-no-precedence' if args.no_precedence else '')
+    return ASTCache(args.cache_dir, variant=variant)
+
+
+def process(data: str, args, cache=None, c_path: str = 'output.c', metrics=None):
+    """
+    Analisa, otimiza e executa o código fonte e gera o código C, conforme as opções da linha de comandos.
+
+    :param data: O código fonte.
+    :param args: As opções (argparse.Namespace).
+    :param cache: A cache da AST (ou None, para analisar sempre o código).
+    :param c_path: O ficheiro onde é escrito o código C.
+    :param metrics: Se for dado, recebe as medidas de cada fase (Metrics); com --timings, também as contagens
+                    (tokens, nós da AST, chamadas e operações do interpretador, tamanho do código C).
+    :return: A AST (ou None se a análise falhar).
+    """
+    from metrics import Metrics, count_nodes, count_tokens
+    if metrics is None:
+        metrics = Metrics()
+    # As contagens têm um custo (uma passagem extra do analisador léxico, contadores no interpretador)
+    count: bool = args.timings is not None
+
+    if count:
+        # Passagem só do analisador léxico, para medir a análise léxica à parte (o parse repete-a)
+        lexer = make_lexer(args.lexer)
+        with metrics.phase('lex'):
+            metrics.counts['tokens'] = count_tokens(data, lexer)
+
+    # Guarda a AST gerada (lida da cache se o código já tiver sido analisado com a mesma gramática)
+    with metrics.phase('parse'):
+        if cache is None:
+            result = parse(data, args.lexer, args.parser, not args.no_precedence)
+        else:
+            result = cache.parse(data, lambda source: parse(source, args.lexer, args.parser, not args.no_precedence))
+    if count and result is not None:
+        metrics.counts['ast_nodes'] = count_nodes(result)
+
+    # Otimizar a AST (usada tanto pelos motores de execução como pelo gerador de código C)
+    if result is not None and not args.no_optimize:
+        with metrics.phase('optimize'):
+            from optimizer import Optimizer
+            optimizer = Optimizer(fold_constants=not args.no_fold, eliminate_dead_code=not args.no_dead_code,
+                                  inline_functions=not args.no_inline)
+            result = optimizer.optimize(result)
+        if count:
+            metrics.counts['ast_nodes_optimized'] = count_nodes(result)
+
+    # Interpretar a AST gerada (no modo nativo, o programa corre depois de o código C ser gerado)
+    native: bool = args.engine == 'native' and not args.no_run
+    if result is not None and not args.no_run and not native:
+        with metrics.phase('run'):
+            if args.engine == 'vm':
+                from bytecode import BytecodeCompiler
+                from vm import VirtualMachine
+                code = BytecodeCompiler().compile(result)
+                VirtualMachine().run(code)
+            else:
+                interpreter = make_interpreter(args, count)
+                try:
+                    run_interpreter(interpreter, lambda: interpreter.interpret(result), args)
+                finally:
+                    if count:
+                        metrics.counts.update(interpreter.counters)
+                if args.memo_stats:
+                    print_memo_stats(interpreter)
+                print_profile(interpreter, args.profile)
+
+    # Converte para C usando a AST
+    if result is not None and (not args.no_c or native):
+        with metrics.phase('codegen'):
+            from code_generator import CodeGenerator
+            code_generator = CodeGenerator(opt_level=args.c_opt)
+            code_generator.generate(result)
+            c_code = code_generator.get_code()
+        if not args.no_c:
+            with metrics.phase('write'):
+                with open(c_path, "w") as file:
+                    file.write(c_code)
+        if count:
+            metrics.counts['c_bytes'] = len(c_code.encode())
+        if native:
+            from native import check_representable
+            check_representable(code_generator)
+            run_native(c_code, args, metrics)
+
+    return result
+
+
+def native_compiler(args):
+    """
+    Devolve o compilador da execução nativa, com os executáveis na cache em <cache-dir>/native.
+    """
+    from native import NativeCompiler
+    return NativeCompiler(os.path.join(args.cache_dir, 'native'), args.cc, args.cc_opt)
+
+
+def run_native(c_code: str, args, metrics):
+    """
+    Compila o código C (ou lê o executável da cache) e corre-o. Os tempos de compilação e de execução são fases
+    separadas das métricas (compile e run).
+    """
+    from native import run_executable
+    compiler = native_compiler(args)
+    with metrics.phase('compile'):
+        executable: str = compiler.compile(c_code)
+    metrics.counts['native_cache_hits'] = compiler.hits
+    with metrics.phase('run'):
+        run_executable(executable)
+
+
+def print_native_times(metrics, args):
+    """
+    Mostra no stderr o tempo de compilação e o de execução do modo nativo.
+    """
+    if 'compile' not in metrics.phases:
+        return
+    origin: str = 'executável da cache' if metrics.counts.get('native_cache_hits') else f"{args.cc} -O{args.cc_opt}"
+    line: str = f"Nativo: compilação {metrics.phases['compile']['wall'] * 1000:.1f} ms ({origin})"
+    if 'run' in metrics.phases:
+        line += f", execução {metrics.phases['run']['wall'] * 1000:.1f} ms"
+    print(line, file=sys.stderr)
+
+
+def print_memo_stats(interpreter):
+    if interpreter.memo is not None:
+        stats: dict = interpreter.memo.stats()
+        print(f"Memoização: {stats['hits']} acertos, {stats['misses']} falhas, "
+              f"{stats['size']}/{stats['max_size']} resultados", file=sys.stderr)
+
+
+def make_interpreter(args, count_operations: bool = False):
+    """
+    Cria o Interpreter com as opções da linha de comandos (motores ast e closures).
+    """
+    from interpreter import Interpreter
+    parallel_workers: int = (args.parallel_workers or os.cpu_count() or 1) if args.parallel_map else 0
+    return Interpreter(use_closures=args.engine == 'closures', memoize=not args.no_memo, memo_size=args.memo_size,
+                       profile=args.profile is not None, count_operations=count_operations,
+                       vectorize=not args.no_vectorize, parallel_workers=parallel_workers,
+                       parallel_min_size=args.parallel_min_size)
+
+
+def run_interpreter(interpreter, run, args):
+    """
+    Executa o programa (run: interpret ou interpret_stream). Com --sample, usa o profiler por amostragem e escreve
+    as amostras em pilhas colapsadas no ficheiro indicado (mesmo que a execução termine com um erro).
+    No fim termina os processos do map paralelo, se houver.
+    """
+    sampler = None
+    if args.sample is not None:
+        from profiler import StackSampler
+        sampler = StackSampler(interpreter, args.sample_interval / 1000, os.path.basename(args.filenames[0]))
+        sampler.start()
+    try:
+        run()
+    finally:
+        if interpreter.parallel_map is not None:
+            interpreter.parallel_map.close()
+        if sampler is not None:
+            sampler.stop()
+            sampler.write_collapsed(args.sample)
+
+
+def print_profile(interpreter, path: str):
+    """
+    Escreve o resultado do profiler: o relatório no stderr ou, se path não for '-', o JSON no ficheiro.
+    """
+    if interpreter.profiler is None:
+        return
+    if path == '-':
+        interpreter.profiler.report()
+    else:
+        interpreter.profiler.write_json(path)
+
+
+def stream(filename: str, args):
+    """
+    Modo de streaming: o ficheiro é lido aos blocos e cada instrução do nível de topo é executada assim que é
+    analisada, sem construir a AST completa. As funções ficam definidas assim que a sua definição é lida e o
+    ESCREVER escreve logo, e a memória usada não cresce com o tamanho do ficheiro (só com as funções e variáveis).
+    Não usa a cache da AST nem gera o código C, que precisam do programa completo.
+    """
+    from pratt_parser import PrattParser
+    with open(filename, 'r') as file:
+        statements = PrattParser(precedence=not args.no_precedence).parse_file(file, args.chunk_size)
+        if not args.no_optimize:
+            # Só a dobragem de constantes: as outras otimizações precisam do programa completo
+            from optimizer import Optimizer
+            statements = Optimizer(fold_constants=not args.no_fold, eliminate_dead_code=False,
+                                   inline_functions=False).optimize_stream(statements)
+
+        if args.no_run:
+            # Só verifica a sintaxe
+            for _statement in statements:
+                pass
+        elif args.engine == 'vm':
+            from vm import VirtualMachine
+            VirtualMachine().run_stream(statements)
+        else:
+            interpreter = make_interpreter(args)
+            run_interpreter(interpreter, lambda: interpreter.interpret_stream(statements), args)
+            if args.memo_stats:
+                print_memo_stats(interpreter)
+            print_profile(interpreter, args.profile)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Configura o parser de argumentos da linha de comandos (também usado pelo tests.py, que corre o main.py
+    no próprio processo).
+    """
     arg_parser = argparse.ArgumentParser(description='Interpretador e Gerador de Código C para a linguagem FCA.')
-    arg_parser.add_argument('filename', type=str, help='Nome do ficheiro quem contem o código a ser interpretado')
+    arg_parser.add_argument('filenames', type=str, nargs='+', metavar='filename',
+                            help='Nome do ficheiro quem contem o código a ser interpretado (com vários ficheiros, '
+                                 'padrões como exemplos/*.fca ou diretórios, corre em modo de lote)')
+    arg_parser.add_argument('--engine', choices=['ast', 'closures', 'vm', 'native'], default='ast',
+                            help='Motor de execução: ast (percorre a árvore), closures (AST compilada em closures), '
+                                 'vm (bytecode numa máquina de pilha) ou native (compila o código C gerado e corre '
+                                 'o executável, guardado numa cache)')
+    arg_parser.add_argument('--cc', type=str, default=os.environ.get('CC', 'cc'),
+                            help='Com --engine=native, o compilador de C (por omissão, o da variável CC ou cc)')
+    arg_parser.add_argument('-O', dest='cc_opt', choices=['0', '1', '2', '3', 's'], default='2',
+                            help='Com --engine=native, o nível de otimização do compilador de C (ex: -O3)')
+    arg_parser.add_argument('--no-memo', action='store_true',
+                            help='Desativa a memoização das funções puras (ex: para benchmarks)')
+    arg_parser.add_argument('--memo-size', type=int, default=4096,
+                            help='Número máximo de resultados guardados na cache de memoização')
+    arg_parser.add_argument('--memo-stats', action='store_true',
+                            help='Mostra no stderr os acertos e falhas da cache de memoização')
+    arg_parser.add_argument('--no-vectorize', action='store_true',
+                            help='Desativa a execução com o numpy do map e do fold sobre funções aritméticas simples')
+    arg_parser.add_argument('--parallel-map', action='store_true',
+                            help='Executa o map de funções puras sobre listas grandes num conjunto de processos, '
+                                 'quando as primeiras chamadas indicam que compensa (motores ast e closures)')
+    arg_parser.add_argument('--parallel-workers', type=int, default=None,
+                            help='Número de processos do --parallel-map (por omissão, o número de CPUs)')
+    arg_parser.add_argument('--parallel-min-size', type=int, default=256,
+                            help='Número mínimo de elementos da lista para o map ser paralelo (--parallel-map)')
+    arg_parser.add_argument('--profile', type=str, nargs='?', const='-', default=None, metavar='JSON',
+                            help='Mede as chamadas de cada cláusula das funções (chamadas, tempo inclusivo e '
+                                 'exclusivo, profundidade máxima) e mostra o relatório no stderr, ou escreve-o '
+                                 'no ficheiro JSON dado (motores ast e closures; com memoização, só conta as '
+                                 'chamadas que não foram lidas da cache)')
+    arg_parser.add_argument('--sample', type=str, default=None, metavar='FICHEIRO',
+                            help='Profiler por amostragem: regista periodicamente a pilha de chamadas FCA e escreve-a '
+                                 'no ficheiro em pilhas colapsadas, para flamegraphs (motores ast e closures)')
+    arg_parser.add_argument('--sample-interval', type=float, default=5.0,
+                            help='Intervalo entre amostras do --sample, em milissegundos')
+    arg_parser.add_argument('--timings', type=str, nargs='?', const='-', default=None, metavar='JSON',
+                            help='Mostra no stderr o tempo (decorrido e de CPU) e a memória de cada fase, e as '
+                                 'contagens (tokens, nós da AST, chamadas e operações, tamanho do código C), ou '
+                                 'escreve-os no ficheiro JSON dado')
+    arg_parser.add_argument('--trace-memory', action='store_true',
+                            help='Com --timings, mede também a memória alocada em cada fase (com o tracemalloc, '
+                                 'que torna a execução mais lenta)')
+    arg_parser.add_argument('--no-fold', action='store_true',
+                            help='Desativa a dobragem de constantes (ex: 2*3+4 passa a 10)')
+    arg_parser.add_argument('--no-dead-code', action='store_true',
+                            help='Desativa a eliminação de atribuições a variáveis que nunca são lidas')
+    arg_parser.add_argument('--no-inline', action='store_true',
+                            help='Desativa a substituição das chamadas a funções triviais pelo seu corpo')
+    arg_parser.add_argument('--no-optimize', action='store_true',
+                            help='Desativa todas as otimizações da AST')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='Não usa a cache da AST (o código é sempre analisado pelo parser)')
+    arg_parser.add_argument('--cache-dir', type=str, default='.fca_cache',
+                            help='Diretório da cache da AST')
+    arg_parser.add_argument('--cache-stats', action='store_true',
+                            help='Mostra no stderr os acertos, falhas e tamanho da cache da AST')
+    arg_parser.add_argument('--clear-cache', action='store_true',
+                            help='Remove todas as entradas da cache da AST e os executáveis nativos antes de '
+                                 'executar')
+    arg_parser.add_argument('--lexer', choices=['scanner', 'ply'], default='scanner',
+                            help='Analisador léxico: scanner (escrito à mão, com linha e coluna em cada token) '
+                                 'ou ply (lexer.py)')
+    arg_parser.add_argument('--parser', choices=['pratt', 'ply'], default='pratt',
+                            help='Parser: pratt (escrito à mão, em tempo linear e com * e / antes de + e -) '
+                                 'ou ply (parser.py, todos os operadores ao mesmo nível e associativos à direita)')
+    arg_parser.add_argument('--no-precedence', action='store_true',
+                            help='No parser pratt, dá a todos os operadores a mesma precedência (como o parser ply)')
+    arg_parser.add_argument('--stream', action='store_true',
+                            help='Lê o ficheiro aos blocos e executa cada instrução assim que é analisada, sem guardar '
+                                 'o programa completo (para ficheiros muito grandes; não usa a cache nem gera código C)')
+    arg_parser.add_argument('--chunk-size', type=int, default=1 << 20,
+                            help='No modo de streaming, número de caracteres lidos do ficheiro de cada vez')
+    arg_parser.add_argument('--no-run', action='store_true',
+                            help='Não executa o programa (só gera o código C)')
+    arg_parser.add_argument('--no-c', action='store_true',
+                            help='Não gera o código C (output.c)')
+    arg_parser.add_argument('--c-opt', type=int, choices=[0, 1, 2], default=2,
+                            help='Nível de otimização do código C: 0 (ramos das funções como sequência de if), '
+                                 '1 (switch nos ramos com números inteiros) ou 2 (também ciclos nas recorrências, '
+                                 'ex: fib, e memoização das funções recursivas puras de inteiros)')
+    arg_parser.add_argument('--batch', action='store_true',
+                            help='Modo de lote mesmo com um só ficheiro: o código C de cada ficheiro é escrito ao lado '
+                                 'dele (ex: a.fca -> a.c) e no fim é mostrado um resumo com os tempos e as falhas')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help='No modo de lote, número de processos (por omissão, o número de CPUs)')
+    arg_parser.add_argument('--output-dir', type=str, default=None,
+                            help='No modo de lote, diretório onde é escrito o código C de cada ficheiro')
+    return arg_parser
+
 
+def main():
+    # Configurar o parser de argumentos
+    arg_parser = build_arg_parser()
     args = arg_parser.parse_args()
 
-    # Ler o conteúdo do arquivo
-    with open(args.filename, 'r') as file:
-        data = file.read()
+    if args.clear_cache:
+        from ast_cache import ASTCache
+        ASTCache(args.cache_dir).clear()
+        native_compiler(args).clear()
 
-    # Gerar tokens
-    lexer.input(data)
+    # Vários ficheiros (ou padrões): modo de lote
+    from batch import expand_inputs, run_batch
+    filenames: list = expand_inputs(args.filenames)
+    if args.batch or len(filenames) != 1 or args.output_dir is not None:
+        if args.stream:
+            arg_parser.error('o modo de streaming só está disponível com um ficheiro')
+        if args.profile is not None or args.sample is not None:
+            arg_parser.error('o profiler só está disponível com um ficheiro')
+        if args.timings is not None:
+            arg_parser.error('--timings só está disponível com um ficheiro (o modo de lote mostra o tempo de cada fase)')
+        sys.exit(run_batch(filenames, args))
 
-    # Guarda a AST gerada
-    result = parser.parse(data)
+    if (args.profile is not None or args.sample is not None) and args.engine in ('vm', 'native'):
+        arg_parser.error('o profiler só está disponível com --engine=ast e --engine=closures')
 
-    # Interpretar a AST gerada
-    if result is not None:
-        interpreter = Interpreter()
-        interpreter.interpret(result)
+    if args.stream:
+        if args.timings is not None:
+            arg_parser.error('--timings não está disponível no modo de streaming, em que as fases se intercalam')
+        if args.parser != 'pratt' or args.lexer != 'scanner':
+            arg_parser.error('o modo de streaming só está disponível com --parser=pratt e --lexer=scanner')
+        if args.engine == 'native':
+            arg_parser.error('o modo de streaming não gera código C, pelo que não está disponível com --engine=native')
+        stream(filenames[0], args)
+        return
 
-    # Converte para C usando a AST
-    if result is not None:
-        code_generator = CodeGenerator()
-        code_generator.generate(result)
-        c_code = code_generator.get_code()
+    # Ler o conteúdo do arquivo
+    with open(filenames[0], 'r') as file:
+        data = file.read()
+
+    cache = open_cache(args)
+    metrics = None
+    if args.timings is not None or args.engine == 'native':
+        from metrics import Metrics
+        metrics = Metrics(trace_memory=args.trace_memory)
+    try:
+        process(data, args, cache, metrics=metrics)
+    finally:
+        if args.timings is None:
+            if metrics is not None:
+                print_native_times(metrics, args)
+        elif args.timings == '-':
+            metrics.report()
+        else:
+            metrics.write_json(args.timings)
+    if cache is not None and args.cache_stats:
+        stats: dict = cache.stats()
+        print(f"Cache da AST: {stats['hits']} acertos, {stats['misses']} falhas, {stats['writes']} escritas, "
+              f"{stats['errors']} erros, {stats['entries']} entradas ({stats['bytes']} bytes)", file=sys.stderr)
 
-        with open("output.c", "w") as file:
-            file.write(c_code)
 
 if __name__ == "__main__":
     main()
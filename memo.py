@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+# Cache de resultados de funções puras (memoização) com remoção LRU (o menos usado recentemente sai primeiro).
+
+# Valor devolvido por MemoCache.get quando a chave não está na cache
+MISSING = object()
+
+
+class MemoCache:
+    def __init__(self, max_size: int = 4096):
+        """
+        Inicializa a cache.
+
+        :param max_size: Número máximo de resultados guardados.
+        """
+        if max_size <= 0:
+            raise ValueError(f"Tamanho da cache de memoização inválido: {max_size}")
+        self.max_size: int = max_size
+        self.entries: OrderedDict = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: tuple) -> any:
+        """
+        Procura um resultado na cache.
+
+        :param key: A chave (nome da função e valores dos argumentos).
+        :return: O resultado guardado ou MISSING.
+        """
+        value: any = self.entries.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value: any):
+        """
+        Guarda um resultado, removendo o menos usado recentemente se a cache estiver cheia.
+        """
+        self.entries[key] = value
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove todos os resultados (ex: quando uma função é redefinida).
+        """
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.entries),
+            'max_size': self.max_size
+        }
+
+
+# Tipos de valores que podem fazer parte de uma chave
+SCALAR_TYPES: tuple = (int, float, str)
+
+
+def make_key(name: str, arg_values: list) -> tuple:
+    """
+    Constrói a chave da cache para uma chamada.
+    Inteiros são usados diretamente; os restantes valores levam o tipo (2 e 2.0 seguem ramos diferentes).
+    O número de argumentos fica implícito no tamanho do tuplo.
+    Chamadas com listas não são guardadas: calcular a chave custaria O(n) por chamada, o que numa recursão
+    x:xs sobre a lista tornaria a execução quadrática.
+
+    :return: A chave, ou None se a chamada não puder ser guardada.
+    """
+    for value in arg_values:
+        if type(value) is not int:
+            if not all(type(value) in SCALAR_TYPES for value in arg_values):
+                return None
+            return (name, *((type(value), value) for value in arg_values))
+    return (name, *arg_values)
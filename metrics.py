@@ -0,0 +1,156 @@
+import json
+import sys
+import time
+import tracemalloc
+
+from ast_nodes import ASTNode
+
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage, o máximo de memória do processo não é medido
+    resource = None
+
+# Métricas de uma execução do main.py (--timings).
+# Cada fase (lex, parse, optimize, run, codegen, write) regista:
+# - wall: o tempo decorrido (segundos);
+# - cpu: o tempo de CPU do processo (segundos);
+# - max_rss: o máximo de memória residente do processo no fim da fase (bytes; só em sistemas Unix);
+# - peak_memory: com trace_memory, o máximo de memória alocada pelo Python durante a fase, acima da que estava
+#   alocada no início (bytes). Usa o tracemalloc, que torna a execução várias vezes mais lenta, pelo que é opcional.
+# As contagens (tokens, nós da AST, chamadas e operações do interpretador, tamanho do código C) são guardadas
+# em counts.
+
+
+class Metrics:
+    def __init__(self, trace_memory: bool = False):
+        """
+        :param trace_memory: Se True, mede o máximo de memória alocada em cada fase (com o tracemalloc).
+        """
+        self.trace_memory: bool = trace_memory
+        # Fases pela ordem em que correram (nome -> dicionário com as medidas)
+        self.phases: dict = {}
+        self.counts: dict = {}
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def phase(self, name: str) -> 'Phase':
+        """
+        Devolve o gestor de contexto que mede uma fase (with metrics.phase('parse'): ...).
+        Uma fase que corre várias vezes acumula os tempos.
+        """
+        return Phase(self, name)
+
+    def wall_times(self) -> dict:
+        """
+        Devolve o tempo decorrido de cada fase (nome -> segundos).
+        """
+        return {name: phase['wall'] for name, phase in self.phases.items()}
+
+    def to_dict(self) -> dict:
+        return {
+            'phases': self.phases,
+            'counts': self.counts,
+            'total': {
+                'wall': sum(phase['wall'] for phase in self.phases.values()),
+                'cpu': sum(phase['cpu'] for phase in self.phases.values())
+            }
+        }
+
+    def report(self, file=sys.stderr):
+        """
+        Escreve as métricas em texto.
+        """
+        print(f"{'Fase':<10} {'tempo':>12} {'CPU':>12} {'memória máx.':>14}"
+              + (f" {'pico da fase':>14}" if self.trace_memory else ''), file=file)
+        for name, phase in self.phases.items():
+            line: str = f"{name:<10} {phase['wall'] * 1000:>9.3f} ms {phase['cpu'] * 1000:>9.3f} ms"
+            line += f" {format_bytes(phase.get('max_rss')):>14}"
+            if self.trace_memory:
+                line += f" {format_bytes(phase.get('peak_memory')):>14}"
+            print(line, file=file)
+        total: dict = self.to_dict()['total']
+        print(f"{'total':<10} {total['wall'] * 1000:>9.3f} ms {total['cpu'] * 1000:>9.3f} ms", file=file)
+        for name, value in self.counts.items():
+            print(f"{name}: {value}", file=file)
+
+    def write_json(self, path: str):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+
+class Phase:
+    def __init__(self, metrics: Metrics, name: str):
+        self.metrics: Metrics = metrics
+        self.name: str = name
+        self.wall: float = 0.0
+        self.cpu: float = 0.0
+        self.memory: int = 0
+
+    def __enter__(self):
+        if self.metrics.trace_memory:
+            tracemalloc.reset_peak()
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        wall: float = time.perf_counter() - self.wall
+        cpu: float = time.process_time() - self.cpu
+        phase: dict = self.metrics.phases.setdefault(self.name, {'wall': 0.0, 'cpu': 0.0})
+        phase['wall'] += wall
+        phase['cpu'] += cpu
+        if resource is not None:
+            # ru_maxrss está em KiB no Linux e em bytes no macOS
+            scale: int = 1 if sys.platform == 'darwin' else 1024
+            phase['max_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        if self.metrics.trace_memory:
+            peak: int = tracemalloc.get_traced_memory()[1] - self.memory
+            phase['peak_memory'] = max(phase.get('peak_memory', 0), peak)
+        return False
+
+
+def format_bytes(size: int) -> str:
+    if size is None:
+        return '-'
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KiB"
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+# Atributos (__slots__) de cada classe de nó, incluindo os das classes base
+node_slots: dict = {}
+
+
+def count_nodes(node: any) -> int:
+    """
+    Conta os nós de uma AST (sem recursão, para não esgotar a pilha nos programas grandes).
+    """
+    count: int = 0
+    pending: list = [node]
+    while pending:
+        item: any = pending.pop()
+        if isinstance(item, list):
+            pending.extend(item)
+        elif isinstance(item, ASTNode):
+            count += 1
+            slots: tuple = node_slots.get(type(item))
+            if slots is None:
+                slots = tuple(slot for cls in type(item).__mro__ for slot in getattr(cls, '__slots__', ())
+                              if slot != 'position')
+                node_slots[type(item)] = slots
+            pending.extend(getattr(item, slot, None) for slot in slots)
+    return count
+
+
+def count_tokens(data: str, lexer) -> int:
+    """
+    Conta os tokens do código fonte.
+
+    :param lexer: O analisador léxico (com os métodos input e token).
+    """
+    lexer.input(data)
+    count: int = 0
+    for _token in iter(lexer.token, None):
+        count += 1
+    return count
@@ -0,0 +1,150 @@
+import contextlib
+import hashlib
+import os
+import shutil
+import signal
+import subprocess
+import sys
+
+# Execução nativa (--engine native): o código C gerado é compilado pelo compilador de C local (cc, ou o indicado
+# com --cc) com o nível de otimização -O escolhido, e o executável é corrido para obter o que o programa escreve.
+# Os executáveis ficam numa cache em disco, com o nome igual ao hash do código C, do compilador e das opções de
+# compilação, pelo que voltar a correr um programa que não mudou não o interpreta nem volta a compilar (com a
+# cache da AST, também não volta a analisar o código fonte).
+# Os inteiros do C gerado têm 32 bits e os do interpretador não têm limite: um overflow pára o executável (em vez de
+# escrever um valor errado), e os programas cujo resultado o C não representa são recusados antes de compilar.
+
+# Extensão dos executáveis (também identifica os ficheiros da cache)
+EXECUTABLE_EXTENSION: str = '.exe'
+
+# Opções de compilação que tornam erros os casos em que o executável não faria o mesmo que o interpretador:
+# um formato do printf que não corresponde ao argumento, uma constante que não cabe num int e o overflow de um
+# inteiro durante a execução (que pára o programa com SIGILL)
+CHECK_FLAGS: list = ['-Werror=format', '-Werror=overflow', '-fsanitize=signed-integer-overflow',
+                     '-fsanitize-undefined-trap-on-error']
+
+
+class CompileError(ValueError):
+    """
+    Erro do compilador de C (ex: código C inválido ou compilador inexistente).
+    """
+    pass
+
+
+class NativeCompiler:
+    def __init__(self, directory: str, compiler: str = 'cc', optimization: str = '2'):
+        """
+        :param directory: Diretório onde os executáveis são guardados (criado na primeira compilação).
+        :param compiler: O compilador de C (nome ou caminho).
+        :param optimization: O nível de otimização do compilador (-O0, -O1, -O2, -O3, -Os).
+        """
+        self.directory: str = directory
+        self.compiler: str = compiler
+        self.flags: list = [f"-O{optimization}"] + CHECK_FLAGS
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def key(self, c_code: str) -> str:
+        """
+        Calcula a chave de um programa (hash do código C, do compilador e das opções).
+        """
+        digest = hashlib.sha256((shutil.which(self.compiler) or self.compiler).encode())
+        for flag in self.flags:
+            digest.update(b'\0' + flag.encode())
+        digest.update(b'\0' + c_code.encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + EXECUTABLE_EXTENSION)
+
+    def compile(self, c_code: str) -> str:
+        """
+        Devolve o executável do código C, compilando-o se ainda não estiver na cache.
+        A compilação é feita num ficheiro temporário que depois substitui o definitivo, para que uma execução em
+        paralelo (ex: no modo de lote) nunca corra um executável incompleto.
+
+        :return: O caminho do executável.
+        """
+        path: str = self.path(self.key(c_code))
+        if os.path.isfile(path):
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        os.makedirs(self.directory, exist_ok=True)
+        temporary: str = f"{path}.{os.getpid()}.tmp"
+        source: str = f"{temporary}.c"
+        try:
+            with open(source, 'w', encoding='utf-8') as file:
+                file.write(c_code)
+            try:
+                completed = subprocess.run([self.compiler] + self.flags + ['-o', temporary, source],
+                                           capture_output=True, text=True)
+            except OSError as error:
+                raise CompileError(f"Não foi possível executar o compilador {self.compiler}: {error}")
+            if completed.returncode != 0:
+                raise CompileError(f"O compilador {self.compiler} falhou:\n{completed.stderr.strip()}")
+            os.replace(temporary, path)
+        finally:
+            for name in (source, temporary):
+                with contextlib.suppress(OSError):
+                    os.remove(name)
+        return path
+
+    def clear(self):
+        """
+        Remove todos os executáveis da cache.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(EXECUTABLE_EXTENSION):
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(self.directory, name))
+
+
+def check_representable(code_generator: any):
+    """
+    Recusa os programas cujo resultado o código C não representa (chamada depois de gerar o código).
+    A divisão dá um número real no interpretador (ex: 7 / 2 é 3.5) e um inteiro em C, e um número fora dos int de
+    32 bits (ex: 3000000000) muda de valor em C sem que o compilador o indique sempre.
+
+    :param code_generator: O CodeGenerator que gerou o código.
+    """
+    if code_generator.division_used:
+        raise CompileError("O programa usa a divisão, que no código C é inteira: não pode ser executado nativamente")
+    if code_generator.large_constant_used:
+        raise CompileError("O programa tem um número que não cabe num int de 32 bits: não pode ser executado "
+                           "nativamente")
+
+
+def has_file_descriptor(stream: any) -> bool:
+    """
+    Verifica se um ficheiro do Python (ex: sys.stdout) corresponde a um descritor do sistema operativo, que pode
+    ser passado ao executável.
+    """
+    try:
+        stream.fileno()
+        return True
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def run_executable(path: str):
+    """
+    Corre um executável com o stdin e o stdout do processo. Quando foram substituídos (ex: por um StringIO no
+    tests.py ou no modo de lote), o executável recebe o conteúdo do stdin e o que escreve é copiado para o stdout.
+    """
+    sys.stdout.flush()
+    inherit_stdin: bool = has_file_descriptor(sys.stdin)
+    inherit_stdout: bool = has_file_descriptor(sys.stdout)
+    completed = subprocess.run([path], input=None if inherit_stdin else sys.stdin.read(),
+                               stdout=None if inherit_stdout else subprocess.PIPE,
+                               text=True, encoding='utf-8', errors='replace')
+    if not inherit_stdout:
+        sys.stdout.write(completed.stdout)
+    if completed.returncode == -signal.SIGILL:
+        raise ValueError("O programa nativo parou num overflow: os inteiros em C têm 32 bits e o valor calculado "
+                         "não cabe num int (o interpretador dá o resultado exato)")
+    if completed.returncode != 0:
+        raise ValueError(f"O programa nativo terminou com o código {completed.returncode}")
@@ -0,0 +1,444 @@
+from ast_nodes import *
+
+# Otimizador da AST, executado entre o parser e os motores de execução / gerador de código C.
+# Todas as passagens preservam o resultado do programa (incluindo os erros de execução) e estão ativas por omissão:
+# - inlining: chamadas a funções triviais (uma só expressão, que só usa os parâmetros) são substituídas
+#   pelo corpo da função, ex: com FUNCAO area(a,b),: a*b; a chamada area(c, c) passa a c*c;
+# - dobragem de constantes: BinOpNode com operandos constantes são calculados, ex: 2*3+4 passa a 10
+#   (14 sem precedência, com --no-precedence ou --parser=ply);
+# - eliminação de atribuições mortas: atribuições a variáveis que nunca são lidas e cuja expressão
+#   não tem efeitos nem pode falhar são removidas.
+
+# Operadores aritméticos dobrados. A divisão não é dobrada: no interpretador dá um float e em C uma divisão inteira.
+FOLDABLE_OPERATORS: dict = {
+    '+': lambda x, y: x + y,
+    '-': lambda x, y: x - y,
+    '*': lambda x, y: x * y
+}
+
+# Tipos de valor conhecidos na eliminação de atribuições mortas
+VALUE_INT = 'int'
+VALUE_STR = 'str'
+VALUE_LIST = 'list'
+VALUE_ANY = 'any'
+
+
+class Optimizer:
+    def __init__(self, fold_constants: bool = True, eliminate_dead_code: bool = True, inline_functions: bool = True):
+        """
+        Inicializa o otimizador.
+
+        :param fold_constants: Se True, calcula as expressões constantes.
+        :param eliminate_dead_code: Se True, remove as atribuições a variáveis que nunca são lidas.
+        :param inline_functions: Se True, substitui as chamadas a funções triviais pelo seu corpo.
+        """
+        self.fold_constants: bool = fold_constants
+        self.eliminate_dead_code: bool = eliminate_dead_code
+        self.inline_functions: bool = inline_functions
+        # Funções que podem ser substituídas: (nome, número de parâmetros) -> (parâmetros, expressão, posição)
+        self.inlinable: dict = {}
+        # Funções a ser expandidas (evita expandir funções mutuamente recursivas para sempre)
+        self.expanding: set = set()
+        # Estatísticas
+        self.inlined: int = 0
+        self.folded: int = 0
+        self.removed: int = 0
+
+    def optimize(self, program: ProgramNode) -> ProgramNode:
+        """
+        Otimiza o programa. Os nós são alterados no próprio lugar.
+
+        :param program: O nó raiz da AST.
+        :return: O programa otimizado.
+        """
+        if self.inline_functions:
+            self.inlinable = find_inlinable_functions(program)
+        for index, statement in enumerate(program.statements):
+            program.statements[index] = self.optimize_statement(statement, index, top_level=True)
+        if self.eliminate_dead_code:
+            self.remove_dead_assignments(program)
+        return program
+
+    def optimize_stream(self, statements):
+        """
+        Otimiza as instruções do nível de topo uma a uma, à medida que são produzidas
+        (ex: por PrattParser.parse_file). Só a dobragem de constantes é aplicada: o inlining e a eliminação
+        de atribuições mortas precisam de conhecer o programa completo.
+
+        :param statements: Iterável com as instruções do programa.
+        :return: Um gerador das instruções otimizadas.
+        """
+        for index, statement in enumerate(statements):
+            yield self.optimize_statement(statement, index, top_level=True)
+
+    def optimize_statement(self, statement: ASTNode, index: int, top_level: bool = False) -> ASTNode:
+        """
+        Otimiza as expressões de uma instrução.
+
+        :param statement: A instrução.
+        :param index: A posição da instrução (ou da definição de função que a contém) no programa.
+        :param top_level: Se a instrução está fora de qualquer função.
+        :return: A instrução otimizada.
+        """
+        if isinstance(statement, (FunctionNode, BranchNode)):
+            statement.body = [self.optimize_statement(s, index) for s in statement.body]
+        elif isinstance(statement, (AssignNode, WriteNode, ReturnNode)):
+            statement.expression = self.optimize_expression(statement.expression, index)
+        elif isinstance(statement, (BinOpNode, FunctionCallNode)):
+            # Uma expressão usada como instrução só é executada (ou dá o resultado da função) se for uma operação
+            # ou uma chamada, por isso só é substituída por outra operação ou chamada
+            # (fora das funções, o gerador de código C só aceita chamadas)
+            optimized: ASTNode = self.optimize_expression(statement, index)
+            if isinstance(optimized, type(statement) if top_level else (BinOpNode, FunctionCallNode)):
+                return optimized
+        return statement
+
+    def optimize_expression(self, node: any, index: int) -> any:
+        """
+        Aplica o inlining e a dobragem de constantes a uma expressão, dos filhos para a raiz.
+
+        :param node: O nó da expressão.
+        :param index: A posição no programa da instrução que contém a expressão.
+        :return: A expressão otimizada.
+        """
+        if isinstance(node, BinOpNode):
+            node.left = self.optimize_expression(node.left, index)
+            node.right = self.optimize_expression(node.right, index)
+            if self.fold_constants:
+                return self.fold_binop(node)
+
+        elif isinstance(node, FunctionCallNode):
+            node.arguments = [self.optimize_expression(argument, index) for argument in node.arguments]
+            if self.inline_functions:
+                return self.inline_call(node, index)
+
+        elif isinstance(node, ListNode):
+            node.elements = [self.optimize_expression(element, index) for element in node.elements]
+
+        elif isinstance(node, RandomNode):
+            node.upper_limit = self.optimize_expression(node.upper_limit, index)
+
+        elif isinstance(node, MapNode):
+            node.list_node = self.optimize_expression(node.list_node, index)
+
+        elif isinstance(node, FoldNode):
+            node.list_node = self.optimize_expression(node.list_node, index)
+            node.initial_value = self.optimize_expression(node.initial_value, index)
+
+        return node
+
+    def fold_binop(self, node: BinOpNode) -> ASTNode:
+        """
+        Calcula um BinOpNode cujos operandos já são constantes.
+        """
+        left: ASTNode = node.left
+        right: ASTNode = node.right
+        if node.operator in FOLDABLE_OPERATORS:
+            if is_int_constant(left) and is_int_constant(right):
+                self.folded += 1
+                return NumberNode(FOLDABLE_OPERATORS[node.operator](left.value, right.value))
+        elif node.operator == '<>':
+            if isinstance(left, StringNode) and isinstance(right, StringNode):
+                self.folded += 1
+                return StringNode(left.value + right.value)
+        return node
+
+    def inline_call(self, node: FunctionCallNode, index: int) -> ASTNode:
+        """
+        Substitui a chamada pelo corpo da função, se a função for trivial e estiver definida antes da instrução.
+        """
+        key: tuple = (node.name, len(node.arguments))
+        entry: tuple = self.inlinable.get(key)
+        if entry is None or key in self.expanding:
+            return node
+        parameters, expression, definition_index = entry
+        if definition_index >= index:
+            return node
+
+        mapping: dict = dict(zip(parameters, node.arguments))
+        used: set = set()
+        collect_identifiers(expression, used)
+        for parameter, argument in mapping.items():
+            # Os argumentos são avaliados uma vez na chamada; no corpo podem aparecer várias vezes ou nenhuma,
+            # por isso só se aceitam literais e variáveis que o corpo lê (um erro de variável não encontrada
+            # continua a acontecer)
+            if isinstance(argument, (NumberNode, StringNode)):
+                continue
+            if isinstance(argument, IdentifierNode) and parameter in used:
+                continue
+            return node
+        # Com várias variáveis, o corpo tem de as ler pela ordem dos argumentos, para que a primeira que não
+        # existe seja a mesma da chamada (ex: em f(u, v) com o corpo y - x, v seria lida antes de u)
+        variables: list = unique(argument.name for argument in node.arguments if isinstance(argument, IdentifierNode))
+        if len(variables) > 1:
+            reads: list = []
+            collect_read_order(expression, reads)
+            if unique(mapping[name].name for name in reads
+                      if isinstance(mapping.get(name), IdentifierNode)) != variables:
+                return node
+
+        self.inlined += 1
+        self.expanding.add(key)
+        # O corpo copiado pode conter chamadas a outras funções triviais
+        result: ASTNode = self.optimize_expression(substitute(expression, mapping), index)
+        self.expanding.discard(key)
+        return result
+
+    def remove_dead_assignments(self, program: ProgramNode):
+        """
+        Remove as atribuições a variáveis que não são lidas em nenhuma parte do programa, até estabilizar
+        (remover uma atribuição pode deixar de ler outra variável).
+        Nos corpos das funções só são removidas atribuições a variáveis que não são lidas nesse corpo.
+        """
+        for statement in program.statements:
+            if isinstance(statement, FunctionNode):
+                statement.body = self.remove_dead_locals(statement)
+
+        changed: bool = True
+        while changed:
+            changed = False
+            reads: set = set()
+            for statement in program.statements:
+                collect_identifiers(statement, reads)
+
+            # Tipos das variáveis globais antes de cada instrução (as funções não alteram variáveis globais)
+            known: dict = {}
+            statements: list = []
+            for statement in program.statements:
+                if isinstance(statement, AssignNode):
+                    value_type: str = value_type_of(statement.expression, known)
+                    if statement.identifier not in reads and value_type is not None:
+                        self.removed += 1
+                        changed = True
+                        continue
+                    if value_type is None:
+                        known.pop(statement.identifier, None)
+                    else:
+                        known[statement.identifier] = value_type
+                statements.append(statement)
+            program.statements = statements
+
+    def remove_dead_locals(self, function: FunctionNode) -> list:
+        """
+        Remove as atribuições mortas do corpo de uma função.
+        A última instrução é sempre mantida, pois o gerador de código C devolve o seu valor.
+        """
+        body: list = function.body
+        known: dict = {}
+        for parameter in function.parameters:
+            if not isinstance(parameter, ListPatternNode):
+                known[parameter] = VALUE_ANY
+
+        changed: bool = True
+        while changed:
+            changed = False
+            reads: set = set()
+            for statement in body:
+                collect_identifiers(statement, reads)
+
+            current: dict = dict(known)
+            statements: list = []
+            for position, statement in enumerate(body):
+                if isinstance(statement, AssignNode) and position < len(body) - 1:
+                    value_type: str = value_type_of(statement.expression, current)
+                    if statement.identifier not in reads and value_type is not None:
+                        self.removed += 1
+                        changed = True
+                        continue
+                    if value_type is None:
+                        current.pop(statement.identifier, None)
+                    else:
+                        current[statement.identifier] = value_type
+                statements.append(statement)
+            body = statements
+        return body
+
+    def stats(self) -> dict:
+        return {
+            'inlined': self.inlined,
+            'folded': self.folded,
+            'removed': self.removed
+        }
+
+
+def find_inlinable_functions(program: ProgramNode) -> dict:
+    """
+    Encontra as funções triviais do programa: funções com uma única definição para o seu número de parâmetros,
+    sem ramos, cujo corpo é uma única expressão que só lê os parâmetros.
+
+    :param program: O nó raiz da AST.
+    :return: Dicionário (nome, número de parâmetros) -> (parâmetros, expressão, posição da definição).
+    """
+    definitions: dict = {}
+    branched: set = set()
+    for index, statement in enumerate(program.statements):
+        if isinstance(statement, FunctionNode):
+            definitions.setdefault((statement.name, len(statement.parameters)), []).append((index, statement))
+        elif isinstance(statement, BranchNode):
+            branched.add(statement.function_name)
+
+    inlinable: dict = {}
+    for key, nodes in definitions.items():
+        if len(nodes) != 1 or key[0] in branched:
+            continue
+        index, function = nodes[0]
+        if len(function.body) != 1 or not all(isinstance(p, str) for p in function.parameters):
+            continue
+        statement: ASTNode = function.body[0]
+        # Tal como em execute_function_body, só estas instruções dão o resultado da função
+        if isinstance(statement, ReturnNode):
+            expression: ASTNode = statement.expression
+        elif isinstance(statement, (BinOpNode, FunctionCallNode)):
+            expression: ASTNode = statement
+        else:
+            continue
+        if not is_inlinable_expression(expression, set(function.parameters)):
+            continue
+        inlinable[key] = (function.parameters, expression, index)
+    return inlinable
+
+
+def is_inlinable_expression(node: any, parameters: set) -> bool:
+    """
+    Verifica se uma expressão pode ser copiada para o local da chamada: só pode ler os parâmetros
+    (uma variável global pode ter outro valor, ou ser uma variável local, no local da chamada).
+    As strings interpoladas não são aceites, pois as suas partes só podem ser identificadores,
+    nem ENTRADA e ALEATORIO, cuja ordem em relação à leitura dos argumentos mudaria.
+    """
+    if isinstance(node, (NumberNode, StringNode)):
+        return True
+    elif isinstance(node, IdentifierNode):
+        return node.name in parameters
+    elif isinstance(node, BinOpNode):
+        return is_inlinable_expression(node.left, parameters) and is_inlinable_expression(node.right, parameters)
+    elif isinstance(node, FunctionCallNode):
+        return all(is_inlinable_expression(argument, parameters) for argument in node.arguments)
+    elif isinstance(node, ListNode):
+        return all(is_inlinable_expression(element, parameters) for element in node.elements)
+    elif isinstance(node, MapNode):
+        return is_inlinable_expression(node.list_node, parameters)
+    elif isinstance(node, FoldNode):
+        return (is_inlinable_expression(node.list_node, parameters)
+                and is_inlinable_expression(node.initial_value, parameters))
+    return False
+
+
+def substitute(node: any, mapping: dict) -> any:
+    """
+    Copia uma expressão, substituindo os identificadores dos parâmetros pelos argumentos.
+    """
+    if isinstance(node, IdentifierNode):
+        return mapping.get(node.name, node)
+    elif isinstance(node, NumberNode):
+        return NumberNode(node.value)
+    elif isinstance(node, StringNode):
+        return StringNode(node.value)
+    elif isinstance(node, BinOpNode):
+        return BinOpNode(node.operator, substitute(node.left, mapping), substitute(node.right, mapping))
+    elif isinstance(node, FunctionCallNode):
+        return FunctionCallNode(node.name, [substitute(argument, mapping) for argument in node.arguments])
+    elif isinstance(node, ListNode):
+        return ListNode([substitute(element, mapping) for element in node.elements])
+    elif isinstance(node, MapNode):
+        return MapNode(node.function, substitute(node.list_node, mapping))
+    elif isinstance(node, FoldNode):
+        return FoldNode(node.function, substitute(node.list_node, mapping), substitute(node.initial_value, mapping))
+    return node
+
+
+def collect_identifiers(node: any, names: set):
+    """
+    Junta ao conjunto os nomes de todas as variáveis lidas num nó (instrução ou expressão).
+    """
+    if isinstance(node, IdentifierNode):
+        names.add(node.name)
+    elif isinstance(node, InterpolatedStringNode):
+        for part in node.parts:
+            collect_identifiers(part, names)
+    elif isinstance(node, BinOpNode):
+        collect_identifiers(node.left, names)
+        collect_identifiers(node.right, names)
+    elif isinstance(node, FunctionCallNode):
+        for argument in node.arguments:
+            collect_identifiers(argument, names)
+    elif isinstance(node, ListNode):
+        for element in node.elements:
+            collect_identifiers(element, names)
+    elif isinstance(node, RandomNode):
+        collect_identifiers(node.upper_limit, names)
+    elif isinstance(node, MapNode):
+        collect_identifiers(node.list_node, names)
+    elif isinstance(node, FoldNode):
+        collect_identifiers(node.list_node, names)
+        collect_identifiers(node.initial_value, names)
+    elif isinstance(node, (AssignNode, WriteNode, ReturnNode)):
+        collect_identifiers(node.expression, names)
+    elif isinstance(node, (FunctionNode, BranchNode)):
+        for statement in node.body:
+            collect_identifiers(statement, names)
+        if isinstance(node, BranchNode):
+            collect_identifiers(node.condition, names)
+
+
+def collect_read_order(node: any, names: list):
+    """
+    Junta à lista os nomes das variáveis lidas numa expressão que pode ser copiada (is_inlinable_expression),
+    pela ordem em que o interpretador as lê.
+    """
+    if isinstance(node, IdentifierNode):
+        names.append(node.name)
+    elif isinstance(node, BinOpNode):
+        collect_read_order(node.left, names)
+        collect_read_order(node.right, names)
+    elif isinstance(node, FunctionCallNode):
+        for argument in node.arguments:
+            collect_read_order(argument, names)
+    elif isinstance(node, ListNode):
+        for element in node.elements:
+            collect_read_order(element, names)
+    elif isinstance(node, MapNode):
+        collect_read_order(node.list_node, names)
+    elif isinstance(node, FoldNode):
+        # O valor inicial é avaliado antes da lista
+        collect_read_order(node.initial_value, names)
+        collect_read_order(node.list_node, names)
+
+
+def unique(names) -> list:
+    """
+    Devolve os nomes sem repetições, pela ordem da primeira ocorrência.
+    """
+    return list(dict.fromkeys(names))
+
+
+def is_int_constant(node: any) -> bool:
+    return isinstance(node, NumberNode) and type(node.value) is int
+
+
+def value_type_of(node: any, known: dict) -> str:
+    """
+    Devolve o tipo do valor de uma expressão que pode ser avaliada sem efeitos e sem erros,
+    ou None se a expressão tiver efeitos, puder falhar (ex: variável não definida, 1 + "a") ou não for conhecida.
+
+    :param node: A expressão.
+    :param known: Tipos das variáveis já atribuídas.
+    """
+    if is_int_constant(node):
+        return VALUE_INT
+    elif isinstance(node, (StringNode, InterpolatedStringNode)):
+        return VALUE_STR
+    elif isinstance(node, IdentifierNode):
+        return known.get(node.name)
+    elif isinstance(node, ListNode):
+        if all(value_type_of(element, known) is not None for element in node.elements):
+            return VALUE_LIST
+    elif isinstance(node, BinOpNode):
+        left: str = value_type_of(node.left, known)
+        right: str = value_type_of(node.right, known)
+        if left is None or right is None:
+            return None
+        if node.operator == '<>':
+            return VALUE_STR
+        if node.operator in FOLDABLE_OPERATORS and left == VALUE_INT and right == VALUE_INT:
+            return VALUE_INT
+    return None
@@ -0,0 +1,114 @@
+import sys
+import time
+from itertools import chain, islice, repeat
+
+from list_view import LIST_TYPES
+
+# map paralelo (--parallel-map): map(f, lista) sobre uma função pura e cara (ex: muito recursiva) é dividido em
+# blocos que são executados num ProcessPoolExecutor. Cada processo tem o seu Interpreter, carregado uma única vez
+# (no initializer) com a tabela de funções do programa; como as funções são puras (analysis.find_pure_functions),
+# não escrevem nada nem dependem de variáveis globais, e os resultados são os mesmos (e pela mesma ordem) que os
+# das chamadas sequenciais. Quando uma função é (re)definida, os processos são terminados e recriados com a nova
+# tabela na utilização seguinte.
+# O map só é paralelo se compensar: a lista tem de ter pelo menos min_size elementos e as primeiras PROBE_SIZE
+# chamadas (feitas no próprio processo) têm de indicar que o resto demora pelo menos min_time segundos.
+
+# Valor devolvido quando o map não é paralelo
+NOT_PARALLEL = object()
+
+# Número mínimo de elementos da lista
+MIN_SIZE: int = 256
+
+# Tempo estimado mínimo (em segundos) das chamadas restantes para usar os processos
+MIN_TIME: float = 0.05
+
+# Número de elementos executados no próprio processo para estimar o custo de cada chamada
+PROBE_SIZE: int = 8
+
+# Interpreter de cada processo (criado por init_worker)
+worker_interpreter = None
+
+
+def init_worker(functions: dict, pure_functions: set, options: dict, recursion_limit: int):
+    """
+    Inicializa um processo: cria o Interpreter com as funções do programa.
+    """
+    global worker_interpreter
+    from interpreter import Interpreter
+    sys.setrecursionlimit(recursion_limit)
+    worker_interpreter = Interpreter(**options)
+    worker_interpreter.functions.update(functions)
+    worker_interpreter.pure_functions = pure_functions
+
+
+def map_chunk(name: str, chunk: list) -> list:
+    """
+    Aplica a função aos elementos de um bloco (executado num processo).
+    """
+    invoke_function = worker_interpreter.invoke_function
+    return [invoke_function(name, [element]) for element in chunk]
+
+
+class ParallelMap:
+    def __init__(self, interpreter, workers: int, options: dict, min_size: int = MIN_SIZE,
+                 min_time: float = MIN_TIME):
+        """
+        :param interpreter: O Interpreter cujas funções são executadas.
+        :param workers: O número de processos.
+        :param options: Os argumentos com que é criado o Interpreter de cada processo.
+        :param min_size: O número mínimo de elementos para o map ser paralelo.
+        :param min_time: O tempo estimado mínimo (segundos) das chamadas para o map ser paralelo.
+        """
+        self.interpreter = interpreter
+        self.workers: int = workers
+        self.options: dict = options
+        self.min_size: int = min_size
+        self.min_time: float = min_time
+        self.executor = None
+
+    def map(self, name: str, list_value: any) -> any:
+        """
+        Aplica a função a todos os elementos da lista, em paralelo se compensar.
+
+        :return: A lista com os resultados, ou NOT_PARALLEL se a função não for pura ou a lista for pequena.
+        """
+        if self.workers < 2 or name not in self.interpreter.pure_functions \
+                or not isinstance(list_value, LIST_TYPES) or len(list_value) < self.min_size:
+            return NOT_PARALLEL
+
+        # Executa as primeiras chamadas aqui, para estimar o custo das restantes
+        invoke_function = self.interpreter.invoke_function
+        elements: list = list_value if isinstance(list_value, list) else list_value.to_list()
+        start: float = time.perf_counter()
+        results: list = [invoke_function(name, [element]) for element in islice(elements, PROBE_SIZE)]
+        elapsed: float = time.perf_counter() - start
+        rest: list = elements[PROBE_SIZE:]
+        if elapsed / PROBE_SIZE * len(rest) < self.min_time:
+            results.extend(invoke_function(name, [element]) for element in rest)
+            return results
+
+        # Vários blocos por processo, para equilibrar a carga quando o custo varia entre elementos
+        chunk_size: int = max(1, -(-len(rest) // (self.workers * 4)))
+        chunks: list = [rest[index:index + chunk_size] for index in range(0, len(rest), chunk_size)]
+        results.extend(chain.from_iterable(self.get_executor().map(map_chunk, repeat(name), chunks)))
+        return results
+
+    def get_executor(self):
+        """
+        Devolve o conjunto de processos, criando-o (com a tabela de funções atual) se ainda não existir.
+        """
+        if self.executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=init_worker,
+                initargs=(self.interpreter.functions, self.interpreter.pure_functions, self.options,
+                          sys.getrecursionlimit()))
+        return self.executor
+
+    def close(self):
+        """
+        Termina os processos (ex: quando as funções mudam, porque têm uma cópia da tabela de funções antiga).
+        """
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
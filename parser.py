@@ -353,5 +353,22 @@ def p_padrao_lista_cabeca_cauda(p):
 # FUNCAO somatorio(x:xs), : x + somatorio(xs);
 
 
+def build_parser(debug: bool = False, write_tables: bool = False) -> yacc.LRParser:
+    """
+    Constrói o parser a partir das tabelas pré-geradas em parsetab.py.
+    O PLY só usa as tabelas se a assinatura guardada corresponder à gramática atual; caso contrário, volta a
+    calculá-las em memória (mais lento), sem escrever ficheiros, até que sejam regeneradas com `python parser.py`.
+
+    :param debug: Se True, escreve a descrição da gramática e dos estados em parser.out.
+    :param write_tables: Se True, escreve as tabelas em parsetab.py.
+    :return: O parser.
+    """
+    return yacc.yacc(debug=debug, write_tables=write_tables)
+
+
 # Inicializa o parser
-parser = yacc.yacc()
+parser = build_parser()
+
+# Regenera as tabelas (parsetab.py) e o ficheiro de debug (parser.out) depois de alterar a gramática
+if __name__ == "__main__":
+    build_parser(debug=True, write_tables=True)
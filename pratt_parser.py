@@ -0,0 +1,411 @@
+from ast_nodes import *
+
+# Parser descendente recursivo (com um analisador de Pratt para as expressões), alternativo ao parser do PLY.
+# Produz as mesmas árvores (os mesmos nós de ast_nodes) que o parser.py, mas:
+# - em tempo linear: as listas de instruções, argumentos, parâmetros e elementos são construídas com append,
+#   enquanto as regras do parser.py copiam a lista em cada redução (p[1] + [p[3]]), o que é O(N²);
+# - com precedência: * e / antes de + e -, e estes antes de <> (todos associativos à esquerda).
+#   A gramática do parser.py não declara precedências e o PLY resolve os conflitos deslocando, pelo que
+#   todos os operadores têm a mesma precedência e associam à direita (2*3+4 é 2*(3+4)).
+#   Com precedence=False este parser reproduz esse comportamento, o que permite comparar as árvores dos dois.
+#
+# As instruções podem ser lidas uma a uma (parse_statement, parse_file), sem construir o ProgramNode.
+# Em caso de erro de sintaxe, a mensagem tem o mesmo formato que no parser.py, e a análise continua
+# depois do próximo ';' (a recuperação de erros do PLY é diferente, pelo que o resto da árvore pode diferir).
+
+# Poder de ligação (à esquerda, à direita) de cada operador binário
+PRECEDENCE: dict = {
+    '<>': (10, 11),
+    '+': (20, 21),
+    '-': (20, 21),
+    '*': (30, 31),
+    '/': (30, 31)
+}
+
+# Sem precedência (como o parser.py): todos os operadores ao mesmo nível e associativos à direita
+NO_PRECEDENCE: dict = {operator: (10, 10) for operator in PRECEDENCE}
+
+BINARY_OPERATOR_TOKENS: frozenset = frozenset(('OPERADOR_ARITMETICO', 'OPERADOR_CONCAT'))
+
+
+class ParseError(ValueError):
+    """
+    Erro de sintaxe (usado internamente para voltar ao início da instrução).
+    """
+
+
+def interpolated_parts(text: str) -> list:
+    """
+    Extrai as partes de uma string interpolada: StringNode para o texto e IdentifierNode para cada #{nome}.
+
+    :param text: O valor do token INTERPOLATED_STRING (sem as aspas).
+    :return: A lista de partes.
+    """
+    parts: list = []
+    current: str = ''
+    i: int = 0
+    while i < len(text):
+        # Verifica se encontrou uma expressão interpolada (#{...})
+        if text[i] == '#' and text[i + 1] == '{':
+            if current:
+                parts.append(StringNode(current))
+                current = ''
+            i += 2
+            name: str = ''
+            # Extrai o nome da variável dentro da expressão interpolada
+            while text[i] != '}':
+                name += text[i]
+                i += 1
+            parts.append(IdentifierNode(name))
+        else:
+            current += text[i]
+        i += 1
+    if current:
+        parts.append(StringNode(current))
+    return parts
+
+
+class PrattParser:
+    def __init__(self, precedence: bool = True):
+        """
+        Inicializa o parser.
+
+        :param precedence: Se True, os operadores têm a precedência habitual; se False, todos têm a mesma
+                           e associam à direita, como no parser.py.
+        """
+        self.binding_powers: dict = PRECEDENCE if precedence else NO_PRECEDENCE
+        self.next_token = None
+        self.current = None
+        self.errors: int = 0
+
+    def parse(self, data: str, lexer=None) -> ProgramNode:
+        """
+        Analisa o código fonte (mesma interface que parser.parse do PLY).
+
+        :param data: O código fonte.
+        :param lexer: O analisador léxico (com os métodos input e token); por omissão, um Scanner.
+        :return: O ProgramNode, ou None se não houver nenhuma instrução válida.
+        """
+        self.start(data, lexer)
+        statements: list = []
+        while True:
+            statement: ASTNode = self.parse_statement()
+            if statement is None:
+                break
+            statements.append(statement)
+        if not statements:
+            if not self.errors:
+                # Programa vazio: tal como no PLY, é um erro de sintaxe no fim do código
+                self.report(None)
+            return None
+        return ProgramNode(statements)
+
+    def parse_file(self, file, chunk_size: int = None):
+        """
+        Analisa um ficheiro lido aos blocos, produzindo cada instrução do nível de topo assim que é lida,
+        para que possa ser executada antes de o resto do ficheiro ser lido.
+
+        :param file: O ficheiro, aberto em modo de texto.
+        :param chunk_size: Número de caracteres lidos de cada vez (por omissão, scanner.CHUNK_SIZE).
+        :return: Um gerador das instruções.
+        """
+        from scanner import CHUNK_SIZE, Scanner
+        lexer = Scanner()
+        lexer.input_file(file, chunk_size or CHUNK_SIZE)
+        self.next_token = lexer.token
+        self.current = self.next_token()
+        count: int = 0
+        while True:
+            statement: ASTNode = self.parse_statement()
+            if statement is None:
+                break
+            count += 1
+            yield statement
+        if not count and not self.errors:
+            self.report(None)
+
+    def start(self, data: str, lexer=None):
+        """
+        Prepara a leitura dos tokens do código fonte.
+        """
+        if lexer is None:
+            from scanner import Scanner
+            lexer = Scanner()
+        lexer.input(data)
+        self.next_token = lexer.token
+        self.current = self.next_token()
+
+    def parse_statement(self) -> ASTNode:
+        """
+        Lê a próxima instrução do nível de topo.
+
+        :return: A instrução, ou None no fim do código.
+        """
+        while self.current is not None:
+            try:
+                return self.statement()
+            except ParseError:
+                self.recover()
+        return None
+
+    # Tokens
+
+    def advance(self) -> any:
+        """
+        Consome o token atual e devolve-o.
+        """
+        token = self.current
+        self.current = self.next_token()
+        return token
+
+    def expect(self, token_type: str) -> any:
+        """
+        Consome o token atual, que tem de ser do tipo dado, e devolve o seu valor.
+        """
+        token = self.current
+        if token is None or token.type != token_type:
+            self.error()
+        self.current = self.next_token()
+        return token.value
+
+    def check(self, token_type: str) -> bool:
+        return self.current is not None and self.current.type == token_type
+
+    def error(self):
+        self.report(self.current)
+        raise ParseError()
+
+    def report(self, token: any):
+        self.errors += 1
+        print(f"Erro de sintaxe: {token}")
+
+    def recover(self):
+        """
+        Descarta tokens até ao fim da instrução com o erro (o próximo ';').
+        """
+        while self.current is not None:
+            token = self.advance()
+            if token.type == 'PONTO_E_VIRGULA':
+                return
+
+    # Instruções
+
+    def statement(self) -> ASTNode:
+        token_type: str = self.current.type
+
+        if token_type == 'FUNCAO':
+            return self.function()
+
+        if token_type == 'ESCREVER':
+            self.advance()
+            self.expect('PARENTESES_ESQ')
+            expression: ASTNode = self.expression()
+            self.expect('PARENTESES_DIR')
+            self.expect('PONTO_E_VIRGULA')
+            return WriteNode(expression)
+
+        if token_type == 'IDENTIFICADOR':
+            name: str = self.advance().value
+            if self.check('ATRIBUICAO'):
+                self.advance()
+                expression: ASTNode = self.expression()
+                self.expect('PONTO_E_VIRGULA')
+                return AssignNode(name, expression)
+            # Instrução que é uma expressão começada por um identificador (ex: uma chamada)
+            expression: ASTNode = self.binary(self.identifier(name), 0)
+        else:
+            expression: ASTNode = self.expression()
+        self.expect('PONTO_E_VIRGULA')
+        return expression
+
+    def statement_list(self) -> list:
+        """
+        Lê as instruções do corpo de uma função de várias linhas, até ao FIM (tem de haver pelo menos uma).
+        """
+        statements: list = [self.statement()]
+        while not self.check('FIM'):
+            if self.current is None:
+                self.error()
+            statements.append(self.statement())
+        self.advance()
+        return statements
+
+    def function(self) -> ASTNode:
+        """
+        Lê uma definição de função: FUNCAO nome(...) seguido de ',: expressão;' ou de ': instruções FIM'.
+        Tal como no parser.py, o que está entre parênteses pode ser uma lista de parâmetros, um padrão de lista
+        (x:xs) ou uma expressão (ramo, ex: fib(0) ou somatorio([])), que só existe na forma inline.
+        """
+        self.advance()
+        name: str = self.expect('IDENTIFICADOR')
+        self.expect('PARENTESES_ESQ')
+
+        parameters: list = None
+        condition: ASTNode = None
+        if self.check('PARENTESES_DIR') or self.check('VIRGULA'):
+            # Sem parâmetros (a gramática também aceita uma vírgula antes do primeiro, ex: f(, a))
+            parameters = self.parameters([])
+        elif self.check('NUMERO'):
+            value: int = self.advance().value
+            if self.check('PARENTESES_DIR'):
+                condition = NumberNode(value)
+            else:
+                condition = self.branch_condition(self.binary(NumberNode(value), 0))
+        elif self.check('IDENTIFICADOR'):
+            first: str = self.advance().value
+            if self.check('DOIS_PONTOS'):
+                self.advance()
+                parameters = [ListPatternNode(first, self.expect('IDENTIFICADOR'))]
+            elif self.check('PARENTESES_DIR') or self.check('VIRGULA'):
+                parameters = self.parameters([first])
+            else:
+                condition = self.branch_condition(self.binary(self.identifier(first), 0))
+        else:
+            condition = self.branch_condition(self.expression())
+        self.expect('PARENTESES_DIR')
+
+        if condition is not None:
+            # Ramo: só existe a forma inline
+            self.expect('VIRGULA')
+            self.expect('DOIS_PONTOS')
+            body: list = [ReturnNode(self.expression())]
+            self.expect('PONTO_E_VIRGULA')
+            return BranchNode(name, condition, body)
+
+        if self.check('VIRGULA'):
+            self.advance()
+            self.expect('DOIS_PONTOS')
+            body: list = [ReturnNode(self.expression())]
+            self.expect('PONTO_E_VIRGULA')
+        else:
+            self.expect('DOIS_PONTOS')
+            body: list = self.statement_list()
+        return FunctionNode(name, parameters, body)
+
+    def parameters(self, parameters: list) -> list:
+        while self.check('VIRGULA'):
+            self.advance()
+            parameters.append(self.expect('IDENTIFICADOR'))
+        return parameters
+
+    def branch_condition(self, expression: ASTNode) -> ASTNode:
+        # Como no parser.py: as listas são padrões; qualquer outra expressão fica dentro de um NumberNode
+        if isinstance(expression, ListNode):
+            return expression
+        return NumberNode(expression)
+
+    # Expressões
+
+    def expression(self) -> ASTNode:
+        return self.binary(self.primary(), 0)
+
+    def binary(self, left: ASTNode, min_power: int) -> ASTNode:
+        """
+        Lê os operadores binários que se seguem a left (analisador de Pratt).
+
+        :param left: O operando esquerdo já lido.
+        :param min_power: O poder de ligação mínimo dos operadores que podem ser consumidos.
+        :return: A expressão.
+        """
+        binding_powers: dict = self.binding_powers
+        while self.current is not None and self.current.type in BINARY_OPERATOR_TOKENS:
+            operator: str = self.current.value
+            left_power, right_power = binding_powers[operator]
+            if left_power < min_power:
+                break
+            self.advance()
+            right: ASTNode = self.binary(self.primary(), right_power)
+            left = BinOpNode(operator, left, right)
+        return left
+
+    def primary(self) -> ASTNode:
+        token = self.current
+        if token is None:
+            self.error()
+        token_type: str = token.type
+
+        if token_type == 'NUMERO':
+            self.advance()
+            return NumberNode(token.value)
+
+        if token_type == 'IDENTIFICADOR':
+            self.advance()
+            return self.identifier(token.value)
+
+        if token_type == 'STRING':
+            self.advance()
+            return StringNode(token.value)
+
+        if token_type == 'INTERPOLATED_STRING':
+            self.advance()
+            return InterpolatedStringNode(interpolated_parts(token.value))
+
+        if token_type == 'PARENTESES_ESQ':
+            self.advance()
+            expression: ASTNode = self.expression()
+            self.expect('PARENTESES_DIR')
+            return expression
+
+        if token_type == 'COLCHETES_ESQ':
+            self.advance()
+            elements: list = []
+            if not self.check('COLCHETES_DIR'):
+                elements.append(self.expression())
+                while self.check('VIRGULA'):
+                    self.advance()
+                    elements.append(self.expression())
+            self.expect('COLCHETES_DIR')
+            return ListNode(elements)
+
+        if token_type == 'ENTRADA':
+            self.advance()
+            self.expect('PARENTESES_ESQ')
+            self.expect('PARENTESES_DIR')
+            return InputNode()
+
+        if token_type == 'ALEATORIO':
+            self.advance()
+            self.expect('PARENTESES_ESQ')
+            upper_limit: ASTNode = self.expression()
+            self.expect('PARENTESES_DIR')
+            return RandomNode(upper_limit)
+
+        if token_type == 'MAP':
+            self.advance()
+            self.expect('PARENTESES_ESQ')
+            function: str = self.expect('IDENTIFICADOR')
+            self.expect('VIRGULA')
+            list_node: ASTNode = self.expression()
+            self.expect('PARENTESES_DIR')
+            return MapNode(function, list_node)
+
+        if token_type == 'FOLD':
+            self.advance()
+            self.expect('PARENTESES_ESQ')
+            function: str = self.expect('IDENTIFICADOR')
+            self.expect('VIRGULA')
+            list_node: ASTNode = self.expression()
+            self.expect('VIRGULA')
+            initial_value: ASTNode = self.expression()
+            self.expect('PARENTESES_DIR')
+            return FoldNode(function, list_node, initial_value)
+
+        self.error()
+
+    def identifier(self, name: str) -> ASTNode:
+        """
+        Completa uma expressão começada por um identificador já consumido: uma chamada, se seguir '(',
+        ou uma variável.
+        """
+        if not self.check('PARENTESES_ESQ'):
+            return IdentifierNode(name)
+        self.advance()
+        arguments: list = []
+        # Tal como nos parâmetros, a gramática aceita uma vírgula antes do primeiro argumento
+        if not self.check('PARENTESES_DIR') and not self.check('VIRGULA'):
+            arguments.append(self.expression())
+        while self.check('VIRGULA'):
+            self.advance()
+            arguments.append(self.expression())
+        self.expect('PARENTESES_DIR')
+        return FunctionCallNode(name, arguments)
@@ -0,0 +1,221 @@
+import json
+import sys
+import threading
+import time
+
+from ast_nodes import ListPatternNode
+from dispatch import CLAUSE_LIST, CLAUSE_NUMBER, Clause
+
+# Profiler das chamadas de funções do Interpreter (--profile).
+# Para cada cláusula (ramo com um literal, padrão de lista ou definição normal) de cada função regista:
+# - o número de chamadas;
+# - o tempo inclusivo (com as funções chamadas; numa função recursiva só conta a chamada mais exterior);
+# - o tempo exclusivo (sem as funções chamadas);
+# - a profundidade máxima de recursão da função (chamadas ativas com o mesmo nome e número de argumentos).
+# O Interpreter só usa o profiler quando é criado com profile=True (troca o invoke_function pelo
+# invoke_profiled), pelo que sem --profile as chamadas não têm nenhum custo adicional.
+# O StackSampler (--sample) é a alternativa com pouco custo para execuções longas: em vez de medir todas as
+# chamadas, regista periodicamente a pilha de chamadas FCA, em pilhas colapsadas para flamegraphs.
+
+
+class FunctionProfile:
+    def __init__(self, name: str, arity: int, clause: str):
+        """
+        Estatísticas de uma cláusula de uma função.
+
+        :param name: O nome da função.
+        :param arity: O número de argumentos.
+        :param clause: A descrição da cláusula (ex: fib(0), soma(x:xs), fib(n)).
+        """
+        self.name: str = name
+        self.arity: int = arity
+        self.clause: str = clause
+        self.calls: int = 0
+        self.inclusive: float = 0.0
+        self.exclusive: float = 0.0
+        self.max_depth: int = 0
+        # Chamadas desta cláusula ainda ativas (para não contar duas vezes o tempo inclusivo na recursão)
+        self.active: int = 0
+
+    def merge(self, other: 'FunctionProfile'):
+        self.calls += other.calls
+        self.inclusive += other.inclusive
+        self.exclusive += other.exclusive
+        self.max_depth = max(self.max_depth, other.max_depth)
+
+    def to_dict(self) -> dict:
+        return {
+            'function': self.name,
+            'arity': self.arity,
+            'clause': self.clause,
+            'calls': self.calls,
+            'inclusive': self.inclusive,
+            'exclusive': self.exclusive,
+            'max_depth': self.max_depth
+        }
+
+
+def clause_label(name: str, clause: Clause) -> str:
+    """
+    Descreve uma cláusula como na definição da função (ex: fib(0), soma([]), soma(x:xs), soma(a, b)).
+    """
+    if clause.kind == CLAUSE_NUMBER:
+        return f"{name}({clause.pattern})"
+    if clause.kind == CLAUSE_LIST:
+        pattern: any = clause.pattern
+        return f"{name}({pattern if isinstance(pattern, list) else '[...]'})"
+    parameters: list = [f"{param.head}:{param.tail}" if isinstance(param, ListPatternNode) else str(param)
+                        for param in clause.parameters]
+    return f"{name}({', '.join(parameters)})"
+
+
+class CallProfiler:
+    def __init__(self):
+        # Estatísticas de cada cláusula (Clause -> FunctionProfile)
+        self.entries: dict = {}
+        # Profundidade atual de cada função ((nome, número de argumentos) -> chamadas ativas)
+        self.depths: dict = {}
+        # Chamadas ativas: [FunctionProfile, (nome, aridade), tempo das chamadas filhas, início]
+        self.stack: list = []
+        self.clock = time.perf_counter
+
+    def enter(self, name: str, arity: int, clause: Clause) -> list:
+        """
+        Regista o início de uma chamada.
+
+        :return: A frame da chamada, a passar a exit.
+        """
+        profile: FunctionProfile = self.entries.get(clause)
+        if profile is None:
+            profile = FunctionProfile(name, arity, clause_label(name, clause))
+            self.entries[clause] = profile
+        key: tuple = (name, arity)
+        depth: int = self.depths.get(key, 0) + 1
+        self.depths[key] = depth
+        if depth > profile.max_depth:
+            profile.max_depth = depth
+        profile.active += 1
+        frame: list = [profile, key, 0.0, self.clock()]
+        self.stack.append(frame)
+        return frame
+
+    def exit(self, frame: list):
+        """
+        Regista o fim de uma chamada (também quando termina com uma exceção).
+        """
+        elapsed: float = self.clock() - frame[3]
+        self.stack.pop()
+        profile: FunctionProfile = frame[0]
+        profile.calls += 1
+        profile.exclusive += elapsed - frame[2]
+        profile.active -= 1
+        if not profile.active:
+            profile.inclusive += elapsed
+        self.depths[frame[1]] -= 1
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def results(self) -> list:
+        """
+        Devolve as estatísticas por cláusula (juntando as redefinições com a mesma descrição),
+        ordenadas pelo tempo exclusivo.
+        """
+        merged: dict = {}
+        for profile in self.entries.values():
+            key: tuple = (profile.name, profile.arity, profile.clause)
+            if key not in merged:
+                merged[key] = FunctionProfile(*key)
+            merged[key].merge(profile)
+        return sorted(merged.values(), key=lambda profile: (-profile.exclusive, profile.clause))
+
+    def report(self, file=sys.stderr):
+        """
+        Escreve o relatório em texto.
+        """
+        results: list = self.results()
+        width: int = max([len(profile.clause) for profile in results] + [8])
+        print(f"{'Cláusula':<{width}} {'chamadas':>10} {'inclusivo':>12} {'exclusivo':>12} {'profundidade':>12}",
+              file=file)
+        for profile in results:
+            print(f"{profile.clause:<{width}} {profile.calls:>10} {profile.inclusive * 1000:>9.3f} ms "
+                  f"{profile.exclusive * 1000:>9.3f} ms {profile.max_depth:>12}", file=file)
+
+    def write_json(self, path: str):
+        with open(path, 'w') as file:
+            json.dump([profile.to_dict() for profile in self.results()], file, indent=2)
+
+
+class StackSampler:
+    def __init__(self, interpreter, interval: float = 0.005, root: str = 'programa'):
+        """
+        Profiler por amostragem (--sample): uma thread em segundo plano regista periodicamente a pilha de
+        chamadas FCA da thread que executa o programa. A pilha não é mantida pelo interpretador (o que teria
+        um custo em cada chamada): é reconstruída a partir das frames Python de invoke_function (e das
+        variáveis name e clause de cada uma), pelo que o custo só existe em cada amostra.
+
+        :param interpreter: O Interpreter que executa o programa.
+        :param interval: O intervalo entre amostras, em segundos.
+        :param root: O nome da base de todas as pilhas (ex: o nome do ficheiro).
+        """
+        self.interval: float = interval
+        self.root: str = root
+        # Código das versões de invoke_function que executam as cláusulas
+        self.codes: set = {type(interpreter).invoke_function.__code__, type(interpreter).invoke_profiled.__code__}
+        # Número de amostras de cada pilha (tuplo de descrições -> contagem)
+        self.samples: dict = {}
+        # Descrição de cada cláusula (Clause -> str), para não a construir em cada amostra
+        self.labels: dict = {}
+        self.thread_id: int = None
+        self.thread: threading.Thread = None
+        self.stopped: threading.Event = threading.Event()
+
+    def start(self):
+        """
+        Começa a amostragem da thread atual.
+        """
+        self.thread_id = threading.get_ident()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """
+        Regista a pilha atual da thread amostrada.
+        """
+        frame = sys._current_frames().get(self.thread_id)
+        stack: list = []
+        while frame is not None:
+            if frame.f_code in self.codes:
+                variables: dict = frame.f_locals
+                stack.append(self.label(variables.get('name'), variables.get('clause')))
+            frame = frame.f_back
+        stack.append(self.root)
+        key: tuple = tuple(reversed(stack))
+        self.samples[key] = self.samples.get(key, 0) + 1
+
+    def label(self, name: str, clause: Clause) -> str:
+        if clause is None:
+            # A cláusula ainda está a ser escolhida
+            return str(name)
+        label: str = self.labels.get(clause)
+        if label is None:
+            label = clause_label(name, clause)
+            self.labels[clause] = label
+        return label
+
+    def write_collapsed(self, path: str):
+        """
+        Escreve as amostras no formato de pilhas colapsadas ("programa;f(n);f(0) 12" em cada linha),
+        aceite pelo flamegraph.pl, pelo speedscope e por outras ferramentas de flamegraphs.
+        """
+        with open(path, 'w') as file:
+            for stack, count in sorted(self.samples.items()):
+                file.write(f"{';'.join(stack)} {count}\n")
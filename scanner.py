@@ -0,0 +1,284 @@
+import re
+from lexer import tokens
+
+# Analisador léxico escrito à mão, que substitui o lexer do PLY (lexer.py).
+# Produz exatamente a mesma sequência de tokens (tipo, valor e posição) que o lexer do PLY, mas:
+# - percorre o código uma única vez, escolhendo a regra pelo primeiro carácter, em vez de tentar
+#   a expressão regular com todas as regras em cada posição;
+# - as palavras reservadas são procuradas numa tabela de hash, e não numa procura linear no tuplo tokens;
+# - cada token tem a linha (lineno) e a coluna corretas (no lexer do PLY o t_newline nunca é chamado,
+#   porque o \n já é ignorado pelo t_ignore, e todos os tokens ficam na linha 1);
+# - o código pode ser lido de um ficheiro aos blocos (input_file), sem nunca estar todo em memória.
+#
+# Tal como no lexer do PLY, um identificador cujo nome em maiúsculas é o nome de um token
+# (ex: ESCREVER, map, fold) passa a ser um token desse tipo.
+
+# Tabela de palavras reservadas: nome em maiúsculas -> tipo do token
+KEYWORDS: dict = {name: name for name in tokens}
+
+# Tokens de um só carácter
+SINGLE_CHARACTER_TOKENS: dict = {
+    '=': 'ATRIBUICAO',
+    '+': 'OPERADOR_ARITMETICO',
+    '*': 'OPERADOR_ARITMETICO',
+    ';': 'PONTO_E_VIRGULA',
+    ',': 'VIRGULA',
+    ':': 'DOIS_PONTOS',
+    '(': 'PARENTESES_ESQ',
+    ')': 'PARENTESES_DIR',
+    '[': 'COLCHETES_ESQ',
+    ']': 'COLCHETES_DIR'
+}
+
+# Tamanho (em caracteres) de cada bloco lido por input_file
+CHUNK_SIZE: int = 1 << 20
+
+# Número de caracteres que podem ficar por analisar à espera do fim de uma linha com uma string (ver scan_file)
+MAX_PENDING: int = 4 * CHUNK_SIZE
+
+IDENTIFIER_START: frozenset = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+IDENTIFIER_RE = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*[!?]?')
+# \d aceita qualquer dígito Unicode, tal como a regra t_NUMERO
+NUMBER_RE = re.compile(r'\d+')
+
+
+class Token:
+    """
+    Um token, com os mesmos atributos que os LexToken do PLY (type, value, lineno, lexpos) e a coluna.
+    """
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'column', 'lexer')
+
+    def __init__(self, type: str, value: any, lineno: int, lexpos: int, column: int):
+        self.type: str = type
+        self.value: any = value
+        self.lineno: int = lineno
+        self.lexpos: int = lexpos
+        self.column: int = column
+
+    def __repr__(self) -> str:
+        # O mesmo formato dos LexToken, usado nas mensagens de erro de sintaxe
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+    __str__ = __repr__
+
+
+class Scanner:
+    def __init__(self):
+        self.data: str = ''
+        self.generator = iter(())
+
+    def input(self, data: str):
+        """
+        Define o código a analisar (mesma interface que o lexer do PLY, para poder ser usado pelo parser).
+        """
+        self.data = data
+        self.generator = self.scan(data)
+
+    def input_file(self, file, chunk_size: int = CHUNK_SIZE):
+        """
+        Define o ficheiro (já aberto, em modo de texto) a analisar, que é lido aos blocos à medida que os tokens
+        são pedidos.
+
+        :param file: O ficheiro.
+        :param chunk_size: Número de caracteres lidos de cada vez.
+        """
+        self.data = ''
+        self.generator = self.scan_file(file, chunk_size)
+
+    def token(self) -> Token:
+        """
+        Devolve o próximo token, ou None no fim do código.
+        """
+        return next(self.generator, None)
+
+    def __iter__(self):
+        return self.generator
+
+    def scan_file(self, file, chunk_size: int = CHUNK_SIZE):
+        """
+        Gera os tokens de um ficheiro lido aos blocos.
+        Cada bloco é analisado até ao último token completo: um token que chega ao fim do bloco (e que pode
+        continuar no seguinte), um comentário de várias linhas que ainda não terminou ou uma string cuja linha
+        ainda não terminou (a regra t_INTERPOLATED_STRING pode ir até ao fim da linha) ficam para o bloco seguinte.
+        Assim, um programa sem mudanças de linha também é analisado aos blocos:
+        - de um comentário de uma linha que ainda não terminou só fica o início (--), pois o resto é ignorado;
+        - quando a linha de uma string passa de MAX_PENDING caracteres (ou de 4 blocos, se forem maiores), a string
+          é analisada só com o que já foi lido (uma interpolação mais à frente na mesma linha deixa de ser
+          encontrada).
+
+        :param file: O ficheiro, em modo de texto.
+        :param chunk_size: Número de caracteres lidos de cada vez.
+        :return: Um gerador de Token, com as mesmas posições que se o ficheiro fosse lido de uma vez.
+        """
+        max_pending: int = max(MAX_PENDING, 4 * chunk_size)
+        pending: str = ''
+        offset: int = 0
+        line: int = 1
+        column: int = 1
+        while True:
+            chunk: str = file.read(chunk_size)
+            final: bool = not chunk
+            pending += chunk
+            consumed, line, column = yield from self.scan(pending, final, offset, line, column,
+                                                          len(pending) > max_pending)
+            offset += consumed
+            pending = pending[consumed:]
+            if final:
+                return
+            if pending.startswith('--'):
+                # Comentário de uma linha que não termina neste bloco: só o -- é guardado, na posição dos dois
+                # últimos caracteres (o resto da linha é ignorado e os tokens seguintes ficam na linha seguinte)
+                skipped: int = len(pending) - 2
+                offset += skipped
+                column += skipped
+                pending = '--'
+
+    def scan(self, data: str, final: bool = True, offset: int = 0, line: int = 1, column: int = 1,
+             force: bool = False):
+        """
+        Gera os tokens do código fonte.
+
+        :param data: O código fonte (ou um bloco).
+        :param final: Se False, há mais código depois de data, e a análise pára no primeiro token que pode
+                      continuar no próximo bloco (ver scan_file).
+        :param offset: Posição de data no código fonte completo (somada ao lexpos de cada token).
+        :param line: Linha onde data começa.
+        :param column: Coluna onde data começa.
+        :param force: Se True, uma string cuja linha não termina em data é analisada só com data.
+        :return: Um gerador de Token, que devolve (posição em data onde parou, linha, coluna).
+        """
+        keywords: dict = KEYWORDS
+        single: dict = SINGLE_CHARACTER_TOKENS
+        identifier_start: frozenset = IDENTIFIER_START
+        match_identifier = IDENTIFIER_RE.match
+        match_number = NUMBER_RE.match
+        find = data.find
+        length: int = len(data)
+        pos: int = 0
+        line_start: int = 1 - column
+
+        while pos < length:
+            char: str = data[pos]
+
+            if char == ' ' or char == '\t':
+                pos += 1
+
+            elif char == '\n':
+                pos += 1
+                line += 1
+                line_start = pos
+
+            elif char in identifier_start:
+                value: str = match_identifier(data, pos).group()
+                if not final and pos + len(value) == length:
+                    # O identificador pode continuar no próximo bloco
+                    break
+                yield Token(keywords.get(value.upper(), 'IDENTIFICADOR'), value, line, offset + pos,
+                            pos - line_start + 1)
+                pos += len(value)
+
+            elif char in single:
+                yield Token(single[char], char, line, offset + pos, pos - line_start + 1)
+                pos += 1
+
+            elif char.isdecimal():
+                value: str = match_number(data, pos).group()
+                if not final and pos + len(value) == length:
+                    break
+                yield Token('NUMERO', int(value), line, offset + pos, pos - line_start + 1)
+                pos += len(value)
+
+            elif char == '"':
+                # As strings não podem ter mudanças de linha
+                line_end: int = find('\n', pos)
+                if line_end < 0:
+                    if not final and not force:
+                        # A linha (e a string) pode continuar no próximo bloco
+                        break
+                    line_end = length
+                end: int = -1
+                # Regra t_INTERPOLATED_STRING: ".*?\#\{.*?\}.*?"
+                start_interpolation: int = find('#{', pos + 1, line_end)
+                if start_interpolation >= 0:
+                    end_interpolation: int = find('}', start_interpolation + 2, line_end)
+                    if end_interpolation >= 0:
+                        end = find('"', end_interpolation + 1, line_end)
+                if end >= 0:
+                    yield Token('INTERPOLATED_STRING', data[pos + 1:end], line, offset + pos, pos - line_start + 1)
+                    pos = end + 1
+                    continue
+                # Regra t_STRING: ".*?"
+                end = find('"', pos + 1, line_end)
+                if end >= 0:
+                    yield Token('STRING', data[pos + 1:end], line, offset + pos, pos - line_start + 1)
+                    pos = end + 1
+                else:
+                    pos = self.illegal_character(char, pos)
+
+            elif char == '-':
+                if not final and pos + 1 == length:
+                    # Pode ser o início de um comentário (--)
+                    break
+                if data.startswith('-', pos + 1):
+                    # Comentário de uma linha
+                    line_end: int = find('\n', pos)
+                    if line_end < 0 and not final:
+                        # O comentário continua no próximo bloco (scan_file só guarda o --)
+                        break
+                    pos = length if line_end < 0 else line_end
+                else:
+                    yield Token('OPERADOR_ARITMETICO', char, line, offset + pos, pos - line_start + 1)
+                    pos += 1
+
+            elif char == '{':
+                if not final and pos + 1 == length:
+                    break
+                end: int = find('-}', pos + 2) if data.startswith('-', pos + 1) else -1
+                if end >= 0:
+                    # Comentário de várias linhas
+                    newlines: int = data.count('\n', pos, end)
+                    if newlines:
+                        line += newlines
+                        line_start = data.rfind('\n', pos, end) + 1
+                    pos = end + 2
+                elif not final and data.startswith('-', pos + 1):
+                    # O comentário continua no próximo bloco
+                    break
+                else:
+                    pos = self.illegal_character(char, pos)
+
+            elif char == '/':
+                if not final and pos + 1 == length:
+                    break
+                if data.startswith('\\', pos + 1):
+                    yield Token('OPERADOR_LOGICO', '/\\', line, offset + pos, pos - line_start + 1)
+                    pos += 2
+                else:
+                    yield Token('OPERADOR_ARITMETICO', char, line, offset + pos, pos - line_start + 1)
+                    pos += 1
+
+            elif (char == '\\' or char == '<') and not final and pos + 1 == length:
+                # Pode ser o início de \/ ou <>
+                break
+
+            elif char == '\\' and data.startswith('/', pos + 1):
+                yield Token('OPERADOR_LOGICO', '\\/', line, offset + pos, pos - line_start + 1)
+                pos += 2
+
+            elif char == '<' and data.startswith('>', pos + 1):
+                yield Token('OPERADOR_CONCAT', '<>', line, offset + pos, pos - line_start + 1)
+                pos += 2
+
+            else:
+                pos = self.illegal_character(char, pos)
+
+        return pos, line, pos - line_start + 1
+
+    def illegal_character(self, char: str, pos: int) -> int:
+        """
+        Trata um carácter que não pertence a nenhum token, como o t_error do lexer.py.
+
+        :return: A posição seguinte ao carácter.
+        """
+        print(f"Caracter ilegal '{char}' ")
+        return pos + 1
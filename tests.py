@@ -1,34 +1,165 @@
+import argparse
+import contextlib
+import difflib
+import io
 import os
-import subprocess
+import random
+import sys
+import tempfile
+import time
+
+# Testes com ficheiros de referência (golden): cada exemplo .fca é executado no próprio processo (ou num conjunto de
+# processos que ficam ativos durante todos os testes, com -j), e o que o programa escreve e o código C gerado são
+# comparados com os ficheiros guardados em golden/:
+# - <nome>.out: o que o interpretador escreve (com o erro que interrompeu a execução, se houver);
+# - <nome>.c: o código C gerado (ou o erro do gerador de código C);
+# - <nome>.in (opcional): o que o programa lê com ENTRADA().
+# O gerador de números aleatórios é inicializado com a mesma semente em cada teste, para que ALEATORIO seja
+# reprodutível. Com --update, os ficheiros de referência são (re)escritos com os resultados atuais.
+
+ROOT: str = os.path.dirname(os.path.abspath(__file__))
 
 # dir onde estão os arquivos .fca
-input_dir = './exemplos'
-output_dir = './outputs'
+input_dir: str = os.path.join(ROOT, 'exemplos')
+# dir onde estão os resultados de referência
+golden_dir: str = os.path.join(ROOT, 'golden')
+
+# Semente do gerador de números aleatórios em cada teste
+SEED: int = 2024
+
+
+def golden_path(name: str, extension: str) -> str:
+    return os.path.join(golden_dir, os.path.splitext(name)[0] + extension)
+
+
+def read_file(path: str) -> str:
+    """
+    Devolve o conteúdo de um ficheiro, ou None se não existir.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as file:
+        return file.read()
+
+
+def run_stage(path: str, data: str, arguments: list, stdin: str, c_path: str = None) -> tuple:
+    """
+    Corre o main.py no próprio processo com as opções dadas.
+
+    :return: Um tuplo (o que foi escrito, o erro que interrompeu a execução ou None).
+    """
+    from main import build_arg_parser, process
+    args = build_arg_parser().parse_args([path, '--no-cache'] + arguments)
+    output = io.StringIO()
+    error_message: str = None
+    previous_stdin = sys.stdin
+    sys.stdin = io.StringIO(stdin)
+    try:
+        with contextlib.redirect_stdout(output):
+            process(data, args, None, c_path)
+    except Exception as error:
+        # Os erros fazem parte do comportamento esperado de alguns exemplos
+        error_message = f"Erro: {type(error).__name__}: {error}\n"
+    finally:
+        sys.stdin = previous_stdin
+    return output.getvalue(), error_message
+
+
+def run_test(name: str, engine: str, generate_c: bool) -> tuple:
+    """
+    Executa um exemplo com um motor de execução e, se generate_c, gera o seu código C.
+
+    :return: Um tuplo (nome, motor, o que foi escrito, código C ou None, tempo em segundos).
+    """
+    start: float = time.perf_counter()
+    path: str = os.path.join(input_dir, name)
+    data: str = read_file(path)
+    stdin: str = read_file(golden_path(name, '.in')) or ''
+
+    random.seed(SEED)
+    output, error_message = run_stage(path, data, ['--no-c', '--engine', engine], stdin)
+    if error_message is not None:
+        output += error_message
+
+    c_code: str = None
+    if generate_c:
+        descriptor, c_path = tempfile.mkstemp(suffix='.c')
+        os.close(descriptor)
+        try:
+            # O que é escrito nesta fase são as mensagens da análise, que já estão no resultado da execução
+            _messages, error_message = run_stage(path, data, ['--no-run'], stdin, c_path)
+            c_code = read_file(c_path) if error_message is None else error_message
+        finally:
+            os.remove(c_path)
+    return name, engine, output, c_code, time.perf_counter() - start
+
+
+def compare(title: str, expected: str, actual: str) -> list:
+    """
+    Compara o resultado com o de referência e devolve as linhas da diferença (vazia se forem iguais).
+    """
+    if expected is None:
+        return [f"  {title}: não existe o ficheiro de referência (usar --update)"]
+    if expected == actual:
+        return []
+    diff: list = list(difflib.unified_diff(expected.splitlines(), actual.splitlines(), 'esperado', 'obtido',
+                                           lineterm='', n=1))
+    return [f"  {title}:"] + [f"    {line}" for line in diff[:20]]
 
-# Cria o diretório de saída se não existir
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
 
-# Encontra todos os arquivos .fca no diretório especificado
-input_files = [f for f in os.listdir(input_dir) if f.endswith('.fca')]
+def main():
+    arg_parser = argparse.ArgumentParser(description='Testes dos exemplos com ficheiros de referência (golden).')
+    arg_parser.add_argument('names', nargs='*', help='Só corre os exemplos cujo nome contém um destes textos')
+    arg_parser.add_argument('--update', action='store_true',
+                            help='Escreve os ficheiros de referência com os resultados atuais')
+    arg_parser.add_argument('--engines', nargs='+', choices=['ast', 'closures', 'vm'], default=['ast'],
+                            help='Motores de execução a testar (todos são comparados com os mesmos ficheiros)')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help='Número de processos (por omissão, o número de CPUs; 1 corre no próprio processo)')
+    args = arg_parser.parse_args()
 
-main_script = 'main.py'
+    # Encontra todos os arquivos .fca no diretório especificado
+    input_files: list = sorted(f for f in os.listdir(input_dir) if f.endswith('.fca')
+                               and (not args.names or any(text in f for text in args.names)))
+    tasks: list = [(name, engine, index == 0) for name in input_files for index, engine in enumerate(args.engines)]
+    jobs: int = max(1, min(args.jobs or os.cpu_count() or 1, len(tasks)))
 
+    start: float = time.perf_counter()
+    if jobs == 1:
+        results: list = [run_test(*task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results: list = list(executor.map(run_test, *zip(*tasks)))
+    elapsed: float = time.perf_counter() - start
 
-# Função para correr um teste
-def run_test(input_file):
-    input_path = os.path.join(input_dir, input_file)
-    output_file = input_file.replace('.fca', '.txt')
-    output_path = os.path.join(output_dir, output_file)
+    failures: int = 0
+    for name, engine, output, c_code, duration in results:
+        if args.update:
+            os.makedirs(golden_dir, exist_ok=True)
+            with open(golden_path(name, '.out'), 'w') as file:
+                file.write(output)
+            if c_code is not None:
+                with open(golden_path(name, '.c'), 'w') as file:
+                    file.write(c_code)
+            print(f"ATUALIZADO {name} [{engine}] {duration * 1000:8.1f} ms")
+            continue
 
-    # Executa o script Python principal com o arquivo de entrada e redireciona a saída para o arquivo de saída
-    with open(output_path, 'w') as outfile:
-        subprocess.run(['python3', main_script, input_path], stdout=outfile)
+        differences: list = compare('saída', read_file(golden_path(name, '.out')), output)
+        if c_code is not None:
+            differences += compare('código C', read_file(golden_path(name, '.c')), c_code)
+        failures += bool(differences)
+        print(f"{'FALHOU' if differences else 'OK':<6} {name} [{engine}] {duration * 1000:8.1f} ms")
+        for line in differences:
+            print(line)
 
+    summary: str = f"em {elapsed:.3f} s ({jobs} processos, {sum(result[4] for result in results):.3f} s nos testes)."
+    if args.update:
+        print(f"{len(results)} testes atualizados {summary}")
+    else:
+        print(f"{len(results) - failures} de {len(results)} testes passaram {summary}")
+    sys.exit(1 if failures else 0)
 
-# corre os testes para todos os files .fca
-for input_file in input_files:
-    run_test(input_file)
-    print(f'Teste executado para {input_file}, ver o resultado em {output_dir}/{input_file.replace(".fca", ".txt")}')
 
-print('Todos os testes foram executados.')
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import contextlib
+import io
+import sys
+
+from analysis import find_pure_functions
+from interpreter import Interpreter
+from memo import MISSING, MemoCache, make_key
+from pratt_parser import PrattParser
+
+# Testes da memoização: a cache LRU (memo.py), as chaves das chamadas, a análise das funções puras
+# (analysis.find_pure_functions) e o Interpreter com memoização, que só guarda os resultados das funções puras.
+
+# Funções usadas nos testes da análise
+PROGRAM: str = """
+FUNCAO dobro(x),: x * 2 ;
+FUNCAO fib(0),: 0 ;
+FUNCAO fib(1),: 1 ;
+FUNCAO fib(n),: fib(n - 1) + fib(n - 2) ;
+FUNCAO soma([]),: 0 ;
+FUNCAO soma(x:xs),: x + soma(xs) ;
+FUNCAO com_local(x):
+    y = x + 1 ;
+    y * y ;
+FIM
+FUNCAO escreve(x):
+    ESCREVER(x) ;
+    x + 0 ;
+FIM
+FUNCAO le(x),: x + ENTRADA() ;
+FUNCAO sorteia(x),: x + ALEATORIO(10) ;
+FUNCAO chama_escreve(x),: escreve(x) + 1 ;
+FUNCAO chama_chama_escreve(x),: chama_escreve(x) * 2 ;
+FUNCAO chama_le(x),: dobro(le(x)) ;
+FUNCAO mapeia_sorteia(x),: map(sorteia, [x]) ;
+FUNCAO dobra_escreve(x),: fold(escreve, [x], 0) ;
+FUNCAO mapeia_dobro(x),: map(dobro, [x, x]) ;
+FUNCAO le_global(x),: x + g ;
+FUNCAO global_antes_da_local(x):
+    y = g ;
+    g = x ;
+    y + g ;
+FIM
+FUNCAO chama_indefinida(x),: nao_existe(x) ;
+FUNCAO ramo_sorteia(0),: ALEATORIO(5) ;
+FUNCAO ramo_sorteia(x),: x ;
+FUNCAO par(0),: 1 ;
+FUNCAO par(n),: impar(n - 1) ;
+FUNCAO impar(0),: 0 ;
+FUNCAO impar(n),: par(n - 1) ;
+FUNCAO par_sorteia(0),: 1 ;
+FUNCAO par_sorteia(n),: impar_sorteia(n - 1) ;
+FUNCAO impar_sorteia(0),: ALEATORIO(1) ;
+FUNCAO impar_sorteia(n),: par_sorteia(n - 1) ;
+"""
+
+PURE: set = {'dobro', 'fib', 'soma', 'com_local', 'mapeia_dobro', 'par', 'impar'}
+IMPURE: set = {'escreve', 'le', 'sorteia', 'chama_escreve', 'chama_chama_escreve', 'chama_le', 'mapeia_sorteia',
+               'dobra_escreve', 'le_global', 'global_antes_da_local', 'chama_indefinida', 'ramo_sorteia',
+               'par_sorteia', 'impar_sorteia'}
+
+failures: int = 0
+total: int = 0
+
+
+def check(name: str, value: any, expected: any):
+    """
+    Compara um valor com o esperado e escreve a linha do teste.
+    """
+    global failures, total
+    total += 1
+    if value == expected:
+        print(f'OK     {name}')
+    else:
+        failures += 1
+        print(f'FALHOU {name}: deu {value!r} em vez de {expected!r}')
+
+
+def main():
+    # MemoCache: acertos, falhas e remoção LRU
+    cache = MemoCache(max_size=2)
+    check('procurar numa cache vazia é uma falha', cache.get(('f', 1)) is MISSING, True)
+    cache.put(('f', 1), 10)
+    cache.put(('f', 2), 20)
+    check('procurar um resultado guardado é um acerto', cache.get(('f', 1)), 10)
+    cache.put(('f', 3), 30)
+    check('a cache cheia remove o menos usado recentemente', cache.get(('f', 2)) is MISSING, True)
+    check('o resultado usado recentemente fica na cache', cache.get(('f', 1)), 10)
+    check('o último resultado guardado fica na cache', cache.get(('f', 3)), 30)
+    check('acertos e falhas', (cache.hits, cache.misses), (3, 2))
+    check('as estatísticas', cache.stats(), {'hits': 3, 'misses': 2, 'size': 2, 'max_size': 2})
+    cache.put(('f', 4), 40)
+    check('um acerto também torna o resultado recente', (cache.get(('f', 1)) is MISSING, cache.get(('f', 3))),
+          (True, 30))
+    cache.clear()
+    check('clear remove os resultados e mantém as contagens', (len(cache.entries), cache.hits), (0, 4))
+    try:
+        MemoCache(max_size=0)
+        check('uma cache sem tamanho é um erro', False, True)
+    except ValueError:
+        check('uma cache sem tamanho é um erro', True, True)
+
+    # Chaves das chamadas
+    check('a chave de argumentos inteiros', make_key('f', [1, 2]), ('f', 1, 2))
+    check('2 e 2.0 têm chaves diferentes', make_key('f', [2]) != make_key('f', [2.0]), True)
+    check('a chave com uma string', make_key('f', [1, 'a']), ('f', (int, 1), (str, 'a')))
+    check('as chamadas com listas não são guardadas', make_key('f', [1, [1, 2]]), None)
+    check('a chave de uma função sem argumentos', make_key('f', []), ('f',))
+
+    # Funções puras
+    pure_functions: set = find_pure_functions(PrattParser().parse(PROGRAM))
+    for function in sorted(PURE):
+        check(f'{function} é pura', function in pure_functions, True)
+    for function in sorted(IMPURE):
+        check(f'{function} não é pura', function in pure_functions, False)
+
+    # Interpreter com memoização: cada fib(n) é calculado uma só vez
+    interpreter = Interpreter(memoize=True)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret(PrattParser().parse(PROGRAM + "ESCREVER(fib(25));\nx = escreve(7) + escreve(7);"))
+    check('fib(25) com memoização', output.getvalue().splitlines()[0], '75025')
+    check('falhas e acertos de fib(25)', (interpreter.memo.misses, interpreter.memo.hits), (26, 23))
+    check('as chamadas de uma função impura não são guardadas', output.getvalue().splitlines()[1:], ['7', '7'])
+    small = Interpreter(memoize=True, memo_size=4)
+    with contextlib.redirect_stdout(io.StringIO()):
+        small.interpret(PrattParser().parse(PROGRAM + "ESCREVER(fib(25));"))
+    check('uma cache pequena guarda no máximo memo_size resultados', len(small.memo.entries), 4)
+    check('a cache pequena dá o mesmo resultado', small.memo.get(('fib', 25)), 75025)
+
+    print(f'{total - failures} de {total} testes da memoização passaram.')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+
+from code_generator import CodeGenerator
+from interpreter import Interpreter
+from native import CompileError, NativeCompiler, check_representable, run_executable
+from optimizer import Optimizer
+from pratt_parser import PrattParser
+
+# Testes da execução nativa (native.py): um programa corrido com --engine=native tem de escrever o mesmo que o
+# interpretador, ou ser recusado com um erro (os inteiros do C têm 32 bits e a divisão é inteira). Sem um
+# compilador de C, os testes são ignorados.
+
+# (nome, programa, o erro esperado: None se o programa corre e escreve o mesmo que o interpretador)
+CASES: list = [
+    ('aritmética de inteiros', 'x = 2 * 3 + 4 ;\nESCREVER(x);\nESCREVER(x - 20);\n', None),
+    ('escrita de uma lista', 'lista = [1, 2, 3] ;\nESCREVER(lista);\nESCREVER([]);\n', None),
+    ('recorrência que cabe num int', """
+FUNCAO fib(0),: 0 ;
+FUNCAO fib(1),: 1 ;
+FUNCAO fib(n),: fib(n - 1) + fib(n - 2) ;
+ESCREVER(fib(25));
+""", None),
+    ('número que não cabe num int', 'x = 3000000000 ;\nESCREVER(x);\n', CompileError),
+    ('número negativo que não cabe num int', 'x = 0 - 2147483649 ;\nESCREVER(x);\n', CompileError),
+    ('constante dobrada que não cabe num int', 'x = 70000 * 65536 ;\nESCREVER(x);\n', CompileError),
+    ('ramo com um número que não cabe num int', """
+FUNCAO f(3000000000),: 1 ;
+FUNCAO f(n),: n + 1 ;
+ESCREVER(f(2));
+""", CompileError),
+    ('divisão', 'ESCREVER(7 / 2);\n', CompileError),
+    ('overflow durante a execução', """
+FUNCAO fib(0),: 0 ;
+FUNCAO fib(1),: 1 ;
+FUNCAO fib(n),: fib(n - 1) + fib(n - 2) ;
+ESCREVER(fib(90));
+""", ValueError),
+]
+
+
+def parse(source: str):
+    return Optimizer().optimize(PrattParser().parse(source))
+
+
+def interpret(source: str) -> str:
+    """
+    Devolve o que o programa escreve no interpretador.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        Interpreter(memoize=True).interpret(parse(source))
+    return output.getvalue()
+
+
+def run_native(source: str, compiler: NativeCompiler) -> str:
+    """
+    Gera o código C, compila-o e corre o executável, como o main.py com --engine=native.
+    """
+    code_generator = CodeGenerator()
+    code_generator.generate(parse(source))
+    c_code: str = code_generator.get_code()
+    check_representable(code_generator)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        run_executable(compiler.compile(c_code))
+    return output.getvalue()
+
+
+def main():
+    if shutil.which('cc') is None:
+        print('Não há um compilador de C (cc): os testes da execução nativa foram ignorados.')
+        sys.exit(0)
+
+    failures: int = 0
+    with tempfile.TemporaryDirectory() as directory:
+        compiler = NativeCompiler(directory)
+        for name, source, expected_error in CASES:
+            try:
+                output: str = run_native(source, compiler)
+                error: type = None
+            except ValueError as exception:
+                output, error = '', type(exception)
+
+            if expected_error is not None:
+                if error is not expected_error:
+                    failures += 1
+                    print(f'FALHOU {name}: deu {error.__name__ if error else repr(output)} em vez de '
+                          f'{expected_error.__name__}')
+                    continue
+            elif error is not None or output != interpret(source):
+                failures += 1
+                print(f'FALHOU {name}: deu {error.__name__ if error else repr(output)} em vez de '
+                      f'{interpret(source)!r}')
+                continue
+            print(f'OK     {name}')
+
+    print(f'{len(CASES) - failures} de {len(CASES)} testes da execução nativa passaram.')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
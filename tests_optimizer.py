@@ -0,0 +1,235 @@
+import contextlib
+import io
+import sys
+
+from ast_nodes import *
+from interpreter import Interpreter
+from optimizer import Optimizer
+from pratt_parser import PrattParser
+
+# Testes do otimizador da AST (optimizer.py). Cada caso é um programa otimizado e executado com e sem o
+# otimizador: o que o programa escreve (e o erro que o interrompe) tem de ser igual, e as estatísticas do
+# otimizador e a forma da AST otimizada indicam se cada inlining, dobragem ou remoção foi (ou não) feita.
+
+
+def last_write(program: ProgramNode) -> ASTNode:
+    """
+    Devolve a expressão do último ESCREVER do programa.
+    """
+    return [statement for statement in program.statements if isinstance(statement, WriteNode)][-1].expression
+
+
+def assigned(program: ProgramNode) -> list:
+    """
+    Devolve os nomes das variáveis globais atribuídas, pela ordem do programa.
+    """
+    return [statement.identifier for statement in program.statements if isinstance(statement, AssignNode)]
+
+
+def function_body(program: ProgramNode, name: str) -> list:
+    """
+    Devolve o corpo da (primeira) definição normal de uma função.
+    """
+    return next(statement.body for statement in program.statements
+                if isinstance(statement, FunctionNode) and statement.name == name)
+
+
+def is_number(node: any, value: int) -> bool:
+    return isinstance(node, NumberNode) and node.value == value
+
+
+# O que o ENTRADA() lê nos programas dos testes
+INPUT: str = '5\n'
+
+# (nome, programa, opções do Optimizer, estatísticas esperadas, verificação da AST otimizada ou None)
+CASES: list = [
+    # Inlining
+    ('inlining de uma função trivial com literais', """
+FUNCAO area(a, b),: a * b ;
+ESCREVER(area(3, 4));
+""", {}, {'inlined': 1, 'folded': 1}, lambda program: is_number(last_write(program), 12)),
+    ('inlining com uma variável lida pelo corpo', """
+FUNCAO area(a, b),: a * b ;
+c = 5 ;
+ESCREVER(area(c, c));
+""", {}, {'inlined': 1},
+     lambda program: isinstance(last_write(program), BinOpNode) and last_write(program).left.name == 'c'),
+    ('sem inlining de um argumento que é uma expressão', """
+FUNCAO dobro(a),: a + a ;
+c = 5 ;
+ESCREVER(dobro(c + 1));
+""", {}, {'inlined': 0}, lambda program: isinstance(last_write(program), FunctionCallNode)),
+    ('sem inlining de uma variável que o corpo não lê (o erro continua)', """
+FUNCAO cinco(a),: 5 + 0 ;
+ESCREVER(cinco(nao_existe));
+""", {}, {'inlined': 0}, None),
+    ('sem inlining de variáveis lidas por outra ordem (o erro continua)', """
+FUNCAO f(x, y),: y - x ;
+ESCREVER(f(u, v));
+""", {}, {'inlined': 0}, lambda program: isinstance(last_write(program), FunctionCallNode)),
+    ('inlining de variáveis lidas pela ordem dos argumentos', """
+FUNCAO f(x, y),: x - y + y ;
+ESCREVER(f(u, v));
+""", {}, {'inlined': 1}, lambda program: isinstance(last_write(program), BinOpNode)),
+    ('inlining da mesma variável em dois argumentos', """
+FUNCAO f(x, y),: y - x ;
+u = 3 ;
+ESCREVER(f(u, u));
+""", {}, {'inlined': 1}, lambda program: isinstance(last_write(program), BinOpNode)),
+    ('sem inlining de variáveis lidas por outra ordem num fold', """
+FUNCAO soma(a, b),: a + b ;
+FUNCAO f(x, y),: fold(soma, [x], y) ;
+ESCREVER(f(u, v));
+""", {}, {'inlined': 0}, None),
+    ('sem inlining de uma função com ramos', """
+FUNCAO f(0),: 1 ;
+FUNCAO f(n),: n * 2 ;
+ESCREVER(f(3));
+ESCREVER(f(0));
+""", {}, {'inlined': 0}, None),
+    ('sem inlining de uma função redefinida', """
+FUNCAO f(n),: n * 2 ;
+ESCREVER(f(3));
+FUNCAO f(n),: n * 3 ;
+ESCREVER(f(3));
+""", {}, {'inlined': 0}, None),
+    ('sem inlining de uma função que lê uma variável global', """
+g = 2 ;
+FUNCAO f(x),: x + g ;
+ESCREVER(f(1));
+""", {}, {'inlined': 0}, None),
+    ('sem inlining de ALEATORIO', """
+FUNCAO sorteia(x),: x + ALEATORIO(0) ;
+ESCREVER(sorteia(1));
+""", {}, {'inlined': 0}, None),
+    ('sem inlining de uma chamada antes da definição', """
+FUNCAO g(x),: f(x) ;
+FUNCAO f(x),: x + 1 ;
+ESCREVER(g(1));
+""", {}, {'inlined': 2},
+     lambda program: is_number(last_write(program), 2)
+     and isinstance(function_body(program, 'g')[0].expression, FunctionCallNode)),
+    ('inlining de funções mutuamente recursivas termina', """
+FUNCAO a(x),: b(x) ;
+FUNCAO b(x),: a(x) ;
+ESCREVER(1);
+""", {}, {'inlined': 1}, None),
+    ('sem inlining com inline_functions=False', """
+FUNCAO area(a, b),: a * b ;
+ESCREVER(area(3, 4));
+""", {'inline_functions': False}, {'inlined': 0, 'folded': 0},
+     lambda program: isinstance(last_write(program), FunctionCallNode)),
+    # Dobragem de constantes
+    ('dobragem com precedência', """
+ESCREVER(2 * 3 + 4);
+""", {}, {'folded': 2}, lambda program: is_number(last_write(program), 10)),
+    ('dobragem de strings', """
+ESCREVER("a" <> "b");
+""", {}, {'folded': 1}, lambda program: last_write(program).value == 'ab'),
+    ('sem dobragem da divisão', """
+ESCREVER(6 / 3);
+""", {}, {'folded': 0}, lambda program: isinstance(last_write(program), BinOpNode)),
+    ('sem dobragem de uma string com um número', """
+ESCREVER(1 + "a");
+""", {}, {'folded': 0}, None),
+    ('sem dobragem com fold_constants=False', """
+ESCREVER(2 * 3 + 4);
+""", {'fold_constants': False}, {'folded': 0}, lambda program: isinstance(last_write(program), BinOpNode)),
+    # Eliminação de atribuições mortas
+    ('remoção de uma atribuição que não é lida', """
+x = 1 ;
+ESCREVER(2);
+""", {}, {'removed': 1}, lambda program: assigned(program) == []),
+    ('remoção em cadeia', """
+a = 1 ;
+b = a + 1 ;
+c = [a, b] ;
+ESCREVER(2);
+""", {}, {'removed': 3}, lambda program: assigned(program) == []),
+    ('a atribuição lida fica', """
+x = 1 ;
+y = 2 ;
+ESCREVER(x);
+""", {}, {'removed': 1}, lambda program: assigned(program) == ['x']),
+    ('a atribuição com uma chamada fica (pode ter efeitos)', """
+FUNCAO escreve(x):
+    ESCREVER(x) ;
+    x + 0 ;
+FIM
+x = escreve(7) ;
+""", {}, {'removed': 0}, lambda program: assigned(program) == ['x']),
+    ('a atribuição que pode falhar fica (variável não definida)', """
+x = nao_existe + 1 ;
+ESCREVER(1);
+""", {}, {'removed': 0}, lambda program: assigned(program) == ['x']),
+    ('a atribuição que pode falhar fica (número com string)', """
+s = "a" ;
+x = s + 1 ;
+ESCREVER(1);
+""", {}, {'removed': 0}, lambda program: assigned(program) == ['s', 'x']),
+    ('a atribuição de ENTRADA fica', """
+x = ENTRADA() ;
+ESCREVER(1);
+""", {}, {'removed': 0}, lambda program: assigned(program) == ['x']),
+    ('remoção de uma local morta e a última instrução fica', """
+FUNCAO f(x):
+    y = x ;
+    z = x * 2 ;
+    w = 3 ;
+    x + 1 ;
+FIM
+ESCREVER(f(1));
+""", {}, {'removed': 2}, lambda program: [type(s).__name__ for s in function_body(program, 'f')]
+     == ['AssignNode', 'BinOpNode'] and function_body(program, 'f')[0].identifier == 'z'),
+    ('sem remoção com eliminate_dead_code=False', """
+x = 1 ;
+ESCREVER(2);
+""", {'eliminate_dead_code': False}, {'removed': 0}, lambda program: assigned(program) == ['x']),
+]
+
+
+def run(program: ProgramNode) -> tuple:
+    """
+    Executa o programa (o ENTRADA() lê INPUT) e devolve (o que escreveu, mensagem do erro que o interrompeu ou None).
+    """
+    output = io.StringIO()
+    error: str = None
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(INPUT)
+    with contextlib.redirect_stdout(output):
+        try:
+            Interpreter().interpret(program)
+        except (ValueError, TypeError) as exception:
+            error = str(exception)
+        finally:
+            sys.stdin = stdin
+    return output.getvalue(), error
+
+
+def main():
+    failures: int = 0
+    for name, source, options, expected_stats, check in CASES:
+        expected: tuple = run(PrattParser().parse(source))
+        optimizer = Optimizer(**options)
+        optimized: ProgramNode = optimizer.optimize(PrattParser().parse(source))
+        result: tuple = run(optimized)
+        stats: dict = {key: value for key, value in optimizer.stats().items() if key in expected_stats}
+
+        if result != expected:
+            failures += 1
+            print(f'FALHOU {name}: o programa otimizado dá {result!r} em vez de {expected!r}')
+        elif stats != expected_stats:
+            failures += 1
+            print(f'FALHOU {name}: as estatísticas são {stats} em vez de {expected_stats}')
+        elif check is not None and not check(optimized):
+            failures += 1
+            print(f'FALHOU {name}: a AST otimizada não é a esperada')
+        else:
+            print(f'OK     {name}')
+
+    print(f'{len(CASES) - failures} de {len(CASES)} testes do otimizador passaram.')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import contextlib
+import io
+import sys
+
+from interpreter import Interpreter
+from list_view import list_tail
+from parallel import NOT_PARALLEL, PROBE_SIZE
+from pratt_parser import PrattParser
+
+# Testes do map paralelo (parallel.py): os resultados têm de ser os do map sequencial, pela mesma ordem, e o map
+# só pode usar os processos quando a função é pura, a lista tem pelo menos min_size elementos e as primeiras
+# PROBE_SIZE chamadas indicam que o resto demora pelo menos min_time segundos.
+
+# Funções usadas nos testes (fib tem um custo muito diferente entre elementos, o que mistura a ordem em que os
+# blocos terminam)
+PROGRAM: str = """
+FUNCAO quadrado(x),: x * x + 1 ;
+FUNCAO fib(0),: 0 ;
+FUNCAO fib(1),: 1 ;
+FUNCAO fib(n),: fib(n - 1) + fib(n - 2) ;
+FUNCAO escreve(x):
+    ESCREVER(x) ;
+    x + 0 ;
+FIM
+"""
+
+# Número mínimo de elementos do map paralelo nos testes
+MIN_SIZE: int = 32
+
+failures: int = 0
+total: int = 0
+
+
+def check(name: str, value: any, expected: any):
+    """
+    Compara um valor com o esperado e escreve a linha do teste.
+    """
+    global failures, total
+    total += 1
+    if value == expected:
+        print(f'OK     {name}')
+    else:
+        failures += 1
+        print(f'FALHOU {name}: deu {value!r} em vez de {expected!r}')
+
+
+def interpreter(source: str, workers: int = 2) -> Interpreter:
+    """
+    Cria um Interpreter com o map paralelo e as funções do programa.
+    """
+    result = Interpreter(vectorize=False, parallel_workers=workers, parallel_min_size=MIN_SIZE)
+    result.interpret(PrattParser().parse(source))
+    return result
+
+
+def main():
+    sequential = Interpreter(vectorize=False)
+    sequential.interpret(PrattParser().parse(PROGRAM))
+    squares: list = list(range(-500, 500))
+    fibs: list = [(index * 7) % 18 for index in range(MIN_SIZE * 3)]
+
+    parallel = interpreter(PROGRAM)
+    parallel_map = parallel.parallel_map
+    try:
+        # Limiares: nestes casos o map não é paralelo
+        check('uma lista pequena não é paralela',
+              parallel_map.map('quadrado', list(range(MIN_SIZE - 1))) is NOT_PARALLEL, True)
+        check('uma função impura não é paralela', parallel_map.map('escreve', squares) is NOT_PARALLEL, True)
+        check('uma função não definida não é paralela', parallel_map.map('nao_existe', squares) is NOT_PARALLEL,
+              True)
+        check('um valor que não é uma lista não é paralelo', parallel_map.map('quadrado', 5) is NOT_PARALLEL, True)
+        check('com um só processo o map não é paralelo',
+              interpreter(PROGRAM, workers=1).parallel_map is None, True)
+
+        # Chamadas baratas: o map continua no próprio processo, sem criar os processos
+        parallel_map.min_time = float('inf')
+        check('chamadas baratas dão os resultados do map sequencial', parallel_map.map('quadrado', squares),
+              sequential.map_list('quadrado', squares))
+        check('chamadas baratas não criam os processos', parallel_map.executor is None, True)
+
+        # Com min_time 0 o resto da lista (depois das PROBE_SIZE primeiras chamadas) é dividido pelos processos
+        parallel_map.min_time = 0
+        check('os blocos dão os resultados pela ordem da lista', parallel_map.map('quadrado', squares),
+              sequential.map_list('quadrado', squares))
+        check('o map paralelo usa os processos', parallel_map.executor is not None, True)
+        check('blocos com custos diferentes dão os resultados pela ordem da lista', parallel_map.map('fib', fibs),
+              sequential.map_list('fib', fibs))
+        exact: list = list(range(PROBE_SIZE + 1)) + [1] * (MIN_SIZE - PROBE_SIZE - 1)
+        check('uma lista com min_size elementos é paralela', parallel_map.map('quadrado', exact),
+              sequential.map_list('quadrado', exact))
+        tail = list_tail(list(range(MIN_SIZE + 2)))
+        check('uma vista sobre a cauda de uma lista', parallel_map.map('quadrado', tail),
+              sequential.map_list('quadrado', list(range(1, MIN_SIZE + 2))))
+
+        # O map de um programa usa o map paralelo, com os mesmos resultados
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            parallel.interpret(PrattParser().parse(f"ESCREVER(map(fib, {fibs}));"))
+        check('o map de um programa', output.getvalue().strip(), str(sequential.map_list('fib', fibs)))
+
+        # Redefinir uma função termina os processos, que são recriados com a nova definição
+        with contextlib.redirect_stdout(io.StringIO()):
+            parallel.interpret(PrattParser().parse("FUNCAO quadrado(x),: x * 3 ;"))
+        check('redefinir uma função termina os processos', parallel_map.executor is None, True)
+        check('os novos processos usam a nova definição', parallel_map.map('quadrado', squares),
+              [value * 3 for value in squares])
+    finally:
+        parallel_map.close()
+
+    print(f'{total - failures} de {total} testes do map paralelo passaram.')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
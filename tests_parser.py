@@ -0,0 +1,117 @@
+import contextlib
+import io
+import os
+
+from ast_nodes import ASTNode
+from parser import parser
+from pratt_parser import PrattParser
+from scanner import Scanner
+
+# Teste diferencial do parser escrito à mão (pratt_parser.py) contra o parser do PLY (parser.py).
+# Para cada exemplo, o parser pratt sem precedência (que reproduz a gramática do parser.py) tem de produzir
+# a mesma árvore e as mesmas mensagens de erro. Com precedência, as árvores só podem diferir nas expressões
+# com operadores diferentes (ex: 2*3+4), que são indicadas.
+
+# dir onde estão os arquivos .fca
+input_dir = './exemplos'
+
+
+def tree(node: any) -> any:
+    """
+    Converte uma AST em tuplos e listas, para poder ser comparada com ==.
+    """
+    if isinstance(node, ASTNode):
+        fields: list = [type(node).__name__]
+        for cls in type(node).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if name != 'position':
+                    fields.append((name, tree(getattr(node, name))))
+        return tuple(fields)
+    if isinstance(node, list):
+        return [tree(item) for item in node]
+    return node
+
+
+def tokens(generator) -> list:
+    """
+    Converte os tokens em tuplos (tipo, valor, linha, posição, coluna), para poderem ser comparados com ==.
+    """
+    return [(token.type, token.value, token.lineno, token.lexpos, token.column) for token in generator]
+
+
+class CountingReader(io.StringIO):
+    """
+    Ficheiro em memória que conta os blocos lidos.
+    """
+    def __init__(self, data: str):
+        super().__init__(data)
+        self.reads: int = 0
+
+    def read(self, size: int = -1) -> str:
+        self.reads += 1
+        return super().read(size)
+
+
+def parse(function, data: str) -> tuple:
+    """
+    Analisa o código e devolve (árvore, mensagens escritas durante a análise).
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        program = function(data)
+    return tree(program), output.getvalue()
+
+
+failures: int = 0
+input_files = sorted(f for f in os.listdir(input_dir) if f.endswith('.fca'))
+for input_file in input_files:
+    with open(os.path.join(input_dir, input_file), 'r') as file:
+        data = file.read()
+
+    expected = parse(lambda source: parser.parse(source, lexer=Scanner()), data)
+    compatible = parse(lambda source: PrattParser(precedence=False).parse(source), data)
+    with_precedence = parse(lambda source: PrattParser().parse(source), data)
+
+    if compatible != expected:
+        failures += 1
+        print(f'FALHOU {input_file}: a árvore do parser pratt (sem precedência) é diferente da do parser ply')
+    elif with_precedence != expected:
+        print(f'OK     {input_file} (a precedência dos operadores muda a árvore)')
+    else:
+        print(f'OK     {input_file}')
+
+print(f'{len(input_files) - failures} de {len(input_files)} exemplos com a mesma árvore nos dois parsers.')
+
+# O scanner lido aos blocos (Scanner.scan_file) tem de produzir os mesmos tokens que lido de uma vez, mesmo com
+# blocos pequenos e com o programa todo numa só linha (em que os blocos não podem ser cortados nas mudanças de linha)
+scanner_failures: int = 0
+for input_file in input_files:
+    with open(os.path.join(input_dir, input_file), 'r') as file:
+        data = file.read()
+    with contextlib.redirect_stdout(io.StringIO()):
+        different: list = [chunk_size
+                           for source in (data, data.replace('\n', ' '))
+                           for chunk_size in (1, 7, 64)
+                           if tokens(Scanner().scan_file(io.StringIO(source), chunk_size))
+                           != tokens(Scanner().scan(source))]
+    if different:
+        scanner_failures += 1
+        print(f'FALHOU {input_file}: tokens diferentes com blocos de {different[0]} caracteres')
+    else:
+        print(f'OK     {input_file} (aos blocos)')
+
+# Um programa longo sem mudanças de linha é analisado à medida que é lido
+reader = CountingReader('x = [1, 2] <> y ; ' * 10000 + '-- comentário sem fim ' * 10000)
+generator = Scanner().scan_file(reader, 64)
+first = next(generator)
+if reader.reads != 1:
+    scanner_failures += 1
+    print(f'FALHOU linha longa: {reader.reads} blocos lidos antes do primeiro token')
+elif tokens([first]) + tokens(generator) != tokens(Scanner().scan(reader.getvalue())):
+    scanner_failures += 1
+    print('FALHOU linha longa: tokens diferentes')
+else:
+    print('OK     linha longa (aos blocos)')
+
+scanner_tests: int = len(input_files) + 1
+print(f'{scanner_tests - scanner_failures} de {scanner_tests} testes do scanner aos blocos passaram.')
@@ -0,0 +1,122 @@
+import sys
+
+from interpreter import Interpreter
+from pratt_parser import PrattParser
+from vectorize import INT64_LIMIT, MIN_SIZE, NOT_VECTORIZED, load_numpy
+
+# Teste diferencial da vetorização (vectorize.py): o map e o fold com o numpy têm de dar o mesmo resultado que as
+# chamadas da função em cada elemento (o Interpreter sem vetorização), e as listas em que algum valor pode sair
+# dos inteiros de 64 bits não podem ser vetorizadas. Sem o numpy, os testes são ignorados.
+
+# Funções usadas nos testes
+PROGRAM: str = """
+FUNCAO dobro(x),: x * 2 ;
+FUNCAO afim(x),: 3 * x - 7 ;
+FUNCAO constante(x),: 5 ;
+FUNCAO soma(acc, x),: acc + x ;
+FUNCAO soma_quadrados(acc, x),: x * x + acc ;
+FUNCAO produto(acc, x),: acc * x ;
+FUNCAO produto_sucessor(acc, x),: (x + 1) * acc ;
+FUNCAO ramo(0),: 1 ;
+FUNCAO ramo(x),: x * 2 ;
+"""
+
+# Maior elemento cuja soma de MIN_SIZE cópias ainda cabe num int64
+SUM_LIMIT: int = INT64_LIMIT // MIN_SIZE
+
+# (nome, função, lista, vetorizado?)
+MAP_CASES: list = [
+    ('map de uma lista grande', 'dobro', list(range(-500, 500)), True),
+    ('map com constantes e negativos', 'afim', list(range(-300, 300, 3)), True),
+    ('map de uma função constante', 'constante', list(range(MIN_SIZE)), True),
+    ('map de uma lista pequena', 'dobro', list(range(MIN_SIZE - 1)), False),
+    ('map no limite dos int64', 'dobro', [INT64_LIMIT // 2] + list(range(MIN_SIZE)), True),
+    ('map que sai dos int64', 'dobro', [INT64_LIMIT // 2 + 1] + list(range(MIN_SIZE)), False),
+    ('map com o negativo que sai dos int64', 'dobro', [-(INT64_LIMIT // 2 + 1)] + list(range(MIN_SIZE)), False),
+    ('map de um inteiro que não cabe num int64', 'dobro', [INT64_LIMIT + 1] + list(range(MIN_SIZE)), False),
+    ('map de uma lista com strings', 'dobro', ['a'] + list(range(MIN_SIZE)), False),
+    ('map de uma função com ramos', 'ramo', list(range(MIN_SIZE)), False),
+]
+
+# (nome, função, lista, valor inicial, vetorizado?)
+FOLD_CASES: list = [
+    ('soma de uma lista grande', 'soma', list(range(-1000, 3000)), 10, True),
+    ('soma dos quadrados', 'soma_quadrados', list(range(MIN_SIZE * 4)), 0, True),
+    ('soma no limite dos int64', 'soma', [SUM_LIMIT] * MIN_SIZE, 0, True),
+    ('soma que sai dos int64', 'soma', [SUM_LIMIT + 1] * MIN_SIZE, 0, False),
+    ('soma com o valor inicial fora dos int64', 'soma', [1] * MIN_SIZE, INT64_LIMIT * 4, True),
+    ('quadrados que saem dos int64', 'soma_quadrados', [2 ** 32] + [1] * MIN_SIZE, 0, False),
+    ('produto que sai dos int64', 'produto', [2, 3, -5, 7] * MIN_SIZE, 1, True),
+    ('produto com um zero', 'produto', [10 ** 6] * MIN_SIZE + [0], 3, True),
+    ('produto com o acumulador à direita', 'produto_sucessor', list(range(-MIN_SIZE, 0)), -2, True),
+    ('produto de uma lista pequena', 'produto', [2] * (MIN_SIZE - 1), 1, False),
+    ('produto com g fora dos int64', 'produto_sucessor', [INT64_LIMIT] + [1] * MIN_SIZE, 1, False),
+    ('soma com o valor inicial real', 'soma', list(range(MIN_SIZE)), 0.5, False),
+]
+
+
+def interpreter(vectorize: bool) -> Interpreter:
+    """
+    Cria um Interpreter com as funções de PROGRAM.
+    """
+    result = Interpreter(vectorize=vectorize)
+    result.interpret(PrattParser().parse(PROGRAM))
+    return result
+
+
+def fallback_fold(interpreter: Interpreter, name: str, list_value: list, initial_value: any) -> any:
+    """
+    O fold sem vetorização (uma chamada da função em cada elemento).
+    """
+    result: any = initial_value
+    for element in list_value:
+        result = interpreter.invoke_function(name, [result, element])
+    return result
+
+
+def check(name: str, vectorized: any, expected: any, should_vectorize: bool) -> bool:
+    """
+    Compara o resultado da vetorização com o das chamadas e escreve a linha do teste.
+    """
+    if should_vectorize and vectorized is NOT_VECTORIZED:
+        print(f'FALHOU {name}: não foi vetorizado')
+        return False
+    if not should_vectorize and vectorized is not NOT_VECTORIZED:
+        print(f'FALHOU {name}: foi vetorizado (deu {vectorized!r}, as chamadas dão {expected!r})')
+        return False
+    if vectorized is not NOT_VECTORIZED and (vectorized != expected or type(vectorized) is not type(expected)):
+        print(f'FALHOU {name}: deu {vectorized!r} e as chamadas dão {expected!r}')
+        return False
+    print(f'OK     {name}{"" if should_vectorize else " (não vetorizado)"}')
+    return True
+
+
+def main():
+    if not load_numpy():
+        # Sem o numpy, o Interpreter não troca o map e o fold pelas versões vetorizadas
+        if interpreter(True).vectorizer is not None:
+            print('FALHOU sem o numpy: o Interpreter criou o Vectorizer')
+            sys.exit(1)
+        print('O numpy não está instalado: os testes da vetorização foram ignorados.')
+        sys.exit(0)
+
+    vectorized_interpreter: Interpreter = interpreter(True)
+    plain_interpreter: Interpreter = interpreter(False)
+    vectorizer = vectorized_interpreter.vectorizer
+
+    passed: int = 0
+    for case_name, function, values, should_vectorize in MAP_CASES:
+        result: any = vectorizer.map(vectorized_interpreter.functions.get(function), values)
+        passed += check(case_name, result, plain_interpreter.map_list(function, values), should_vectorize)
+    for case_name, function, values, initial, should_vectorize in FOLD_CASES:
+        result: any = vectorizer.fold(vectorized_interpreter.functions.get(function), values, initial)
+        passed += check(case_name, result, fallback_fold(plain_interpreter, function, values, initial),
+                        should_vectorize)
+
+    total: int = len(MAP_CASES) + len(FOLD_CASES)
+    print(f'{passed} de {total} testes da vetorização passaram.')
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import heapq
+
+from ast_nodes import *
+
+# Inferência de tipos para o gerador de código C.
+# Os valores FCA têm um de três tipos em C: inteiro, string ou lista de inteiros. A inferência percorre o programa
+# e calcula a assinatura de cada função (tipo de cada parâmetro e do resultado):
+# - os parâmetros têm o tipo dos argumentos com que a função é chamada (e os ramos com uma lista, ex: f([]),
+#   indicam que o parâmetro é uma lista);
+# - o resultado é o tipo da expressão retornada, calculado com os tipos dos parâmetros e das variáveis locais.
+# Como uma assinatura pode depender de outras (f chama g com o resultado de h), a inferência é uma lista de trabalho:
+# cada definição de função e o programa principal são unidades, e uma unidade é percorrida outra vez sempre que
+# muda uma assinatura (ou variável global) que leu. Quando as funções são definidas antes de ser chamadas, o
+# programa principal só é percorrido uma vez. Depois, o CodeGenerator obtém o tipo de cada expressão com
+# expression_type e guarda o tipo de cada variável numa tabela de símbolos (dicionário nome -> tipo) à medida que
+# gera as atribuições, pelo que saber o tipo de um identificador custa O(1).
+
+TYPE_INT = 'int'
+TYPE_STRING = 'string'
+TYPE_INT_LIST = 'int_list'
+
+# Tipo C de cada tipo (um tipo desconhecido é tratado como inteiro)
+C_TYPES: dict = {
+    None: 'int',
+    TYPE_INT: 'int',
+    TYPE_STRING: 'const char*',
+    TYPE_INT_LIST: 'int*'
+}
+
+# Formato do printf de cada tipo. As listas não têm formato: são escritas com um ciclo (CodeGenerator)
+PRINTF_FORMATS: dict = {
+    None: '%d',
+    TYPE_INT: '%d',
+    TYPE_STRING: '%s'
+}
+
+# Tipo das expressões cujo tipo só depende do tipo do nó (NodeKind -> tipo)
+KIND_TYPES: dict = {
+    NodeKind.NUMBER: TYPE_INT,
+    NodeKind.INPUT: TYPE_INT,
+    NodeKind.RANDOM: TYPE_INT,
+    NodeKind.FOLD: TYPE_INT,
+    NodeKind.STRING: TYPE_STRING,
+    NodeKind.INTERPOLATED_STRING: TYPE_STRING,
+    NodeKind.LIST: TYPE_INT_LIST,
+    NodeKind.MAP: TYPE_INT_LIST
+}
+
+# Nós que não contêm chamadas de funções
+LEAF_KINDS: frozenset = frozenset({
+    NodeKind.NUMBER, NodeKind.IDENTIFIER, NodeKind.STRING, NodeKind.INTERPOLATED_STRING, NodeKind.INPUT
+})
+
+
+def join_types(current: str, new: str) -> str:
+    """
+    Junta dois tipos possíveis de um valor: um tipo desconhecido (None) dá o outro, e dois tipos diferentes
+    dão inteiro (o tipo por omissão em C). Cada tipo só pode mudar duas vezes (None -> tipo -> inteiro),
+    o que garante que a inferência termina.
+    """
+    if current is None or current == new:
+        return new
+    if new is None:
+        return current
+    return TYPE_INT
+
+
+class FunctionSignature:
+    def __init__(self, arity: int):
+        self.parameters: list = [None] * arity
+        self.result: str = None
+        # Unidades que leram os tipos dos parâmetros (a definição) e o tipo do resultado (as chamadas)
+        self.parameter_readers: set = set()
+        self.result_readers: set = set()
+
+
+class TypeInference:
+    def __init__(self):
+        # Assinaturas das funções ((nome, número de parâmetros) -> FunctionSignature)
+        self.signatures: dict = {}
+        # Tipo de cada variável global (o da última atribuição no programa), para as funções que as leem
+        self.globals: dict = {}
+        # Unidades que leram variáveis globais
+        self.global_readers: set = set()
+        # Unidade a ser percorrida e unidades por percorrer (índices, por ordem do programa)
+        self.unit: int = 0
+        self.pending: list = []
+        self.queued: set = set()
+
+    def infer(self, program: ProgramNode):
+        """
+        Calcula as assinaturas de todas as funções do programa.
+        """
+        arities: dict = {}
+        for statement in program.statements:
+            if isinstance(statement, FunctionNode):
+                arity: int = len(statement.parameters)
+                self.signatures[(statement.name, arity)] = FunctionSignature(arity)
+                arities.setdefault(statement.name, set()).add(arity)
+        for statement in program.statements:
+            # Um ramo sem definição normal é uma função de um parâmetro
+            if isinstance(statement, BranchNode) and statement.function_name not in arities:
+                self.signatures[(statement.function_name, 1)] = FunctionSignature(1)
+                arities[statement.function_name] = {1}
+
+        # Unidades: as definições de funções e, no fim, o programa principal (as restantes instruções)
+        units: list = [statement for statement in program.statements
+                       if isinstance(statement, (FunctionNode, BranchNode))]
+        main: list = [statement for statement in program.statements
+                      if not isinstance(statement, (FunctionNode, BranchNode))]
+        for index in range(len(units) + 1):
+            self.enqueue({index})
+        while self.pending:
+            self.unit = heapq.heappop(self.pending)
+            self.queued.discard(self.unit)
+            if self.unit == len(units):
+                env: dict = {}
+                for statement in main:
+                    self.scan_statement(statement, env)
+                if env != self.globals:
+                    self.globals = env
+                    self.enqueue(self.global_readers)
+                continue
+            statement: ASTNode = units[self.unit]
+            if isinstance(statement, FunctionNode):
+                signature: FunctionSignature = self.signatures[(statement.name, len(statement.parameters))]
+                signature.parameter_readers.add(self.unit)
+                local: dict = {param: signature.parameters[index] for index, param in enumerate(statement.parameters)
+                               if isinstance(param, str)}
+                self.update_result(signature, self.scan_body(statement.body, local))
+            else:
+                for arity in arities[statement.function_name]:
+                    signature: FunctionSignature = self.signatures[(statement.function_name, arity)]
+                    if isinstance(statement.condition, ListNode):
+                        self.update_parameter(signature, 0, TYPE_INT_LIST)
+                    self.update_result(signature, self.scan_body(statement.body, {}))
+
+    def enqueue(self, units: set):
+        for unit in units:
+            if unit not in self.queued:
+                self.queued.add(unit)
+                heapq.heappush(self.pending, unit)
+
+    def update_result(self, signature: FunctionSignature, value_type: str):
+        joined: str = join_types(signature.result, value_type)
+        if joined != signature.result:
+            signature.result = joined
+            self.enqueue(signature.result_readers)
+
+    def update_parameter(self, signature: FunctionSignature, index: int, value_type: str):
+        joined: str = join_types(signature.parameters[index], value_type)
+        if joined != signature.parameters[index]:
+            signature.parameters[index] = joined
+            self.enqueue(signature.parameter_readers)
+
+    def scan_body(self, body: list, env: dict) -> str:
+        """
+        Percorre o corpo de uma função e devolve o tipo do valor retornado.
+        """
+        result: str = None
+        for statement in body:
+            value_type: str = self.scan_statement(statement, env)
+            if isinstance(statement, ReturnNode):
+                return value_type
+            result = value_type
+        return result
+
+    def scan_statement(self, statement: ASTNode, env: dict) -> str:
+        """
+        Regista os tipos dos argumentos das chamadas e das variáveis atribuídas numa instrução.
+
+        :return: O tipo do valor da instrução (None se não tiver valor).
+        """
+        if isinstance(statement, AssignNode):
+            self.scan_calls(statement.expression, env)
+            env[statement.identifier] = self.expression_type(statement.expression, env)
+            return None
+        if isinstance(statement, (WriteNode, ReturnNode)):
+            self.scan_calls(statement.expression, env)
+            return self.expression_type(statement.expression, env) if isinstance(statement, ReturnNode) else None
+        if isinstance(statement, ExpressionNode):
+            self.scan_calls(statement, env)
+            return self.expression_type(statement, env)
+        return None
+
+    def scan_calls(self, node: any, env: dict):
+        """
+        Regista os tipos dos argumentos de todas as chamadas de funções numa expressão.
+        """
+        if not isinstance(node, ASTNode) or node.kind in LEAF_KINDS:
+            return
+        if isinstance(node, FunctionCallNode):
+            signature: FunctionSignature = self.signatures.get((node.name, len(node.arguments)))
+            for index, argument in enumerate(node.arguments):
+                self.scan_calls(argument, env)
+                if signature is not None:
+                    self.update_parameter(signature, index, self.expression_type(argument, env))
+        elif isinstance(node, BinOpNode):
+            # As expressões aritméticas são percorridas sem recursão até encontrarem outro tipo de nó
+            pending: list = [node]
+            while pending:
+                operation: BinOpNode = pending.pop()
+                for operand in (operation.left, operation.right):
+                    kind: NodeKind = getattr(operand, 'kind', None)
+                    if kind == NodeKind.BINOP:
+                        pending.append(operand)
+                    elif kind not in LEAF_KINDS:
+                        self.scan_calls(operand, env)
+        elif isinstance(node, ListNode):
+            for element in node.elements:
+                self.scan_calls(element, env)
+        elif isinstance(node, (MapNode, FoldNode)):
+            # A função do map/fold recebe os elementos (inteiros) da lista
+            self.scan_calls(node.list_node, env)
+            arity: int = 1 if isinstance(node, MapNode) else 2
+            signature: FunctionSignature = self.signatures.get((node.function, arity))
+            if signature is not None:
+                for index in range(arity):
+                    self.update_parameter(signature, index, TYPE_INT)
+            if isinstance(node, FoldNode):
+                self.scan_calls(node.initial_value, env)
+        elif isinstance(node, RandomNode):
+            self.scan_calls(node.upper_limit, env)
+        elif isinstance(node, WriteNode):
+            self.scan_calls(node.expression, env)
+
+    def expression_type(self, node: any, env: dict) -> str:
+        """
+        Devolve o tipo de uma expressão (None se for desconhecido).
+
+        :param node: A expressão.
+        :param env: Os tipos das variáveis visíveis (nome -> tipo).
+        """
+        kind: NodeKind = getattr(node, 'kind', None)
+        if kind in KIND_TYPES:
+            return KIND_TYPES[kind]
+        if kind == NodeKind.BINOP:
+            return TYPE_STRING if node.operator == '<>' else TYPE_INT
+        if kind == NodeKind.IDENTIFIER:
+            if node.name in env:
+                return env[node.name]
+            self.global_readers.add(self.unit)
+            return self.globals.get(node.name)
+        if kind == NodeKind.FUNCTION_CALL:
+            signature: FunctionSignature = self.signatures.get((node.name, len(node.arguments)))
+            if signature is None:
+                return None
+            signature.result_readers.add(self.unit)
+            return signature.result
+        return None
+
+    def signature(self, name: str, arity: int) -> FunctionSignature:
+        """
+        Devolve a assinatura de uma função (ou uma assinatura com tipos desconhecidos, se não tiver sido inferida).
+        """
+        return self.signatures.get((name, arity)) or FunctionSignature(arity)
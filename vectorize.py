@@ -0,0 +1,230 @@
+import importlib.util
+import math
+import operator
+
+from ast_nodes import *
+from dispatch import CLAUSE_NORMAL, Clause, FunctionDispatch
+from list_view import LIST_TYPES
+
+# O numpy (opcional) só é importado quando há uma lista a vetorizar, porque o import demora (ver load_numpy)
+numpy = None
+
+# Vetorização do map e do fold com o numpy.
+# Uma função é vetorizável quando tem uma única definição (sem ramos) cujo corpo é só uma expressão aritmética
+# (+, -, *) sobre o parâmetro e números inteiros, ex: FUNCAO dobro(x),: x * 2;
+# - map(dobro, lista) passa a ser uma única operação sobre um array de inteiros;
+# - fold(soma, lista, 0), com FUNCAO soma(acc, x),: acc + g(x); (ou acc * g(x), ou com acc à direita), passa a
+#   ser g aplicada ao array seguida de uma soma do numpy (ou do produto dos valores como inteiros do Python, que
+#   ao fim de poucos elementos já não cabe em 64 bits).
+# O resultado tem de ser igual ao das chamadas: só são vetorizadas as listas de inteiros (os floats teriam
+# arredondamentos diferentes na soma) em que nenhum valor intermédio pode sair dos inteiros de 64 bits, o que é
+# verificado com um majorante do valor absoluto de cada nó da expressão (e da soma). Nos restantes casos (e nas listas pequenas,
+# em que converter para um array custa mais do que as chamadas) o map e o fold chamam a função em cada elemento.
+
+# Valor devolvido quando o map/fold não pode ser vetorizado
+NOT_VECTORIZED = object()
+
+# Número mínimo de elementos para vetorizar
+MIN_SIZE: int = 64
+
+# Maior valor absoluto representável sem overflow num int64
+INT64_LIMIT: int = 2 ** 63 - 1
+
+ARRAY_OPERATORS: dict = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul
+}
+
+
+class Kernel:
+    def __init__(self, evaluate, bound):
+        """
+        Expressão aritmética compilada para arrays.
+
+        :param evaluate: Função array -> array (ou um inteiro, se a expressão não usar o parâmetro).
+        :param bound: Função que, dado o maior valor absoluto dos elementos, devolve o maior valor absoluto
+                      possível da expressão, ou None se algum valor intermédio puder sair dos int64.
+        """
+        self.evaluate = evaluate
+        self.bound = bound
+
+    def apply(self, array) -> any:
+        result: any = self.evaluate(array)
+        if isinstance(result, int):
+            return numpy.full(len(array), result, dtype=numpy.int64)
+        return result
+
+
+def compile_kernel(node: ASTNode, parameter: str) -> Kernel:
+    """
+    Compila uma expressão aritmética sobre um parâmetro.
+
+    :return: O Kernel, ou None se a expressão não for só +, -, * sobre o parâmetro e números inteiros.
+    """
+    if isinstance(node, NumberNode) and type(node.value) is int:
+        value: int = node.value
+        return Kernel(lambda array: value, lambda magnitude: abs(value) if abs(value) <= INT64_LIMIT else None)
+    if isinstance(node, IdentifierNode) and node.name == parameter:
+        return Kernel(lambda array: array, lambda magnitude: magnitude)
+    if isinstance(node, BinOpNode) and node.operator in ARRAY_OPERATORS:
+        left: Kernel = compile_kernel(node.left, parameter)
+        right: Kernel = compile_kernel(node.right, parameter)
+        if left is None or right is None:
+            return None
+        function = ARRAY_OPERATORS[node.operator]
+        combine = operator.mul if node.operator == '*' else operator.add
+
+        def bound(magnitude: int) -> int:
+            left_bound: int = left.bound(magnitude)
+            right_bound: int = right.bound(magnitude)
+            if left_bound is None or right_bound is None:
+                return None
+            result: int = combine(left_bound, right_bound)
+            return result if result <= INT64_LIMIT else None
+
+        return Kernel(lambda array: function(left.evaluate(array), right.evaluate(array)), bound)
+    return None
+
+
+def body_expression(body: list) -> ASTNode:
+    """
+    Devolve a expressão de um corpo de função que só tem uma expressão (que é o valor retornado), ou None.
+    """
+    if not isinstance(body, list) or len(body) != 1:
+        return None
+    statement: ASTNode = body[0]
+    if isinstance(statement, ReturnNode):
+        return statement.expression
+    if isinstance(statement, BinOpNode):
+        return statement
+    return None
+
+
+def load_numpy() -> bool:
+    """
+    Importa o numpy na primeira utilização.
+
+    :return: False se o numpy não estiver instalado (o map e o fold chamam então sempre a função).
+    """
+    global numpy
+    if numpy is None:
+        try:
+            import numpy as module
+        except ImportError:
+            module = False
+        numpy = module
+    return numpy is not False
+
+
+def numpy_installed() -> bool:
+    """
+    Indica se o numpy está instalado, sem o importar (ver load_numpy).
+    """
+    if numpy is None:
+        return importlib.util.find_spec('numpy') is not None
+    return numpy is not False
+
+
+def to_array(list_value: any) -> any:
+    """
+    Converte uma lista de inteiros num array de int64, ou devolve None se a lista tiver outros valores
+    (ou inteiros que não cabem em 64 bits).
+    """
+    if not load_numpy() or set(map(type, list_value)) != {int}:
+        return None
+    try:
+        return numpy.fromiter(list_value, dtype=numpy.int64, count=len(list_value))
+    except OverflowError:
+        return None
+
+
+class Vectorizer:
+    def __init__(self):
+        # Kernels já compilados de cada cláusula (Clause -> Kernel ou None; no fold, (operador, Kernel) ou None)
+        self.map_kernels: dict = {}
+        self.fold_kernels: dict = {}
+
+    def map_kernel(self, clause: Clause) -> Kernel:
+        if clause not in self.map_kernels:
+            kernel: Kernel = None
+            expression: ASTNode = body_expression(clause.body)
+            if expression is not None and isinstance(clause.parameters[0], str):
+                kernel = compile_kernel(expression, clause.parameters[0])
+            self.map_kernels[clause] = kernel
+        return self.map_kernels[clause]
+
+    def fold_kernel(self, clause: Clause) -> tuple:
+        """
+        Devolve (operador da redução, Kernel aplicado a cada elemento) se o corpo for acc + g(x), acc * g(x),
+        g(x) + acc ou g(x) * acc, ou None.
+        """
+        if clause not in self.fold_kernels:
+            reduction: tuple = None
+            expression: ASTNode = body_expression(clause.body)
+            accumulator, element = clause.parameters
+            if (isinstance(expression, BinOpNode) and expression.operator in ('+', '*')
+                    and isinstance(accumulator, str) and isinstance(element, str) and accumulator != element):
+                for own, other in ((expression.left, expression.right), (expression.right, expression.left)):
+                    if isinstance(own, IdentifierNode) and own.name == accumulator:
+                        kernel: Kernel = compile_kernel(other, element)
+                        if kernel is not None:
+                            reduction = (expression.operator, kernel)
+                            break
+            self.fold_kernels[clause] = reduction
+        return self.fold_kernels[clause]
+
+    def map(self, dispatch: FunctionDispatch, list_value: any) -> any:
+        """
+        Aplica a função a todos os elementos da lista numa única operação do numpy.
+
+        :param dispatch: A tabela de despacho da função (ou None se não estiver definida).
+        :param list_value: A lista.
+        :return: A lista com os resultados, ou NOT_VECTORIZED.
+        """
+        if dispatch is None or dispatch.has_branches or not isinstance(list_value, LIST_TYPES) \
+                or len(list_value) < MIN_SIZE:
+            return NOT_VECTORIZED
+        clause: Clause = dispatch.normals.get(1)
+        if clause is None or clause.kind != CLAUSE_NORMAL:
+            return NOT_VECTORIZED
+        kernel: Kernel = self.map_kernel(clause)
+        if kernel is None:
+            return NOT_VECTORIZED
+        array = to_array(list_value)
+        if array is None or kernel.bound(max(int(array.max()), -int(array.min()))) is None:
+            return NOT_VECTORIZED
+        return kernel.apply(array).tolist()
+
+    def fold(self, dispatch: FunctionDispatch, list_value: any, initial_value: any) -> any:
+        """
+        Reduz a lista com a função (soma do numpy ou produto exato dos valores de g).
+
+        :param dispatch: A tabela de despacho da função (ou None se não estiver definida).
+        :param list_value: A lista.
+        :param initial_value: O valor inicial do acumulador.
+        :return: O resultado, ou NOT_VECTORIZED.
+        """
+        if dispatch is None or dispatch.has_branches or type(initial_value) is not int \
+                or not isinstance(list_value, LIST_TYPES) or len(list_value) < MIN_SIZE:
+            return NOT_VECTORIZED
+        clause: Clause = dispatch.normals.get(2)
+        if clause is None or clause.kind != CLAUSE_NORMAL:
+            return NOT_VECTORIZED
+        reduction: tuple = self.fold_kernel(clause)
+        if reduction is None:
+            return NOT_VECTORIZED
+        reduce_operator, kernel = reduction
+        array = to_array(list_value)
+        if array is None:
+            return NOT_VECTORIZED
+        bound: int = kernel.bound(max(int(array.max()), -int(array.min())))
+        if bound is None:
+            return NOT_VECTORIZED
+        if reduce_operator == '+':
+            # A soma também não pode sair dos int64 (cada soma parcial é no máximo bound * len(array))
+            if bound * len(array) > INT64_LIMIT:
+                return NOT_VECTORIZED
+            return initial_value + int(kernel.apply(array).sum())
+        # O produto de 64 valores maiores do que 1 já sai dos int64: é calculado com os inteiros do Python
+        return initial_value * math.prod(kernel.apply(array).tolist())
@@ -0,0 +1,286 @@
+import random
+from bytecode import *
+from dispatch import CLAUSE_LIST, CLAUSE_NUMBER, Clause, FunctionDispatch
+from list_view import LIST_TYPES, list_tail
+
+# Máquina virtual de pilha para o bytecode gerado pelo BytecodeCompiler.
+# As chamadas de funções FCA não usam a pilha do Python: cada chamada é uma frame explícita guardada
+# numa lista, por isso a profundidade da recursão só está limitada pela memória e não por
+# sys.getrecursionlimit(). As chamadas finais (TAIL_CALL) reutilizam a frame atual, pelo que
+# funções recursivas finais correm em espaço de pilha constante.
+
+
+class VirtualMachine:
+    def __init__(self):
+        # Variáveis globais (nome -> valor)
+        self.global_env: dict = {}
+        # Funções definidas (nome -> FunctionDispatch, com CodeObjects como corpos)
+        self.functions: dict = {}
+
+    def run(self, code: CodeObject) -> any:
+        """
+        Executa o programa principal compilado pelo BytecodeCompiler.
+
+        :param code: O CodeObject do programa.
+        :return: O valor devolvido pelo programa (None).
+        """
+        return self.execute(code, [None] * code.nlocals)
+
+    def run_stream(self, statements):
+        """
+        Compila e executa cada instrução do nível de topo à medida que é produzida
+        (ex: por PrattParser.parse_file), em vez de compilar o programa completo.
+
+        :param statements: Iterável com as instruções do programa.
+        """
+        compiler = BytecodeCompiler()
+        for statement in statements:
+            self.run(compiler.compile(ProgramNode([statement])))
+
+    def call_function(self, name: str, args: list) -> any:
+        """
+        Chama a função com o nome e os argumentos (já avaliados) fornecidos e devolve o resultado.
+        """
+        code, fast = self.prepare_call(name, args)
+        return self.execute(code, fast)
+
+    def prepare_call(self, name: str, args: list) -> tuple:
+        """
+        Escolhe a definição a executar para uma chamada (pela tabela de despacho) e prepara os slots locais.
+        Os ramos têm prioridade sobre a definição normal com o mesmo número de parâmetros.
+
+        :param name: Nome da função.
+        :param args: Valores dos argumentos.
+        :return: Um tuplo (CodeObject a executar, slots locais).
+        """
+        dispatch: FunctionDispatch = self.functions.get(name)
+        if dispatch is None:
+            raise ValueError(f"Função não definida: {name}")
+
+        clause: Clause = dispatch.resolve(args, unsupported_pattern)
+        if clause is None:
+            raise ValueError(f"Função {name} com {len(args)} argumentos e condição correspondente não definida")
+        code: CodeObject = clause.body
+        if clause.parameters is None:
+            return code, [None] * code.nlocals
+        fast: list = args
+        if code.nlocals > len(args):
+            fast.extend([None] * (code.nlocals - len(args)))
+        return code, fast
+
+    def execute(self, code: CodeObject, fast: list) -> any:
+        """
+        Ciclo principal da máquina virtual: executa um CodeObject até à instrução RETURN da frame inicial.
+
+        :param code: O código a executar.
+        :param fast: Os slots das variáveis locais (os primeiros são os argumentos).
+        :return: O valor devolvido pela instrução RETURN.
+        """
+        global_env: dict = self.global_env
+        prepare_call = self.prepare_call
+        # Frames suspensas (das funções que chamaram a atual): (code, fast, stack, pc)
+        frames: list = []
+
+        instructions: list = code.instructions
+        constants: list = code.constants
+        stack: list = []
+        push = stack.append
+        pop = stack.pop
+        pc: int = 0
+
+        # Os opcodes mais frequentes são testados primeiro
+        while True:
+            opcode, arg = instructions[pc]
+            pc += 1
+
+            if opcode == LOAD_FAST:
+                value = fast[arg]
+                if value is None:
+                    # Local ainda não atribuída: tal como no Interpreter, vale a variável global
+                    value = global_env.get(code.local_names[arg]) if arg not in code.head_slots else None
+                    if value is None:
+                        raise ValueError(f"Variável não encontrada: {code.local_names[arg]}")
+                push(value)
+
+            elif opcode == LOAD_CONST:
+                push(constants[arg])
+
+            elif opcode == CALL:
+                name, argc = arg
+                if argc:
+                    args = stack[-argc:]
+                    del stack[-argc:]
+                else:
+                    args = []
+                frames.append((code, fast, stack, pc))
+                code, fast = prepare_call(name, args)
+                instructions = code.instructions
+                constants = code.constants
+                stack = []
+                push = stack.append
+                pop = stack.pop
+                pc = 0
+
+            elif opcode == RETURN:
+                value = pop()
+                if not frames:
+                    return value
+                code, fast, stack, pc = frames.pop()
+                instructions = code.instructions
+                constants = code.constants
+                push = stack.append
+                pop = stack.pop
+                push(value)
+
+            elif opcode == TAIL_CALL:
+                name, argc = arg
+                if argc:
+                    args = stack[-argc:]
+                    del stack[-argc:]
+                else:
+                    args = []
+                # A frame atual é substituída pela da função chamada
+                code, fast = prepare_call(name, args)
+                instructions = code.instructions
+                constants = code.constants
+                stack.clear()
+                pc = 0
+
+            elif opcode == BINARY_ADD:
+                right = pop()
+                stack[-1] = stack[-1] + right
+
+            elif opcode == BINARY_SUB:
+                right = pop()
+                stack[-1] = stack[-1] - right
+
+            elif opcode == BINARY_MUL:
+                right = pop()
+                stack[-1] = stack[-1] * right
+
+            elif opcode == STORE_FAST:
+                fast[arg] = pop()
+
+            elif opcode == LOAD_GLOBAL:
+                value = global_env.get(constants[arg])
+                if value is None:
+                    raise ValueError(f"Variável não encontrada: {constants[arg]}")
+                push(value)
+
+            elif opcode == STORE_GLOBAL:
+                global_env[constants[arg]] = pop()
+
+            elif opcode == FOR_ITER:
+                slot, target = arg
+                value = next(fast[slot], StopIteration)
+                if value is StopIteration:
+                    fast[slot] = None
+                    pc = target
+                else:
+                    push(value)
+
+            elif opcode == LIST_APPEND:
+                value = pop()
+                stack[-1].append(value)
+
+            elif opcode == JUMP:
+                pc = arg
+
+            elif opcode == BINARY_DIV:
+                right = pop()
+                if right == 0:
+                    raise ValueError("Erro: Divisão por zero.")
+                stack[-1] = stack[-1] / right
+
+            elif opcode == BINARY_CONCAT:
+                right = pop()
+                stack[-1] = str(stack[-1]) + str(right)
+
+            elif opcode == UNPACK_PATTERN:
+                slot, head_slot, tail_slot = arg
+                value = fast[slot]
+                if not isinstance(value, LIST_TYPES):
+                    raise ValueError(f"Argumento para ListPatternNode não é uma lista: {value}")
+                if head_slot is not None:
+                    fast[head_slot] = value[0] if value else None
+                if tail_slot is not None:
+                    # Vista sobre a mesma lista, sem copiar a cauda
+                    fast[tail_slot] = list_tail(value)
+
+            elif opcode == POP_TOP:
+                pop()
+
+            elif opcode == PRINT:
+                print(pop())
+
+            elif opcode == BUILD_LIST:
+                if arg:
+                    values = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    values = []
+                push(values)
+
+            elif opcode == GET_ITER:
+                stack[-1] = iter(stack[-1])
+
+            elif opcode == LOAD_FAST_STR:
+                value = fast[arg]
+                if value is None and arg not in code.head_slots:
+                    value = global_env.get(code.local_names[arg], "")
+                push(str(value))
+
+            elif opcode == LOAD_GLOBAL_STR:
+                push(str(global_env.get(constants[arg], "")))
+
+            elif opcode == BUILD_STRING:
+                parts = stack[-arg:] if arg else []
+                if arg:
+                    del stack[-arg:]
+                push(''.join(parts))
+
+            elif opcode == INPUT:
+                user_input: str = input()
+                push(int(user_input) if user_input.isnumeric() else user_input)
+
+            elif opcode == RANDOM:
+                push(random.randint(0, pop()))
+
+            elif opcode == DEFINE_FUNCTION:
+                function_def: FunctionDef = constants[arg]
+                self.get_function(function_def.name).define_normal(function_def.parameters, function_def.code)
+
+            elif opcode == DEFINE_BRANCH:
+                branch_def: BranchDef = constants[arg]
+                dispatch: FunctionDispatch = self.get_function(branch_def.name)
+                if branch_def.kind == BRANCH_NUMBER:
+                    dispatch.add_number_branch(branch_def.literal,
+                                               Clause(CLAUSE_NUMBER, branch_def.code, pattern=branch_def.literal))
+                elif branch_def.kind == BRANCH_LIST:
+                    dispatch.add_list_branch(branch_def.literal,
+                                             Clause(CLAUSE_LIST, branch_def.code, pattern=branch_def.literal))
+                elif branch_def.kind == BRANCH_LIST_DYNAMIC:
+                    dispatch.add_list_branch(branch_def.literal, Clause(CLAUSE_LIST, branch_def.code,
+                                                                        pattern=branch_def.literal), constant=False)
+
+            elif opcode == RAISE:
+                raise ValueError(constants[arg])
+
+            else:
+                raise ValueError(f"Opcode desconhecido: {opcode}")
+
+    def get_function(self, name: str) -> FunctionDispatch:
+        """
+        Devolve a tabela de despacho da função com o nome dado, criando-a se ainda não existir.
+        """
+        if name not in self.functions:
+            self.functions[name] = FunctionDispatch(name)
+        return self.functions[name]
+
+
+def unsupported_pattern(element: any) -> any:
+    """
+    Avaliação dos elementos dos padrões de lista não literais (BRANCH_LIST_DYNAMIC), que a VM não suporta: o erro
+    é dado na chamada que compara o argumento com o padrão, e não ao compilar o programa.
+    """
+    raise ValueError("Padrão de lista não literal não suportado pela VM")